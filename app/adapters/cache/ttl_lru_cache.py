@@ -0,0 +1,69 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+
+class TTLLRUCache:
+    """
+    Thread-safe LRU cache, bounded to {max_size} entries, where every entry also expires at its own
+    {expires_at} (unix timestamp). Hits and misses are counted, so that the cache can be sized.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, expires_at: float):
+        if expires_at <= time.time():
+            return
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def add(self, key: Hashable, value: Any, expires_at: float) -> bool:
+        """
+        Sets {key} only if it is not cached yet, in a single step.
+        :return: whether {key} was set
+        """
+        now = time.time()
+        if expires_at <= now:
+            return False
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                return False
+
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return True
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return entry[0] if entry is not None and entry[1] > time.time() else None
+
+    def get_stats(self) -> dict:
+        return {'size': len(self._entries), 'max_size': self.max_size, 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,46 @@
+import argparse
+import logging
+import sys
+from app.adapters.service_adapters.bulk_user_provisioner import BulkUserProvisioner, read_user_records
+from app.config.config import Container
+
+
+def main(argv=None) -> int:
+    """
+    Signs up every user of a JSONL or CSV file (fields: email, first_name, external_identifier),
+    and writes one JSON result per record. Uses the same environment as the backend.
+    """
+    parser = argparse.ArgumentParser(description='Bulk sign-up of users to the identity provider')
+    parser.add_argument('input', help='a .jsonl or .csv file')
+    parser.add_argument('--results', default='provisioning-results.jsonl', help='where to write the result per record')
+    parser.add_argument(
+        '--workers', type=int, default=16, help='sign-ups in flight, at most IDENTITY_PROVIDER_MAX_CONCURRENT_CALLS')
+    parser.add_argument('--max-pending', type=int, default=1000, help='records read ahead of the sign-ups')
+    parser.add_argument('--progress-interval', type=float, default=10, help='seconds between progress reports')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    logger = logging.getLogger('provisioning')
+    # more workers than the identity provider bulkhead would only get their sign-ups rejected
+    max_concurrent_calls = Container.identity_provider_max_concurrent_calls
+    if args.workers > max_concurrent_calls:
+        logger.warning(f'--workers lowered to IDENTITY_PROVIDER_MAX_CONCURRENT_CALLS ({max_concurrent_calls})')
+    provisioner = BulkUserProvisioner(
+        logger,
+        Container.identity_provider_service(),
+        min(args.workers, max_concurrent_calls),
+        args.max_pending,
+        args.progress_interval
+    )
+
+    with open(args.results, 'w') as results:
+        report = provisioner.provision(
+            read_user_records(args.input),
+            lambda result: results.write(result.json() + '\n')
+        )
+
+    return 1 if report.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
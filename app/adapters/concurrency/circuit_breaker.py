@@ -0,0 +1,192 @@
+import time
+from logging import Logger
+from threading import Lock, BoundedSemaphore
+from typing import Any, Callable, List
+
+
+class CircuitOpenException(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Guards the calls to a dependency, so that callers fail fast instead of waiting for it while it is degraded.
+
+    - closed: calls go through, and their outcome is recorded over a rolling window of {window_seconds},
+      made of {buckets} buckets. Once the window holds {minimum_calls} calls, and either the failure rate reaches
+      {failure_rate_threshold} or the rate of calls slower than {slow_call_duration} seconds reaches
+      {slow_call_rate_threshold}, the circuit opens.
+    - open: calls are rejected for {open_duration} seconds, then the circuit becomes half open.
+    - half open: up to {half_open_calls} probe calls go through; the circuit closes once that many succeed in time,
+      and opens again as soon as one fails or is slow.
+    On top of that, at most {max_concurrent_calls} calls run at once (bulkhead); any call above it is rejected.
+    {is_failure} tells which exceptions count as failures of the dependency (e.g. not a 404).
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+            self,
+            logger: Logger,
+            name: str,
+            window_seconds: float,
+            buckets: int,
+            minimum_calls: int,
+            failure_rate_threshold: float,
+            slow_call_duration: float,
+            slow_call_rate_threshold: float,
+            open_duration: float,
+            half_open_calls: int,
+            max_concurrent_calls: int,
+            is_failure: Callable[[BaseException], bool] = lambda e: True
+    ):
+        self.logger = logger
+        self.name = name
+        self.bucket_duration = window_seconds / buckets
+        self.minimum_calls = minimum_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self.max_concurrent_calls = max_concurrent_calls
+        self.is_failure = is_failure
+
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.successful_probes = 0
+        self.rejected_while_open = 0
+        self.rejected_by_bulkhead = 0
+        self.in_flight = 0
+        # [bucket number, calls, failures, slow calls]
+        self._buckets: List[list] = [[-1, 0, 0, 0] for _ in range(buckets)]
+        self._bulkhead = BoundedSemaphore(max_concurrent_calls)
+        self._lock = Lock()
+
+    def call(self, fn: Callable, *args) -> Any:
+        """
+        :raises CircuitOpenException: when the call is rejected, without calling {fn}
+        """
+        is_probe = self._acquire()
+        started = time.monotonic()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self._release(is_probe, time.monotonic() - started, self.is_failure(e))
+            raise
+
+        self._release(is_probe, time.monotonic() - started, False)
+        return result
+
+    def _acquire(self) -> bool:
+        """
+        :return: whether the call is a half open probe
+        :raises CircuitOpenException
+        """
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.open_duration:
+                self._transition(self.HALF_OPEN)
+
+            if self.state == self.OPEN or (self.state == self.HALF_OPEN and
+                                           self.probes_in_flight + self.successful_probes >= self.half_open_calls):
+                self.rejected_while_open += 1
+                raise CircuitOpenException(f'{self.name} circuit is {self.state}')
+
+            if not self._bulkhead.acquire(blocking=False):
+                self.rejected_by_bulkhead += 1
+                raise CircuitOpenException(f'{self.name} has {self.max_concurrent_calls} calls in flight')
+
+            self.in_flight += 1
+            is_probe = self.state == self.HALF_OPEN
+            if is_probe:
+                self.probes_in_flight += 1
+            return is_probe
+
+    def _release(self, is_probe: bool, duration: float, failed: bool):
+        is_slow = duration >= self.slow_call_duration
+        with self._lock:
+            self._bulkhead.release()
+            self.in_flight -= 1
+            self._record(failed, is_slow)
+
+            if is_probe:
+                self.probes_in_flight -= 1
+                if self.state != self.HALF_OPEN:
+                    return
+                if failed or is_slow:
+                    self._transition(self.OPEN)
+                    return
+                self.successful_probes += 1
+                if self.successful_probes >= self.half_open_calls:
+                    self._transition(self.CLOSED)
+            elif self.state == self.CLOSED and self._should_open():
+                self._transition(self.OPEN)
+
+    def _get_bucket(self) -> list:
+        """
+        Must be called holding the lock.
+        """
+        bucket_number = int(time.monotonic() / self.bucket_duration)
+        bucket = self._buckets[bucket_number % len(self._buckets)]
+        if bucket[0] != bucket_number:
+            bucket[:] = [bucket_number, 0, 0, 0]
+        return bucket
+
+    def _record(self, failed: bool, is_slow: bool):
+        bucket = self._get_bucket()
+        bucket[1] += 1
+        bucket[2] += failed
+        bucket[3] += is_slow
+
+    def _get_window(self):
+        """
+        :return: calls, failures and slow calls of the rolling window
+        """
+        oldest_bucket_number = int(time.monotonic() / self.bucket_duration) - len(self._buckets) + 1
+        window = [bucket for bucket in self._buckets if bucket[0] >= oldest_bucket_number]
+        return sum(b[1] for b in window), sum(b[2] for b in window), sum(b[3] for b in window)
+
+    def _should_open(self) -> bool:
+        calls, failures, slow_calls = self._get_window()
+        return calls >= self.minimum_calls and (
+                failures / calls >= self.failure_rate_threshold or
+                slow_calls / calls >= self.slow_call_rate_threshold
+        )
+
+    def _transition(self, state: str):
+        """
+        Must be called holding the lock.
+        """
+        if state == self.OPEN:
+            self.opened_at = time.monotonic()
+        if state in (self.HALF_OPEN, self.CLOSED):
+            self.successful_probes = 0
+        # the metrics are logged before the window gets reset, so that they tell why the circuit moved
+        log = self.logger.warning if state == self.OPEN else self.logger.info
+        log(f'{self.name} circuit: {self.state} -> {state}, {self._get_metrics()}')
+        self.state = state
+        if state == self.CLOSED:
+            for bucket in self._buckets:
+                bucket[:] = [-1, 0, 0, 0]
+
+    def _get_metrics(self) -> dict:
+        """
+        Must be called holding the lock.
+        """
+        calls, failures, slow_calls = self._get_window()
+        return {
+            'state': self.state,
+            'calls': calls,
+            'failure_rate': failures / calls if calls else 0.0,
+            'slow_call_rate': slow_calls / calls if calls else 0.0,
+            'in_flight': self.in_flight,
+            'max_concurrent_calls': self.max_concurrent_calls,
+            'rejected_while_open': self.rejected_while_open,
+            'rejected_by_bulkhead': self.rejected_by_bulkhead,
+        }
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return self._get_metrics()
@@ -0,0 +1,27 @@
+import asyncio
+from typing import Awaitable, List
+
+
+async def gather_or_cancel(*aws: Awaitable) -> List:
+    """
+    Runs {aws} concurrently and returns their results, in the order they were given.
+    As soon as one of them fails, the others are cancelled and its exception is raised.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    except asyncio.CancelledError:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.wait(pending)
+
+    for task in tasks:
+        if task in done and task.exception() is not None:
+            raise task.exception()
+
+    return [task.result() for task in tasks]
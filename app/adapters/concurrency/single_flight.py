@@ -0,0 +1,68 @@
+import asyncio
+from threading import Event, Lock
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from weakref import WeakKeyDictionary
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'exception')
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.exception = None
+
+
+class SingleFlight:
+    """
+    Concurrent calls made with the same key share a single execution: the first caller runs it,
+    the others wait for it and get the same result, or the same exception raised.
+    The key is released as soon as the call finishes, so nothing is cached afterwards.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        # a task belongs to the loop it runs on, while this object outlives it: calls are shared per loop
+        self._tasks: 'WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Future]]' = \
+            WeakKeyDictionary()
+
+    def do(self, key: Hashable, fn: Callable, *args) -> Any:
+        """
+        For callers running on threads.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = fn(*args)
+            return call.result
+        except BaseException as e:
+            call.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, coroutine_function: Callable[..., Awaitable], *args) -> Any:
+        """
+        For callers running on the event loop. A caller that gets cancelled does not cancel the shared call.
+        Only callers running on the same loop share a call.
+        """
+        tasks = self._tasks.setdefault(asyncio.get_running_loop(), {})
+        task = tasks.get(key)
+        if task is None:
+            task = tasks[key] = asyncio.ensure_future(coroutine_function(*args))
+            task.add_done_callback(lambda _: tasks.pop(key, None))
+
+        return await asyncio.shield(task)
@@ -0,0 +1,166 @@
+from typing import Optional
+from logging import Logger
+from uuid import uuid4
+from starlette.concurrency import run_in_threadpool
+from app.adapters.concurrency.fan_out import gather_or_cancel
+from app.adapters.service_adapters.async_upstream_http_client import AsyncUpstreamHttpClient
+from app.adapters.service_adapters.identity_provider_client import IdentityProviderClient
+from app.business_logic.async_authentication_repository import AsyncAuthenticationRepository
+from app.business_logic.async_authentication_service import AsyncAuthenticationService
+from app.business_logic.exceptions import BackendRepositoryException, InvalidState, UnauthorizedException, \
+    InvalidRefreshToken, ResourceNotFoundException
+from app.business_logic.models.authentication import AuthenticationState, UserInfo
+from app.business_logic.token_service import TokenService
+
+
+class AsyncGoogleAuthenticationService(AsyncAuthenticationService):
+    """
+    Event loop implementation of GoogleAuthenticationService: the calls to Google go through
+    an AsyncUpstreamHttpClient, so a single worker can serve many in-flight logins.
+    The TokenService may need to (re)fetch the discovery document or the signing keys, so it runs on the threadpool.
+    """
+
+    def __init__(
+            self,
+            platform: str,
+            logger: Logger,
+            client_id: str,
+            client_secret: str,
+            backend_repository: AsyncAuthenticationRepository,
+            identity_provider_service: IdentityProviderClient,
+            token_service: TokenService,
+            http_client: AsyncUpstreamHttpClient,
+            redirect_uri_prefix: str
+    ):
+        self.platform = platform
+        self.logger = logger
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.backend_repository = backend_repository
+        self.identity_provider_service = identity_provider_service
+        self.token_service = token_service
+        self.http_client = http_client
+        self.redirect_uri_prefix = redirect_uri_prefix
+
+    async def create_state(self) -> str:
+        state = str(uuid4())
+        auth_state = await self.backend_repository.create_authentication_state(state)
+        return auth_state.state
+
+    async def validate_state(self, state: str):
+        """
+        :raises InvalidState
+        """
+        try:
+            await self.backend_repository.get_authentication_state(state)
+        except BackendRepositoryException:
+            raise InvalidState('invalid state')
+
+    async def exchange_code_for_token(
+            self, state: str, code: str, endpoint_uri: str, validate_state: bool = True
+    ) -> AuthenticationState:
+        get_token_endpoint = run_in_threadpool(self.token_service.get_token_endpoint_from_well_known_url)
+        if validate_state:
+            _, token_endpoint = await gather_or_cancel(self.validate_state(state), get_token_endpoint)
+        else:
+            token_endpoint = await get_token_endpoint
+        redirect_uri = f"{self.redirect_uri_prefix}{endpoint_uri}"
+
+        response = await self.http_client.post(
+            token_endpoint,
+            data={
+                "code": code,
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "redirect_uri": redirect_uri,
+                "grant_type": "authorization_code"
+            },
+            headers={'Content-Type': 'application/x-www-form-urlencoded'}
+        )
+
+        self.logger.warning(f'response = {response}')
+        if response.is_success:
+            id_token = response.json()['id_token']
+            return AuthenticationState(
+                state=state,
+                access_token=response.json()['access_token'],
+                refresh_token=response.json()['refresh_token'],
+                id_token=id_token,
+                # received straight from the token endpoint, so its signature does not need to be validated
+                user_info=self.token_service.parse_trusted_id_token(id_token, self.client_id)
+            )
+
+        raise UnauthorizedException(response.reason_phrase)
+
+    async def temporarily_store_auth_state(self, auth_state: AuthenticationState):
+        await self.backend_repository.update_authentication_state(auth_state)
+
+    async def validate_state_and_store_auth_state(self, auth_state: AuthenticationState):
+        await self.backend_repository.validate_and_update_authentication_state(auth_state)
+
+    async def get_temporarily_stored_access_token(self, state: str, refresh_token: str) -> AuthenticationState:
+        return await self.backend_repository.pop_authentication_state(state, refresh_token)
+
+    async def revoke_refresh_token(self, refresh_token: str):
+        """
+        See GoogleAuthenticationService.revoke_refresh_token
+        """
+        revocation_endpoint = await run_in_threadpool(self.token_service.get_revocation_endpoint_from_well_known_url)
+        response = await self.http_client.post(
+            revocation_endpoint,
+            params={'token': refresh_token},
+            headers={'content-type': 'application/x-www-form-urlencoded'}
+        )
+
+        if response.is_success:
+            return
+        elif response.status_code == 400:
+            if 'error' in response.json() and response.json()['error'] == 'invalid_token':
+                raise InvalidRefreshToken()
+
+    async def create_user(self, id_token: str, user_info: Optional[UserInfo] = None) -> UserInfo:
+        if user_info is None:
+            user_info = await self.get_user_info(id_token)
+        await self.identity_provider_service.sign_up_user_async(user_info)
+
+        return user_info
+
+    async def get_user_info(self, id_token: str) -> UserInfo:
+        return await run_in_threadpool(self.token_service.validate_id_token, id_token, self.client_id)
+
+    async def refresh_access_token(self, refresh_token: str) -> AuthenticationState:
+        token_endpoint = await run_in_threadpool(self.token_service.get_token_endpoint_from_well_known_url)
+        response = await self.http_client.post(
+            token_endpoint,
+            data={
+                "refresh_token": refresh_token,
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "grant_type": "refresh_token"
+            },
+            headers={'Content-Type': 'application/x-www-form-urlencoded'}
+        )
+
+        self.logger.warning(f'response = {response}')
+        if response.is_success:
+            return AuthenticationState(
+                access_token=response.json()['access_token'],
+                refresh_token=response.json()['refresh_token'],
+                id_token=response.json()['id_token']
+            )
+
+        raise InvalidRefreshToken('invalid refresh token')
+
+    async def ensure_user_exists(self, user_identifier: str):
+        """
+        :raises ResourceNotFoundException
+        """
+        user = await self.identity_provider_service.get_user_async(user_identifier)
+        if not user:
+            raise ResourceNotFoundException(f'User not found: {user_identifier}')
+
+    async def store_auth_state_for_existing_user(self, auth_state: AuthenticationState, user_identifier: str):
+        await gather_or_cancel(
+            self.ensure_user_exists(user_identifier),
+            self.validate_state_and_store_auth_state(auth_state)
+        )
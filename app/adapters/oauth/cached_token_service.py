@@ -0,0 +1,46 @@
+from hashlib import sha256
+from logging import Logger
+from app.adapters.cache.ttl_lru_cache import TTLLRUCache
+from app.business_logic.models.authentication import UserInfo, OpenIdConfiguration
+from app.business_logic.token_service import TokenService
+
+
+class CachedTokenService(TokenService):
+    """
+    Remembers the UserInfo of every id_token that {token_service} has already verified, until the token expires,
+    so that a warm container does not verify the same id_token twice.
+    """
+
+    def __init__(self, logger: Logger, token_service: TokenService, max_size: int):
+        self.logger = logger
+        self.token_service = token_service
+        self.verified_tokens = TTLLRUCache(max_size)
+
+    @staticmethod
+    def _get_cache_key(_id_token: str, client_id: str) -> bytes:
+        return sha256(f'{client_id}:{_id_token}'.encode()).digest()
+
+    def validate_id_token(self, _id_token: str, client_id: str) -> UserInfo:
+        cache_key = self._get_cache_key(_id_token, client_id)
+        user_info = self.verified_tokens.get(cache_key)
+        if user_info is not None:
+            return user_info
+
+        user_info = self.token_service.validate_id_token(_id_token, client_id)
+        if user_info.expires_at is not None:
+            self.verified_tokens.set(cache_key, user_info, user_info.expires_at)
+        self.logger.debug(f'verified tokens cache: {self.verified_tokens.get_stats()}')
+
+        return user_info
+
+    def parse_trusted_id_token(self, _id_token: str, client_id: str) -> UserInfo:
+        return self.token_service.parse_trusted_id_token(_id_token, client_id)
+
+    def get_openid_configuration(self) -> OpenIdConfiguration:
+        return self.token_service.get_openid_configuration()
+
+    def get_token_endpoint_from_well_known_url(self) -> str:
+        return self.token_service.get_token_endpoint_from_well_known_url()
+
+    def get_revocation_endpoint_from_well_known_url(self) -> str:
+        return self.token_service.get_revocation_endpoint_from_well_known_url()
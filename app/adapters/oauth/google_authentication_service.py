@@ -1,12 +1,13 @@
+from typing import Optional
 from app.business_logic.authentication_service import AuthenticationService
 from app.business_logic.exceptions import BackendRepositoryException, InvalidState, UnauthorizedException, \
-    InvalidRefreshToken
+    InvalidRefreshToken, ResourceNotFoundException
 from app.business_logic.authentication_repository import AuthenticationRepository
 from app.business_logic.models.authentication import AuthenticationState, UserInfo
 from app.business_logic.token_service import TokenService
 from app.adapters.service_adapters.identity_provider_client import IdentityProviderClient
+from app.adapters.service_adapters.upstream_http_client import UpstreamHttpClient
 from logging import Logger
-import requests
 from uuid import uuid4
 
 
@@ -20,6 +21,7 @@ class GoogleAuthenticationService(AuthenticationService):
             backend_repository: AuthenticationRepository,
             identity_provider_service: IdentityProviderClient,
             token_service: TokenService,
+            http_client: UpstreamHttpClient,
             redirect_uri_prefix: str
     ):
         self.platform = platform
@@ -29,6 +31,7 @@ class GoogleAuthenticationService(AuthenticationService):
         self.backend_repository = backend_repository
         self.identity_provider_service = identity_provider_service
         self.token_service = token_service
+        self.http_client = http_client
         self.redirect_uri_prefix = redirect_uri_prefix
 
     def create_state(self) -> str:
@@ -45,9 +48,14 @@ class GoogleAuthenticationService(AuthenticationService):
         except BackendRepositoryException:
             raise InvalidState('invalid state')
 
-    def exchange_code_for_token(self, state: str, code: str, endpoint_uri: str) -> AuthenticationState:
-        self.validate_state(state)
-        token_endpoint = self.token_service.get_token_endpoint_from_well_known_url()
+    def exchange_code_for_token(
+            self, state: str, code: str, endpoint_uri: str, validate_state: bool = True,
+            token_endpoint: Optional[str] = None
+    ) -> AuthenticationState:
+        if validate_state:
+            self.validate_state(state)
+        if token_endpoint is None:
+            token_endpoint = self.token_service.get_token_endpoint_from_well_known_url()
         """
         If the redirect URI was included in the initial authorization request, 
         the service must require it in the token request as well. 
@@ -56,7 +64,7 @@ class GoogleAuthenticationService(AuthenticationService):
         """
         redirect_uri = f"{self.redirect_uri_prefix}{endpoint_uri}"
 
-        response = requests.post(
+        response = self.http_client.post(
             token_endpoint,
             data={
                 "code": code,
@@ -71,11 +79,14 @@ class GoogleAuthenticationService(AuthenticationService):
         self.logger.warning(f'response = {response}')
         # TODO handle response and throw exceptions
         if response.ok:
+            id_token = response.json()['id_token']
             return AuthenticationState(
                 state=state,
                 access_token=response.json()['access_token'],
                 refresh_token=response.json()['refresh_token'],
-                id_token=response.json()['id_token']
+                id_token=id_token,
+                # received straight from the token endpoint, so its signature does not need to be validated
+                user_info=self.token_service.parse_trusted_id_token(id_token, self.client_id)
             )
 
         raise UnauthorizedException(response.reason)
@@ -83,6 +94,9 @@ class GoogleAuthenticationService(AuthenticationService):
     def temporarily_store_auth_state(self, auth_state: AuthenticationState):
         self.backend_repository.update_authentication_state(auth_state)
 
+    def validate_state_and_store_auth_state(self, auth_state: AuthenticationState):
+        self.backend_repository.validate_and_update_authentication_state(auth_state)
+
     def get_temporarily_stored_access_token(self, state: str, refresh_token: str) -> AuthenticationState:
         return self.backend_repository.pop_authentication_state(state, refresh_token)
 
@@ -98,10 +112,10 @@ class GoogleAuthenticationService(AuthenticationService):
         Refresh token exists only in Frontend's http-only cookie, and for extra safety it will be revoked.
         The actual access_token will expire soon anyway.
         """
-        # use the https://accounts.google.com/o/oauth2/revoke?token={refresh_token}
         # https://developers.google.com/identity/protocols/oauth2/web-server#tokenrevoke
-        response = requests.post(
-            'https://oauth2.googleapis.com/revoke',
+        revocation_endpoint = self.token_service.get_revocation_endpoint_from_well_known_url()
+        response = self.http_client.post(
+            revocation_endpoint,
             params={'token': refresh_token},
             headers={'content-type': 'application/x-www-form-urlencoded'}
         )
@@ -113,8 +127,9 @@ class GoogleAuthenticationService(AuthenticationService):
                 raise InvalidRefreshToken()
         # TODO handle other cases and raise exceptions
 
-    def create_user(self, id_token: str) -> UserInfo:
-        user_info = self.token_service.validate_id_token(id_token, self.client_id)
+    def create_user(self, id_token: str, user_info: Optional[UserInfo] = None) -> UserInfo:
+        if user_info is None:
+            user_info = self.token_service.validate_id_token(id_token, self.client_id)
         self.identity_provider_service.sign_up_user(user_info)
 
         return user_info
@@ -124,7 +139,7 @@ class GoogleAuthenticationService(AuthenticationService):
 
     def refresh_access_token(self, refresh_token: str) -> AuthenticationState:
         token_endpoint = self.token_service.get_token_endpoint_from_well_known_url()
-        response = requests.post(
+        response = self.http_client.post(
             token_endpoint,
             data={
                 "refresh_token": refresh_token,
@@ -149,4 +164,6 @@ class GoogleAuthenticationService(AuthenticationService):
         """
         :raises ResourceNotFoundException
         """
-        raise NotImplementedError
+        user = self.identity_provider_service.get_user(user_identifier)
+        if not user:
+            raise ResourceNotFoundException(f'User not found: {user_identifier}')
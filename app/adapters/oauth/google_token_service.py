@@ -1,12 +1,38 @@
-from google.oauth2 import id_token
-from google.auth.transport import requests
+from logging import Logger
+import jwt
+from app.adapters.oauth.jwks_cache import JwksCache
+from app.adapters.oauth.openid_configuration_cache import OpenIdConfigurationCache
+from app.adapters.service_adapters.upstream_http_client import UpstreamHttpClient
 from app.business_logic.exceptions import InvalidIdToken
-from app.business_logic.models.authentication import UserInfo
+from app.business_logic.models.authentication import UserInfo, OpenIdConfiguration
 from app.business_logic.token_service import TokenService
-import requests
 
 
 class GoogleTokenService(TokenService):
+    issuers = ('accounts.google.com', 'https://accounts.google.com')
+    signing_algorithms = ['RS256']
+    required_claims = ['exp', 'iat', 'iss', 'sub']
+    well_known_url = 'https://accounts.google.com/.well-known/openid-configuration'
+    fallback_configuration = OpenIdConfiguration(
+        issuer='https://accounts.google.com',
+        token_endpoint='https://oauth2.googleapis.com/token',
+        revocation_endpoint='https://oauth2.googleapis.com/revoke',
+        jwks_uri='https://www.googleapis.com/oauth2/v3/certs'
+    )
+
+    def __init__(self, logger: Logger, http_client: UpstreamHttpClient):
+        self.openid_configuration_cache = OpenIdConfigurationCache(
+            logger,
+            http_client,
+            self.well_known_url,
+            self.fallback_configuration
+        )
+        self.jwks_cache = JwksCache(
+            logger,
+            http_client,
+            lambda: self.get_openid_configuration().jwks_uri or self.fallback_configuration.jwks_uri
+        )
+
     def validate_id_token(self, _id_token: str, client_id: str) -> UserInfo:
         """
         https://developers.google.com/identity/protocols/oauth2/openid-connect#obtainuserinfo :
@@ -15,22 +41,63 @@ class GoogleTokenService(TokenService):
         but the sub value is never changed.
         Use sub within your application as the unique-identifier key for the user.
         Maximum length of 255 case-sensitive ASCII characters.
+
+        :raises InvalidIdToken
+        :raises TimeoutException: when the signing keys could not be fetched in time
+        :raises ServerException: when the signing keys could not be fetched
+        """
+        try:
+            signing_key = self.jwks_cache.get_signing_key(jwt.get_unverified_header(_id_token).get('kid'))
+            payload = jwt.decode(
+                _id_token,
+                signing_key,
+                algorithms=self.signing_algorithms,
+                audience=client_id,
+                options={'require': self.required_claims}
+            )
+        except jwt.PyJWTError as e:
+            raise InvalidIdToken(f'Invalid id token: {e}')
+
+        return self._get_user_info(payload)
+
+    def parse_trusted_id_token(self, _id_token: str, client_id: str) -> UserInfo:
+        try:
+            payload = jwt.decode(
+                _id_token,
+                audience=client_id,
+                options={
+                    'verify_signature': False,
+                    'verify_aud': True,
+                    'verify_exp': True,
+                    'require': self.required_claims
+                }
+            )
+        except jwt.PyJWTError as e:
+            raise InvalidIdToken(f'Invalid id token: {e}')
+
+        return self._get_user_info(payload)
+
+    def _get_user_info(self, payload: dict) -> UserInfo:
+        """
+        :raises InvalidIdToken
         """
-        payload = id_token.verify_token(_id_token, requests.Request(), client_id)
+        if payload['iss'] not in self.issuers:
+            raise InvalidIdToken(f'Id token issued by: {payload["iss"]}')
         if 'email' not in payload or 'name' not in payload:
             raise InvalidIdToken(f'Id token without credentials: {payload}')
 
         return UserInfo(
             email=payload['email'],
             first_name=payload['name'],
-            external_identifier=payload['sub']
+            external_identifier=payload['sub'],
+            expires_at=payload.get('exp')
         )
 
+    def get_openid_configuration(self) -> OpenIdConfiguration:
+        return self.openid_configuration_cache.get()
+
     def get_token_endpoint_from_well_known_url(self) -> str:
-        # TODO: Cache the response. In order to do so you should respect the cache control headers
-        #   returned as response
-        response = requests.get('https://accounts.google.com/.well-known/openid-configuration')
-        if response.ok and 'token_endpoint' in response.json():
-            return str(response.json()['token_endpoint'])
+        return self.get_openid_configuration().token_endpoint
 
-        return "https://oauth2.googleapis.com/token"
+    def get_revocation_endpoint_from_well_known_url(self) -> str:
+        return self.get_openid_configuration().revocation_endpoint or self.fallback_configuration.revocation_endpoint
@@ -0,0 +1,48 @@
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+
+def _parse_cache_control(cache_control: str) -> dict:
+    directives = {}
+    for directive in cache_control.split(','):
+        name, _, value = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def get_freshness_lifetime(headers: Mapping[str, str]) -> int:
+    """
+    Returns for how many seconds (from now) a response may be served from a private cache,
+    following the Cache-Control (max-age, no-store, no-cache) and Expires semantics of RFC 7234.
+    """
+    directives = _parse_cache_control(headers.get('Cache-Control', ''))
+    if 'no-store' in directives or 'no-cache' in directives:
+        return 0
+
+    if 'max-age' in directives:
+        try:
+            max_age = int(directives['max-age'])
+        except ValueError:
+            return 0
+        try:
+            age = int(headers.get('Age', 0))
+        except ValueError:
+            age = 0
+        return max(max_age - age, 0)
+
+    expires = _parse_http_date(headers.get('Expires'))
+    if expires is None:
+        return 0
+    date = _parse_http_date(headers.get('Date')) or time.time()
+    return max(int(expires - date), 0)
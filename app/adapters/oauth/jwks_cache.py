@@ -0,0 +1,109 @@
+import time
+from logging import Logger
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, Optional
+import jwt
+import requests
+from app.adapters.oauth.http_cache import get_freshness_lifetime
+from app.adapters.service_adapters.upstream_http_client import UpstreamHttpClient
+from app.business_logic.exceptions import InvalidIdToken, TimeoutException, ServerException
+
+
+class JwksCache:
+    """
+    Keeps the public keys published at the jwks_uri of an authorization server, parsed and indexed by kid,
+    so that verifying an id_token signature does not need any network call.
+    - The key set lives as long as the Cache-Control/Expires headers of the jwks response allow.
+    - {refresh_margin} seconds before it expires, it gets refreshed in a background thread while
+      the current keys keep being served.
+    - An unknown kid forces a refetch (keys are rotated), at most once every {min_refetch_interval} seconds.
+    - While the latest fetch has failed, an unknown kid is a server error rather than an invalid id_token:
+      the key set it would be in could not be checked.
+    """
+
+    def __init__(
+            self,
+            logger: Logger,
+            http_client: UpstreamHttpClient,
+            get_jwks_uri: Callable[[], str],
+            verify: bool = True,
+            refresh_margin: int = 300,
+            min_refetch_interval: int = 30
+    ):
+        self.logger = logger
+        self.http_client = http_client
+        self.get_jwks_uri = get_jwks_uri
+        self.verify = verify
+        self.refresh_margin = refresh_margin
+        self.min_refetch_interval = min_refetch_interval
+        self._keys: Dict[str, Any] = {}
+        self._expires_at = 0.0
+        self._fetched_at: Optional[float] = None
+        self._fetch_error: Optional[Exception] = None
+        self._lock = Lock()
+        self._background_refresh: Optional[Thread] = None
+
+    def get_signing_key(self, kid: Optional[str]) -> Any:
+        """
+        :raises InvalidIdToken: when no key with this kid is published
+        :raises TimeoutException: when the key set could not be fetched in time
+        :raises ServerException: when the key set could not be fetched
+        """
+        now = time.monotonic()
+        if now >= self._expires_at:
+            self._refresh(expected_expires_at=self._expires_at)
+        elif now >= self._expires_at - self.refresh_margin:
+            self._refresh_in_background()
+
+        key = self._keys.get(kid)
+        if key is None and self._can_refetch():
+            self._refresh(expected_expires_at=self._expires_at)
+            key = self._keys.get(kid)
+        if key is None and self._fetch_error is not None:
+            if isinstance(self._fetch_error, TimeoutException):
+                raise TimeoutException(f'Could not fetch the signing keys: {self._fetch_error}')
+            raise ServerException(f'Could not fetch the signing keys: {self._fetch_error}')
+        if key is None:
+            raise InvalidIdToken(f'Id token signed with unknown key: {kid}')
+
+        return key
+
+    def _can_refetch(self) -> bool:
+        return self._fetched_at is None or time.monotonic() - self._fetched_at >= self.min_refetch_interval
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._background_refresh is not None and self._background_refresh.is_alive():
+                return
+            self._background_refresh = Thread(target=self._refresh, args=(self._expires_at,), daemon=True)
+            self._background_refresh.start()
+
+    def _refresh(self, expected_expires_at: float):
+        with self._lock:
+            if self._expires_at != expected_expires_at:  # another thread refreshed the keys while we were waiting
+                return
+            self._fetch_keys()
+
+    def _fetch_keys(self):
+        self._fetched_at = time.monotonic()
+        jwks_uri = self.get_jwks_uri()
+        try:
+            response = self.http_client.get(jwks_uri, verify=self.verify)
+            response.raise_for_status()
+            jwks = response.json()
+        except (requests.RequestException, TimeoutException, ValueError) as e:
+            self.logger.warning(f'Could not refresh {jwks_uri}, serving stale keys: {e}')
+            self._fetch_error = e
+            self._expires_at = self._fetched_at + self.min_refetch_interval
+            return
+
+        keys = {}
+        for jwk in jwks.get('keys', []):
+            try:
+                keys[jwk.get('kid')] = jwt.PyJWK(jwk).key
+            except jwt.PyJWTError as e:
+                self.logger.warning(f'Skipping unusable key {jwk.get("kid")}: {e}')
+
+        self._keys = keys
+        self._fetch_error = None
+        self._expires_at = self._fetched_at + max(get_freshness_lifetime(response.headers), self.min_refetch_interval)
@@ -1,5 +1,5 @@
+from typing import Optional
 from uuid import uuid4
-import requests
 from app.business_logic.authentication_service import AuthenticationService
 from app.business_logic.exceptions import BackendRepositoryException, InvalidState, UnauthorizedException, \
     InvalidRefreshToken, ResourceNotFoundException
@@ -7,6 +7,7 @@ from app.business_logic.authentication_repository import AuthenticationRepositor
 from app.business_logic.models.authentication import AuthenticationState, UserInfo
 from app.business_logic.token_service import TokenService
 from app.adapters.service_adapters.identity_provider_client import IdentityProviderClient
+from app.adapters.service_adapters.upstream_http_client import UpstreamHttpClient
 from logging import Logger
 
 
@@ -20,6 +21,7 @@ class LocalAuthenticationService(AuthenticationService):
             backend_repository: AuthenticationRepository,
             identity_provider_service: IdentityProviderClient,
             token_service: TokenService,
+            http_client: UpstreamHttpClient,
             redirect_uri_prefix: str
     ):
         self.platform = platform
@@ -29,6 +31,7 @@ class LocalAuthenticationService(AuthenticationService):
         self.backend_repository = backend_repository
         self.identity_provider_service = identity_provider_service
         self.token_service = token_service
+        self.http_client = http_client
         self.redirect_uri_prefix = redirect_uri_prefix
 
     def validate_state(self, state: str):
@@ -37,7 +40,7 @@ class LocalAuthenticationService(AuthenticationService):
         """
         try:
             self.backend_repository.get_authentication_state(state)
-        except BackendRepositoryException:
+        except (BackendRepositoryException, UnauthorizedException):
             raise InvalidState('invalid state')
 
     def create_state(self) -> str:
@@ -45,21 +48,17 @@ class LocalAuthenticationService(AuthenticationService):
         auth_state = self.backend_repository.create_authentication_state(state)
         return auth_state.state
 
-    def _validate_state(self, state: str):
-        """
-        :raises InvalidState
-        """
-        try:
-            self.backend_repository.get_authentication_state(state)
-        except (BackendRepositoryException, UnauthorizedException):
-            raise InvalidState('invalid state')
-
-    def exchange_code_for_token(self, state: str, code: str, endpoint_uri: str) -> AuthenticationState:
-        self._validate_state(state)
-        token_endpoint = self.token_service.get_token_endpoint_from_well_known_url()
+    def exchange_code_for_token(
+            self, state: str, code: str, endpoint_uri: str, validate_state: bool = True,
+            token_endpoint: Optional[str] = None
+    ) -> AuthenticationState:
+        if validate_state:
+            self.validate_state(state)
+        if token_endpoint is None:
+            token_endpoint = self.token_service.get_token_endpoint_from_well_known_url()
         redirect_uri = f"{self.redirect_uri_prefix}{endpoint_uri}"
 
-        response = requests.post(
+        response = self.http_client.post(
             token_endpoint,
             data={
                 "code": code,
@@ -73,11 +72,14 @@ class LocalAuthenticationService(AuthenticationService):
         )
 
         if response.ok:
+            id_token = response.json()['id_token']
             return AuthenticationState(
                 state=state,
                 access_token=response.json()['access_token'],
                 refresh_token=response.json()['refresh_token'],
-                id_token=response.json()['id_token']
+                id_token=id_token,
+                # received straight from the token endpoint, so its signature does not need to be validated
+                user_info=self.token_service.parse_trusted_id_token(id_token, self.client_id)
             )
 
         raise UnauthorizedException(response.reason)
@@ -85,14 +87,18 @@ class LocalAuthenticationService(AuthenticationService):
     def temporarily_store_auth_state(self, auth_state: AuthenticationState):
         self.backend_repository.update_authentication_state(auth_state)
 
+    def validate_state_and_store_auth_state(self, auth_state: AuthenticationState):
+        self.backend_repository.validate_and_update_authentication_state(auth_state)
+
     def get_temporarily_stored_access_token(self, state: str, refresh_token: str) -> AuthenticationState:
         return self.backend_repository.pop_authentication_state(state, refresh_token)
 
     def revoke_refresh_token(self, refresh_token: str):
         return
 
-    def create_user(self, id_token: str) -> UserInfo:
-        user_info = self.token_service.validate_id_token(id_token, self.client_id)
+    def create_user(self, id_token: str, user_info: Optional[UserInfo] = None) -> UserInfo:
+        if user_info is None:
+            user_info = self.token_service.validate_id_token(id_token, self.client_id)
         self.identity_provider_service.sign_up_user(user_info)
 
         return user_info
@@ -102,7 +108,7 @@ class LocalAuthenticationService(AuthenticationService):
 
     def refresh_access_token(self, refresh_token: str) -> AuthenticationState:
         token_endpoint = self.token_service.get_token_endpoint_from_well_known_url()
-        response = requests.post(
+        response = self.http_client.post(
             token_endpoint,
             data={
                 "refresh_token": refresh_token,
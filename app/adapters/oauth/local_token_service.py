@@ -1,22 +1,44 @@
+from logging import Logger
 import jwt
-import requests
-from app.business_logic.models.authentication import UserInfo
+from app.adapters.oauth.openid_configuration_cache import OpenIdConfigurationCache
+from app.adapters.service_adapters.upstream_http_client import UpstreamHttpClient
+from app.business_logic.models.authentication import UserInfo, OpenIdConfiguration
 from app.business_logic.token_service import TokenService
 
 
 class LocalTokenService(TokenService):
+    well_known_url = 'https://authorization-server.local/auth/.well-known/openid-configuration'
+    fallback_configuration = OpenIdConfiguration(
+        token_endpoint='https://authorization-server.local/auth/token',
+        revocation_endpoint='https://authorization-server.local/auth/revoke'
+    )
+
+    def __init__(self, logger: Logger, http_client: UpstreamHttpClient):
+        self.openid_configuration_cache = OpenIdConfigurationCache(
+            logger,
+            http_client,
+            self.well_known_url,
+            self.fallback_configuration,
+            verify=False
+        )
+
     def validate_id_token(self, _id_token: str, client_id: str) -> UserInfo:
         payload = jwt.decode(_id_token, options={"verify_signature": False})
         return UserInfo(
             email=payload['email'],
             first_name=payload['name'],
-            external_identifier=payload['sub']
+            external_identifier=payload['sub'],
+            expires_at=payload.get('exp')
         )
 
+    def parse_trusted_id_token(self, _id_token: str, client_id: str) -> UserInfo:
+        return self.validate_id_token(_id_token, client_id)
+
+    def get_openid_configuration(self) -> OpenIdConfiguration:
+        return self.openid_configuration_cache.get()
+
     def get_token_endpoint_from_well_known_url(self) -> str:
-        response = requests.get(
-            'https://authorization-server.local/auth/.well-known/openid-configuration', verify=False)
-        if response.ok and 'token_endpoint' in response.json():
-            return str(response.json()['token_endpoint'])
+        return self.get_openid_configuration().token_endpoint
 
-        return "https://authorization-server.local/auth/token"
+    def get_revocation_endpoint_from_well_known_url(self) -> str:
+        return self.get_openid_configuration().revocation_endpoint or self.fallback_configuration.revocation_endpoint
@@ -0,0 +1,81 @@
+import time
+from logging import Logger
+from threading import Lock, Thread
+from typing import Optional
+import requests
+from app.adapters.concurrency.single_flight import SingleFlight
+from app.adapters.oauth.http_cache import get_freshness_lifetime
+from app.adapters.service_adapters.upstream_http_client import UpstreamHttpClient
+from app.business_logic.exceptions import TimeoutException
+from app.business_logic.models.authentication import OpenIdConfiguration
+
+
+class OpenIdConfigurationCache:
+    """
+    Keeps the OpenID discovery document of an authorization server in memory, for as long as the
+    Cache-Control/Expires headers of the discovery response allow.
+    - Once it expires, the stale document keeps being served while it gets revalidated in a background thread,
+      so that no caller waits for the network (stale-while-revalidate).
+    - Only the first fetch is waited for: the concurrent callers share it.
+    - If a fetch fails, the stale document (or the fallback one, when nothing was ever fetched)
+      is served and the fetch is retried after {retry_after_failure} seconds.
+    """
+
+    def __init__(
+            self,
+            logger: Logger,
+            http_client: UpstreamHttpClient,
+            well_known_url: str,
+            fallback_configuration: OpenIdConfiguration,
+            verify: bool = True,
+            retry_after_failure: int = 60
+    ):
+        self.logger = logger
+        self.http_client = http_client
+        self.well_known_url = well_known_url
+        self.fallback_configuration = fallback_configuration
+        self.verify = verify
+        self.retry_after_failure = retry_after_failure
+        self._configuration: Optional[OpenIdConfiguration] = None
+        self._expires_at = 0.0
+        self._single_flight = SingleFlight()
+        self._lock = Lock()
+        self._background_refresh: Optional[Thread] = None
+
+    def get(self) -> OpenIdConfiguration:
+        configuration = self._configuration
+        if configuration is None:
+            self._single_flight.do('fetch', self._fetch)
+            return self._configuration
+
+        if time.monotonic() >= self._expires_at:
+            self._refresh_in_background()
+        return configuration
+
+    def _refresh_in_background(self):
+        """
+        The lock only guards starting the refresh: the fetch itself runs outside of it.
+        """
+        with self._lock:
+            if time.monotonic() < self._expires_at:  # another thread refreshed it while we were waiting for the lock
+                return
+            if self._background_refresh is not None and self._background_refresh.is_alive():
+                return
+            self._background_refresh = Thread(target=self._fetch, daemon=True)
+            self._background_refresh.start()
+
+    def _fetch(self):
+        try:
+            response = self.http_client.get(self.well_known_url, verify=self.verify)
+            response.raise_for_status()
+            # a body that is not a JSON object raises TypeError
+            configuration = OpenIdConfiguration(**response.json())
+        except (requests.RequestException, TimeoutException, ValueError, TypeError) as e:
+            self.logger.warning(f'Could not refresh {self.well_known_url}, serving stale configuration: {e}')
+            self._expires_at = time.monotonic() + self.retry_after_failure
+            if self._configuration is None:
+                self._configuration = self.fallback_configuration
+            return
+
+        self._expires_at = time.monotonic() + get_freshness_lifetime(response.headers)
+        self._configuration = configuration
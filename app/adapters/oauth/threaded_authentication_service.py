@@ -0,0 +1,67 @@
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from app.adapters.concurrency.fan_out import gather_or_cancel
+from app.business_logic.async_authentication_service import AsyncAuthenticationService
+from app.business_logic.authentication_service import AuthenticationService
+from app.business_logic.models.authentication import AuthenticationState, UserInfo
+from app.business_logic.token_service import TokenService
+
+
+class ThreadedAuthenticationService(AsyncAuthenticationService):
+    """
+    Exposes a blocking AuthenticationService to the event loop, by running each of its calls on the threadpool.
+    This keeps the sync implementations usable behind the async routes.
+    """
+
+    def __init__(self, auth_service: AuthenticationService, token_service: TokenService):
+        self.auth_service = auth_service
+        self.token_service = token_service
+
+    async def create_state(self) -> str:
+        return await run_in_threadpool(self.auth_service.create_state)
+
+    async def validate_state(self, state: str):
+        return await run_in_threadpool(self.auth_service.validate_state, state)
+
+    async def exchange_code_for_token(
+            self, state: str, code: str, endpoint_uri: str, validate_state: bool = True
+    ) -> AuthenticationState:
+        get_token_endpoint = run_in_threadpool(self.token_service.get_token_endpoint_from_well_known_url)
+        if validate_state:
+            # the token endpoint gets resolved while the state is validated, and is passed on to the exchange
+            _, token_endpoint = await gather_or_cancel(self.validate_state(state), get_token_endpoint)
+        else:
+            token_endpoint = await get_token_endpoint
+        return await run_in_threadpool(
+            self.auth_service.exchange_code_for_token, state, code, endpoint_uri, False, token_endpoint
+        )
+
+    async def temporarily_store_auth_state(self, auth_state: AuthenticationState):
+        return await run_in_threadpool(self.auth_service.temporarily_store_auth_state, auth_state)
+
+    async def validate_state_and_store_auth_state(self, auth_state: AuthenticationState):
+        return await run_in_threadpool(self.auth_service.validate_state_and_store_auth_state, auth_state)
+
+    async def get_temporarily_stored_access_token(self, state: str, refresh_token: str) -> AuthenticationState:
+        return await run_in_threadpool(self.auth_service.get_temporarily_stored_access_token, state, refresh_token)
+
+    async def revoke_refresh_token(self, refresh_token: str):
+        return await run_in_threadpool(self.auth_service.revoke_refresh_token, refresh_token)
+
+    async def create_user(self, id_token: str, user_info: Optional[UserInfo] = None) -> UserInfo:
+        return await run_in_threadpool(self.auth_service.create_user, id_token, user_info)
+
+    async def get_user_info(self, id_token: str) -> UserInfo:
+        return await run_in_threadpool(self.auth_service.get_user_info, id_token)
+
+    async def refresh_access_token(self, refresh_token: str) -> AuthenticationState:
+        return await run_in_threadpool(self.auth_service.refresh_access_token, refresh_token)
+
+    async def ensure_user_exists(self, user_identifier: str):
+        return await run_in_threadpool(self.auth_service.ensure_user_exists, user_identifier)
+
+    async def store_auth_state_for_existing_user(self, auth_state: AuthenticationState, user_identifier: str):
+        await gather_or_cancel(
+            self.ensure_user_exists(user_identifier),
+            self.validate_state_and_store_auth_state(auth_state)
+        )
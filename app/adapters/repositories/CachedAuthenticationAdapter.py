@@ -0,0 +1,53 @@
+from logging import Logger
+from app.adapters.cache.ttl_lru_cache import TTLLRUCache
+from app.business_logic.authentication_repository import AuthenticationRepository
+from app.business_logic.models.authentication import AuthenticationState
+
+
+class CachedAuthenticationRepository(AuthenticationRepository):
+    """
+    Remembers, until they expire, the fresh states that this container created or already found in
+    {backend_repository}, so that validating the same state again (e.g. once when the popup gets the code
+    and once at the code exchange) does not hit the backend.
+    A state leaves the cache as soon as tokens are stored for it or it is popped. Only the container that did so
+    knows, so another warm container can still see a popped state as valid until it expires; the conditional
+    writes of the backend are not cached and keep rejecting it.
+    """
+
+    def __init__(self, logger: Logger, backend_repository: AuthenticationRepository, max_size: int):
+        self.logger = logger
+        self.backend_repository = backend_repository
+        self.fresh_states = TTLLRUCache(max_size)
+
+    def _remember(self, auth_state: AuthenticationState):
+        if auth_state.expires_at is not None:
+            self.fresh_states.set(auth_state.state, auth_state.expires_at, auth_state.expires_at)
+
+    def create_authentication_state(self, state: str) -> AuthenticationState:
+        auth_state = self.backend_repository.create_authentication_state(state)
+        self._remember(auth_state)
+
+        return auth_state
+
+    def get_authentication_state(self, state: str) -> AuthenticationState:
+        expires_at = self.fresh_states.get(state)
+        if expires_at is not None:
+            return AuthenticationState(state=state, expires_at=expires_at)
+
+        auth_state = self.backend_repository.get_authentication_state(state)
+        self._remember(auth_state)
+        self.logger.debug(f'fresh states cache: {self.fresh_states.get_stats()}')
+
+        return auth_state
+
+    def update_authentication_state(self, auth_state: AuthenticationState):
+        self.fresh_states.pop(auth_state.state)
+        self.backend_repository.update_authentication_state(auth_state)
+
+    def validate_and_update_authentication_state(self, auth_state: AuthenticationState):
+        self.fresh_states.pop(auth_state.state)
+        self.backend_repository.validate_and_update_authentication_state(auth_state)
+
+    def pop_authentication_state(self, state: str, refresh_token: str) -> AuthenticationState:
+        self.fresh_states.pop(state)
+        return self.backend_repository.pop_authentication_state(state, refresh_token)
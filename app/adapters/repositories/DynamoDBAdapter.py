@@ -1,34 +1,69 @@
+import time
 from app.business_logic.exceptions import BackendRepositoryException, UnauthorizedException, InvalidState
 from app.business_logic.authentication_repository import AuthenticationRepository
-from app.business_logic.models.authentication import AuthenticationState
+from app.business_logic.models.authentication import AuthenticationState, UserInfo
 from logging import Logger
 from botocore.exceptions import ClientError
 
 
 class DynamoDBRepository(AuthenticationRepository):
+    """
+    Every item carries an ExpiresAt (unix timestamp) attribute, which is the TTL attribute of the table:
+    - a fresh state lives for {state_ttl} seconds,
+    - a state holding tokens lives for {auth_state_ttl} seconds after the tokens are stored.
+    DynamoDB sweeps expired items lazily, so expired items that are still there are treated as missing.
+    """
 
     def __init__(
             self,
             logger: Logger,
-            get_repository_callback
+            get_repository_callback,
+            state_ttl: int,
+            auth_state_ttl: int
     ):
         self.logger = logger
         self.auth_table = get_repository_callback()
+        self.state_ttl = state_ttl
+        self.auth_state_ttl = auth_state_ttl
+
+    @staticmethod
+    def _serialize_user_info(user_info: UserInfo):
+        if user_info is None:
+            return None
+        return {
+            'Email': user_info.email,
+            'FirstName': user_info.first_name,
+            'ExternalIdentifier': user_info.external_identifier,
+            'ExpiresAt': user_info.expires_at
+        }
+
+    @staticmethod
+    def _deserialize_user_info(item: dict):
+        if not item.get('UserInfo'):
+            return None
+        return UserInfo(
+            email=item['UserInfo']['Email'],
+            first_name=item['UserInfo']['FirstName'],
+            external_identifier=item['UserInfo']['ExternalIdentifier'],
+            expires_at=int(item['UserInfo']['ExpiresAt']) if item['UserInfo']['ExpiresAt'] is not None else None
+        )
 
     def create_authentication_state(self, state: str) -> AuthenticationState:
+        expires_at = int(time.time()) + self.state_ttl
         try:
             self.auth_table.put_item(
                 Item={
-                    'State': state
+                    'State': state,
+                    'ExpiresAt': expires_at
                 }
             )
         except ClientError as e:
             raise BackendRepositoryException(f'Cannot create state: {str(e)}')
 
-        return AuthenticationState(state=state)
+        return AuthenticationState(state=state, expires_at=expires_at)
 
     def get_authentication_state(self, state: str) -> AuthenticationState:
-        fetch_only_fields = ['#state_reserved_word']
+        fetch_only_fields = ['#state_reserved_word', 'ExpiresAt']
         try:
             response = self.auth_table.get_item(
                 Key={'State': state},
@@ -38,23 +73,58 @@ class DynamoDBRepository(AuthenticationRepository):
         except ClientError as e:
             raise BackendRepositoryException(f'Cannot fetch state: {str(e)}')
 
-        if 'Item' in response and response['Item']:
-            return AuthenticationState(state=response['Item']['State'])
-        else:
+        if 'Item' not in response or not response['Item']:
             raise InvalidState('invalid state')
 
+        # items written before the TTL was introduced have no ExpiresAt
+        expires_at = response['Item'].get('ExpiresAt')
+        if expires_at is not None and int(expires_at) <= time.time():
+            raise InvalidState('expired state')
+
+        return AuthenticationState(
+            state=response['Item']['State'],
+            expires_at=int(expires_at) if expires_at is not None else None
+        )
+
     def update_authentication_state(self, auth_state: AuthenticationState):
         try:
             self.auth_table.update_item(
                 Key={'State': auth_state.state},
-                UpdateExpression="set AccessToken= :access_token, RefreshToken= :refresh_token, IdToken= :id_token",
+                UpdateExpression="set AccessToken= :access_token, RefreshToken= :refresh_token, IdToken= :id_token, "
+                                 "UserInfo= :user_info, ExpiresAt= :expires_at",
+                ExpressionAttributeValues={
+                    ':access_token': auth_state.access_token,
+                    ':refresh_token': auth_state.refresh_token,
+                    ':id_token': auth_state.id_token,
+                    ':user_info': self._serialize_user_info(auth_state.user_info),
+                    ':expires_at': int(time.time()) + self.auth_state_ttl,
+                },
+            )
+        except ClientError as e:
+            raise BackendRepositoryException(f'Could not update authentication data: {str(e)}')
+
+    def validate_and_update_authentication_state(self, auth_state: AuthenticationState):
+        now = int(time.time())
+        try:
+            self.auth_table.update_item(
+                Key={'State': auth_state.state},
+                UpdateExpression="set AccessToken= :access_token, RefreshToken= :refresh_token, IdToken= :id_token, "
+                                 "UserInfo= :user_info, ExpiresAt= :expires_at",
+                ConditionExpression="attribute_exists(#state_reserved_word) "
+                                    "AND (attribute_not_exists(ExpiresAt) OR ExpiresAt > :now)",
+                ExpressionAttributeNames={'#state_reserved_word': 'State'},
                 ExpressionAttributeValues={
                     ':access_token': auth_state.access_token,
                     ':refresh_token': auth_state.refresh_token,
                     ':id_token': auth_state.id_token,
+                    ':user_info': self._serialize_user_info(auth_state.user_info),
+                    ':expires_at': now + self.auth_state_ttl,
+                    ':now': now,
                 },
             )
         except ClientError as e:
+            if e.response['Error']['Code'] == "ConditionalCheckFailedException":
+                raise InvalidState('invalid state')
             raise BackendRepositoryException(f'Could not update authentication data: {str(e)}')
 
     def pop_authentication_state(self, state: str, refresh_token: str) -> AuthenticationState:
@@ -62,11 +132,13 @@ class DynamoDBRepository(AuthenticationRepository):
             # fetch_only_fields = ['AccessToken', 'IdToken']
             response = self.auth_table.delete_item(
                 Key={'State': state},
-                ConditionExpression="RefreshToken= :refresh_token",
+                ConditionExpression="RefreshToken= :refresh_token "
+                                    "AND (attribute_not_exists(ExpiresAt) OR ExpiresAt > :now)",
                 # ProjectionExpression=', '.join(fetch_only_fields),
                 ReturnValues="ALL_OLD",
                 ExpressionAttributeValues={
-                    ":refresh_token": refresh_token
+                    ":refresh_token": refresh_token,
+                    ":now": int(time.time())
                 },
             )
         except ClientError as e:
@@ -80,5 +152,6 @@ class DynamoDBRepository(AuthenticationRepository):
             state=state,
             refresh_token=refresh_token,
             access_token=response['Attributes']['AccessToken'],
-            id_token=response['Attributes']['IdToken']
+            id_token=response['Attributes']['IdToken'],
+            user_info=self._deserialize_user_info(response['Attributes'])
         )
@@ -0,0 +1,169 @@
+import time
+from app.business_logic.exceptions import BackendRepositoryException, UnauthorizedException, InvalidState
+from app.business_logic.authentication_repository import AuthenticationRepository
+from app.business_logic.models.authentication import AuthenticationState, UserInfo
+from logging import Logger
+from botocore.exceptions import ClientError
+
+
+class DynamoDBClientRepository(AuthenticationRepository):
+    """
+    Same table layout and semantics as DynamoDBRepository, built on the low-level boto3 client instead of
+    the Table resource: the client is cheaper to construct on a cold start, and the attribute values are
+    marshalled here ({'S': ...}, {'N': ...}) instead of going through the resource's TypeSerializer on every call.
+    """
+    state_attribute_names = {'#state_reserved_word': 'State'}
+    fetch_only_fields = '#state_reserved_word, ExpiresAt'
+    update_tokens_expression = "set AccessToken= :access_token, RefreshToken= :refresh_token, IdToken= :id_token, " \
+                               "UserInfo= :user_info, ExpiresAt= :expires_at"
+    state_is_valid_condition = "attribute_exists(#state_reserved_word) " \
+                               "AND (attribute_not_exists(ExpiresAt) OR ExpiresAt > :now)"
+    pop_condition = "RefreshToken= :refresh_token AND (attribute_not_exists(ExpiresAt) OR ExpiresAt > :now)"
+    null_value = {'NULL': True}
+
+    def __init__(
+            self,
+            logger: Logger,
+            get_client_callback,
+            auth_table_name: str,
+            state_ttl: int,
+            auth_state_ttl: int
+    ):
+        self.logger = logger
+        self.client = get_client_callback()
+        self.auth_table_name = auth_table_name
+        self.state_ttl = state_ttl
+        self.auth_state_ttl = auth_state_ttl
+        # the parameters every request of a kind shares are built once: a call only adds its own key and values
+        self._get_item_parameters = {
+            'TableName': auth_table_name,
+            'ProjectionExpression': self.fetch_only_fields,
+            'ExpressionAttributeNames': self.state_attribute_names,
+        }
+        self._update_item_parameters = {
+            'TableName': auth_table_name,
+            'UpdateExpression': self.update_tokens_expression,
+        }
+        self._validate_and_update_item_parameters = {
+            **self._update_item_parameters,
+            'ConditionExpression': self.state_is_valid_condition,
+            'ExpressionAttributeNames': self.state_attribute_names,
+        }
+        self._delete_item_parameters = {
+            'TableName': auth_table_name,
+            'ConditionExpression': self.pop_condition,
+            'ReturnValues': 'ALL_OLD',
+        }
+
+    @classmethod
+    def _serialize_user_info(cls, user_info: UserInfo) -> dict:
+        if user_info is None:
+            return cls.null_value
+        return {'M': {
+            'Email': {'S': user_info.email},
+            'FirstName': {'S': user_info.first_name},
+            'ExternalIdentifier': {'S': user_info.external_identifier},
+            'ExpiresAt': {'N': str(user_info.expires_at)} if user_info.expires_at is not None else cls.null_value
+        }}
+
+    @staticmethod
+    def _deserialize_user_info(item: dict):
+        if 'M' not in item.get('UserInfo', {}):
+            return None
+        user_info = item['UserInfo']['M']
+        return UserInfo(
+            email=user_info['Email']['S'],
+            first_name=user_info['FirstName']['S'],
+            external_identifier=user_info['ExternalIdentifier']['S'],
+            expires_at=int(user_info['ExpiresAt']['N']) if 'N' in user_info['ExpiresAt'] else None
+        )
+
+    def _get_token_values(self, auth_state: AuthenticationState, expires_at: int) -> dict:
+        return {
+            ':access_token': {'S': auth_state.access_token},
+            ':refresh_token': {'S': auth_state.refresh_token},
+            ':id_token': {'S': auth_state.id_token},
+            ':user_info': self._serialize_user_info(auth_state.user_info),
+            ':expires_at': {'N': str(expires_at)},
+        }
+
+    def create_authentication_state(self, state: str) -> AuthenticationState:
+        expires_at = int(time.time()) + self.state_ttl
+        try:
+            self.client.put_item(
+                TableName=self.auth_table_name,
+                Item={
+                    'State': {'S': state},
+                    'ExpiresAt': {'N': str(expires_at)}
+                }
+            )
+        except ClientError as e:
+            raise BackendRepositoryException(f'Cannot create state: {str(e)}')
+
+        return AuthenticationState(state=state, expires_at=expires_at)
+
+    def get_authentication_state(self, state: str) -> AuthenticationState:
+        try:
+            response = self.client.get_item(Key={'State': {'S': state}}, **self._get_item_parameters)
+        except ClientError as e:
+            raise BackendRepositoryException(f'Cannot fetch state: {str(e)}')
+
+        if 'Item' not in response or not response['Item']:
+            raise InvalidState('invalid state')
+
+        # items written before the TTL was introduced have no ExpiresAt
+        expires_at = int(response['Item']['ExpiresAt']['N']) if 'ExpiresAt' in response['Item'] else None
+        if expires_at is not None and expires_at <= time.time():
+            raise InvalidState('expired state')
+
+        return AuthenticationState(state=response['Item']['State']['S'], expires_at=expires_at)
+
+    def update_authentication_state(self, auth_state: AuthenticationState):
+        try:
+            self.client.update_item(
+                Key={'State': {'S': auth_state.state}},
+                ExpressionAttributeValues=self._get_token_values(auth_state, int(time.time()) + self.auth_state_ttl),
+                **self._update_item_parameters
+            )
+        except ClientError as e:
+            raise BackendRepositoryException(f'Could not update authentication data: {str(e)}')
+
+    def validate_and_update_authentication_state(self, auth_state: AuthenticationState):
+        now = int(time.time())
+        values = self._get_token_values(auth_state, now + self.auth_state_ttl)
+        values[':now'] = {'N': str(now)}
+        try:
+            self.client.update_item(
+                Key={'State': {'S': auth_state.state}},
+                ExpressionAttributeValues=values,
+                **self._validate_and_update_item_parameters
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == "ConditionalCheckFailedException":
+                raise InvalidState('invalid state')
+            raise BackendRepositoryException(f'Could not update authentication data: {str(e)}')
+
+    def pop_authentication_state(self, state: str, refresh_token: str) -> AuthenticationState:
+        try:
+            response = self.client.delete_item(
+                Key={'State': {'S': state}},
+                ExpressionAttributeValues={
+                    ":refresh_token": {'S': refresh_token},
+                    ":now": {'N': str(int(time.time()))}
+                },
+                **self._delete_item_parameters
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == "ConditionalCheckFailedException":
+                raise UnauthorizedException(f'No data found for state: {state}, refresh_token: {refresh_token}')
+            else:
+                raise BackendRepositoryException(
+                    f'Delete failed access_token for: {state}, refresh_token: {refresh_token}')
+
+        return AuthenticationState(
+            state=state,
+            refresh_token=refresh_token,
+            access_token=response['Attributes']['AccessToken']['S'],
+            id_token=response['Attributes']['IdToken']['S'],
+            user_info=self._deserialize_user_info(response['Attributes'])
+        )
@@ -0,0 +1,119 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import List
+from app.business_logic.exceptions import UnauthorizedException, InvalidState
+from app.business_logic.authentication_repository import AuthenticationRepository
+from app.business_logic.models.authentication import AuthenticationState
+
+
+class _Stripe:
+    __slots__ = ('lock', 'items')
+
+    def __init__(self):
+        self.lock = Lock()
+        # state -> [expires_at, access_token, refresh_token, id_token, user_info], least recently written first
+        self.items: 'OrderedDict[str, list]' = OrderedDict()
+
+
+class InMemoryRepository(AuthenticationRepository):
+    """
+    Process-local repository, for local runs and single-process deployments. States are spread over
+    {stripes} independently locked partitions, so that concurrent logins rarely contend on the same lock.
+    Items expire like in DynamoDBRepository ({state_ttl}, then {auth_state_ttl} once tokens are stored);
+    each partition holds at most max_size / stripes items, and evicts its least recently written item when full.
+    """
+
+    def __init__(self, state_ttl: int, auth_state_ttl: int, max_size: int, stripes: int):
+        self.state_ttl = state_ttl
+        self.auth_state_ttl = auth_state_ttl
+        self.stripe_max_size = max(1, max_size // stripes)
+        self._stripes: List[_Stripe] = [_Stripe() for _ in range(stripes)]
+
+    def _get_stripe(self, state: str) -> _Stripe:
+        return self._stripes[hash(state) % len(self._stripes)]
+
+    def _insert(self, stripe: _Stripe, state: str, item: list):
+        """
+        Must be called holding {stripe.lock}.
+        """
+        stripe.items[state] = item
+        stripe.items.move_to_end(state)
+        if len(stripe.items) <= self.stripe_max_size:
+            return
+
+        # write order is close to expiry order, so expired items are swept from the front
+        now = time.time()
+        stripe.items.popitem(last=False)
+        while stripe.items and next(iter(stripe.items.values()))[0] <= now:
+            stripe.items.popitem(last=False)
+
+    @staticmethod
+    def _get_valid_item(stripe: _Stripe, state: str):
+        """
+        Must be called holding {stripe.lock}.
+        """
+        item = stripe.items.get(state)
+        if item is not None and item[0] <= time.time():
+            del stripe.items[state]
+            return None
+        return item
+
+    def create_authentication_state(self, state: str) -> AuthenticationState:
+        expires_at = int(time.time()) + self.state_ttl
+        stripe = self._get_stripe(state)
+        with stripe.lock:
+            self._insert(stripe, state, [expires_at, None, None, None, None])
+
+        return AuthenticationState(state=state, expires_at=expires_at)
+
+    def get_authentication_state(self, state: str) -> AuthenticationState:
+        stripe = self._get_stripe(state)
+        with stripe.lock:
+            item = self._get_valid_item(stripe, state)
+        if item is None:
+            raise InvalidState('invalid state')
+
+        return AuthenticationState(state=state, expires_at=item[0])
+
+    def update_authentication_state(self, auth_state: AuthenticationState):
+        item = [
+            int(time.time()) + self.auth_state_ttl,
+            auth_state.access_token,
+            auth_state.refresh_token,
+            auth_state.id_token,
+            auth_state.user_info
+        ]
+        stripe = self._get_stripe(auth_state.state)
+        with stripe.lock:
+            self._insert(stripe, auth_state.state, item)
+
+    def validate_and_update_authentication_state(self, auth_state: AuthenticationState):
+        item = [
+            int(time.time()) + self.auth_state_ttl,
+            auth_state.access_token,
+            auth_state.refresh_token,
+            auth_state.id_token,
+            auth_state.user_info
+        ]
+        stripe = self._get_stripe(auth_state.state)
+        with stripe.lock:
+            if self._get_valid_item(stripe, auth_state.state) is None:
+                raise InvalidState('invalid state')
+            self._insert(stripe, auth_state.state, item)
+
+    def pop_authentication_state(self, state: str, refresh_token: str) -> AuthenticationState:
+        stripe = self._get_stripe(state)
+        with stripe.lock:
+            item = self._get_valid_item(stripe, state)
+            if item is None or item[2] != refresh_token:
+                raise UnauthorizedException(f'No data found for state: {state}, refresh_token: {refresh_token}')
+            del stripe.items[state]
+
+        return AuthenticationState(
+            state=state,
+            refresh_token=refresh_token,
+            access_token=item[1],
+            id_token=item[3],
+            user_info=item[4]
+        )
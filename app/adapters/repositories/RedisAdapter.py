@@ -0,0 +1,114 @@
+import json
+import time
+from logging import Logger
+from redis import Redis, RedisError, WatchError
+from app.business_logic.exceptions import BackendRepositoryException, UnauthorizedException, InvalidState
+from app.business_logic.authentication_repository import AuthenticationRepository
+from app.business_logic.models.authentication import AuthenticationState, UserInfo
+
+
+class RedisRepository(AuthenticationRepository):
+    """
+    Every state is a single key, {key_prefix}{state}, holding a JSON object with the tokens ('{}' until they are
+    stored). Expiry is left to Redis: a fresh state lives for {state_ttl} seconds, a state holding tokens for
+    {auth_state_ttl} seconds after the tokens are stored.
+    """
+
+    def __init__(
+            self,
+            logger: Logger,
+            get_client_callback,
+            key_prefix: str,
+            state_ttl: int,
+            auth_state_ttl: int
+    ):
+        self.logger = logger
+        self.client: Redis = get_client_callback()
+        self.key_prefix = key_prefix
+        self.state_ttl = state_ttl
+        self.auth_state_ttl = auth_state_ttl
+
+    def _get_key(self, state: str) -> str:
+        return f'{self.key_prefix}{state}'
+
+    @staticmethod
+    def _serialize_tokens(auth_state: AuthenticationState) -> str:
+        return json.dumps({
+            'access_token': auth_state.access_token,
+            'refresh_token': auth_state.refresh_token,
+            'id_token': auth_state.id_token,
+            'user_info': auth_state.user_info.dict() if auth_state.user_info is not None else None
+        })
+
+    def create_authentication_state(self, state: str) -> AuthenticationState:
+        try:
+            created = self.client.set(self._get_key(state), '{}', nx=True, ex=self.state_ttl)
+        except RedisError as e:
+            raise BackendRepositoryException(f'Cannot create state: {str(e)}')
+
+        if not created:
+            raise BackendRepositoryException(f'Cannot create state: {state} already exists')
+
+        return AuthenticationState(state=state, expires_at=int(time.time()) + self.state_ttl)
+
+    def get_authentication_state(self, state: str) -> AuthenticationState:
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            pipeline.exists(self._get_key(state))
+            pipeline.ttl(self._get_key(state))
+            exists, ttl = pipeline.execute()
+        except RedisError as e:
+            raise BackendRepositoryException(f'Cannot fetch state: {str(e)}')
+
+        if not exists:
+            raise InvalidState('invalid state')
+
+        return AuthenticationState(state=state, expires_at=int(time.time()) + ttl if ttl >= 0 else None)
+
+    def update_authentication_state(self, auth_state: AuthenticationState):
+        try:
+            self.client.set(self._get_key(auth_state.state), self._serialize_tokens(auth_state), ex=self.auth_state_ttl)
+        except RedisError as e:
+            raise BackendRepositoryException(f'Could not update authentication data: {str(e)}')
+
+    def validate_and_update_authentication_state(self, auth_state: AuthenticationState):
+        try:
+            # XX: only overwrite a state that still exists, i.e. has not expired or been popped
+            updated = self.client.set(
+                self._get_key(auth_state.state),
+                self._serialize_tokens(auth_state),
+                xx=True,
+                ex=self.auth_state_ttl
+            )
+        except RedisError as e:
+            raise BackendRepositoryException(f'Could not update authentication data: {str(e)}')
+
+        if not updated:
+            raise InvalidState('invalid state')
+
+    def pop_authentication_state(self, state: str, refresh_token: str) -> AuthenticationState:
+        key = self._get_key(state)
+        try:
+            with self.client.pipeline() as pipeline:
+                # the delete only goes through if nobody touched the key since it was read
+                pipeline.watch(key)
+                value = pipeline.get(key)
+                tokens = json.loads(value) if value is not None else {}
+                if tokens.get('refresh_token') != refresh_token:
+                    raise UnauthorizedException(f'No data found for state: {state}, refresh_token: {refresh_token}')
+
+                pipeline.multi()
+                pipeline.delete(key)
+                pipeline.execute()
+        except WatchError:
+            raise UnauthorizedException(f'No data found for state: {state}, refresh_token: {refresh_token}')
+        except RedisError:
+            raise BackendRepositoryException(f'Delete failed access_token for: {state}, refresh_token: {refresh_token}')
+
+        return AuthenticationState(
+            state=state,
+            refresh_token=refresh_token,
+            access_token=tokens['access_token'],
+            id_token=tokens['id_token'],
+            user_info=UserInfo(**tokens['user_info']) if tokens.get('user_info') else None
+        )
@@ -0,0 +1,95 @@
+import base64
+import hashlib
+import hmac
+import time
+from app.adapters.cache.ttl_lru_cache import TTLLRUCache
+from app.business_logic.authentication_repository import AuthenticationRepository
+from app.business_logic.exceptions import InvalidState
+from app.business_logic.models.authentication import AuthenticationState
+
+
+class SignedStateAuthenticationRepository(AuthenticationRepository):
+    """
+    Stateless states: instead of storing a fresh state, the state is returned as '<uuid>.<expires_at>.<signature>',
+    an HMAC-SHA256 over the uuid and the expiry, and it gets validated by checking that signature.
+    {backend_repository} is only written to once there are tokens to store (every backend upserts on update).
+
+    A state that already stored tokens is kept in a bounded in-process replay filter until it expires,
+    and cannot be used again. The filter is per process, so it only catches replays within one worker.
+    """
+
+    def __init__(
+            self,
+            backend_repository: AuthenticationRepository,
+            private_key: str,
+            state_ttl: int,
+            replay_filter_size: int
+    ):
+        self.backend_repository = backend_repository
+        # a key of its own, so that a state signature can never be reused as anything else signed with PRIVATE_KEY
+        self._signing_key = hashlib.sha256(b'authentication-state:' + private_key.encode()).digest()
+        self.state_ttl = state_ttl
+        self.used_states = TTLLRUCache(replay_filter_size)
+
+    def _sign(self, payload: str) -> str:
+        digest = hmac.new(self._signing_key, payload.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+    def _get_expiry(self, state: str) -> int:
+        """
+        :raises InvalidState: when the signature does not match or the state has expired
+        """
+        payload, _, signature = state.rpartition('.')
+        _, _, expires_at = payload.partition('.')
+        try:
+            # compared as bytes: compare_digest rejects str holding non ASCII characters
+            is_valid = expires_at.isascii() and expires_at.isdigit() and \
+                hmac.compare_digest(signature.encode(), self._sign(payload).encode())
+        except UnicodeError:
+            is_valid = False
+        if not is_valid:
+            raise InvalidState('invalid state')
+
+        if int(expires_at) <= time.time():
+            raise InvalidState('expired state')
+
+        return int(expires_at)
+
+    def create_authentication_state(self, state: str) -> AuthenticationState:
+        expires_at = int(time.time()) + self.state_ttl
+        payload = f'{state}.{expires_at}'
+
+        return AuthenticationState(state=f'{payload}.{self._sign(payload)}', expires_at=expires_at)
+
+    def get_authentication_state(self, state: str) -> AuthenticationState:
+        expires_at = self._get_expiry(state)
+        if self.used_states.get(state) is not None:
+            raise InvalidState('used state')
+
+        return AuthenticationState(state=state, expires_at=expires_at)
+
+    def update_authentication_state(self, auth_state: AuthenticationState):
+        self._store_once(auth_state)
+
+    def validate_and_update_authentication_state(self, auth_state: AuthenticationState):
+        self._store_once(auth_state)
+
+    def _store_once(self, auth_state: AuthenticationState):
+        """
+        The state is claimed in the replay filter before the write, so that a concurrent replay gets rejected,
+        and released again if the write fails, so that it is not used up.
+        :raises InvalidState
+        :raises BackendRepositoryException
+        """
+        expires_at = self._get_expiry(auth_state.state)
+        if not self.used_states.add(auth_state.state, True, expires_at):
+            raise InvalidState('used state')
+
+        try:
+            self.backend_repository.update_authentication_state(auth_state)
+        except BaseException:
+            self.used_states.pop(auth_state.state)
+            raise
+
+    def pop_authentication_state(self, state: str, refresh_token: str) -> AuthenticationState:
+        return self.backend_repository.pop_authentication_state(state, refresh_token)
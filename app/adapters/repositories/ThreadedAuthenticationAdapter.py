@@ -0,0 +1,29 @@
+from starlette.concurrency import run_in_threadpool
+from app.business_logic.async_authentication_repository import AsyncAuthenticationRepository
+from app.business_logic.authentication_repository import AuthenticationRepository
+from app.business_logic.models.authentication import AuthenticationState
+
+
+class ThreadedAuthenticationRepository(AsyncAuthenticationRepository):
+    """
+    Exposes a blocking AuthenticationRepository (e.g. the boto3 based DynamoDBRepository) to the event loop,
+    by running each of its calls on the threadpool.
+    """
+
+    def __init__(self, backend_repository: AuthenticationRepository):
+        self.backend_repository = backend_repository
+
+    async def create_authentication_state(self, state: str) -> AuthenticationState:
+        return await run_in_threadpool(self.backend_repository.create_authentication_state, state)
+
+    async def get_authentication_state(self, state: str) -> AuthenticationState:
+        return await run_in_threadpool(self.backend_repository.get_authentication_state, state)
+
+    async def update_authentication_state(self, auth_state: AuthenticationState):
+        return await run_in_threadpool(self.backend_repository.update_authentication_state, auth_state)
+
+    async def validate_and_update_authentication_state(self, auth_state: AuthenticationState):
+        return await run_in_threadpool(self.backend_repository.validate_and_update_authentication_state, auth_state)
+
+    async def pop_authentication_state(self, state: str, refresh_token: str) -> AuthenticationState:
+        return await run_in_threadpool(self.backend_repository.pop_authentication_state, state, refresh_token)
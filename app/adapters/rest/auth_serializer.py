@@ -1,7 +1,6 @@
 from fastapi import Request
-from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
 from starlette.responses import Response, RedirectResponse, JSONResponse
-from app.adapters.rest.dtos.access_token import AccessTokenDTO
 from app.adapters.rest.dtos.exceptions import get_error_code_for_exception
 from app.business_logic.exceptions import ResourceNotFoundException, ServerException
 from app.adapters.rest.dtos.cookies import RefreshTokenCookie, StateCookie
@@ -16,11 +15,43 @@ class Serializer:
         Serialization also includes adding the appropriate cookies to the redirect requests.
     """
 
-    def __init__(self, backend_url: str, private_key: str, stage: str, authentication_route_prefix: str):
+    def __init__(
+            self,
+            backend_url: str,
+            private_key: str,
+            stage: str,
+            authentication_route_prefix: str,
+            state_cookie_version: int = StateCookie.LEGACY_VERSION
+    ):
         self.backend_url = backend_url
         self.private_key = private_key
         self.stage = stage
         self.authentication_route_prefix = authentication_route_prefix
+        self.state_cookie_version = state_cookie_version
+
+        # the error and logout responses never change: they are built (and their cookies signed) once
+        self._user_already_exists_response = self._build_user_already_exists_response()
+        self._invalid_id_token_response = self._build_invalid_id_token_response()
+        self._unauthorized_response = self._build_unauthorized_response()
+        self._invalid_refresh_token_response = self._build_invalid_refresh_token_response()
+        self._logout_response = self._build_logout_response()
+
+    @staticmethod
+    def _clone_response(prebuilt: Response) -> Response:
+        """
+        The clone gets its own list of headers, so that cookies can still be added to it.
+        """
+        response = Response(status_code=prebuilt.status_code)
+        response.raw_headers = list(prebuilt.raw_headers)
+        return response
+
+    @staticmethod
+    def _get_access_token_response(access_token: str) -> Response:
+        """
+        The body of an AccessTokenDTO, encoded straight to bytes with orjson: no pydantic model in between.
+        AccessTokenDTO stays the response_model the token endpoints are documented with.
+        """
+        return ORJSONResponse({'access_token': access_token})
 
     @staticmethod
     def get_refresh_cookie_from_request(request: Request) -> RefreshTokenCookie:
@@ -41,7 +72,7 @@ class Serializer:
     def redirect_to_home_with_state(self, state: str) -> Response:
         response = RedirectResponse(self.backend_url, 302)
         session_cookie = StateCookie(session_identifier=state)
-        session_cookie.add_cookie_to_response(response, self.private_key)
+        session_cookie.add_cookie_to_response(response, self.private_key, version=self.state_cookie_version)
         return response
 
     def redirect_to_home_with_refresh_token(self, auth_data: AuthenticationState) -> Response:
@@ -50,7 +81,7 @@ class Serializer:
             session_identifier=auth_data.state,
             refresh_token_is_set=True
         )
-        session_cookie.add_cookie_to_response(response, self.private_key)
+        session_cookie.add_cookie_to_response(response, self.private_key, version=self.state_cookie_version)
         refresh_cookie = RefreshTokenCookie(
             refresh_token=auth_data.refresh_token,
             path_id='exchange_refresh_for_access_token'
@@ -59,21 +90,27 @@ class Serializer:
         return response
 
     def get_user_already_exists_response(self) -> Response:
+        return self._clone_response(self._user_already_exists_response)
+
+    def _build_user_already_exists_response(self) -> Response:
         response = RedirectResponse(self.backend_url, 302)
         session_cookie = StateCookie(
             error_code=402,
             error_desc='user exists, please login'
         )
-        session_cookie.add_cookie_to_response(response, self.private_key)
+        session_cookie.add_cookie_to_response(response, self.private_key, version=self.state_cookie_version)
         return response
 
     def get_invalid_id_token_response(self) -> Response:
+        return self._clone_response(self._invalid_id_token_response)
+
+    def _build_invalid_id_token_response(self) -> Response:
         response = RedirectResponse(self.backend_url, 302)
         session_cookie = StateCookie(
             error_code=403,
             error_desc='Failed to create user, unexpected id_token'
         )
-        session_cookie.add_cookie_to_response(response, self.private_key)
+        session_cookie.add_cookie_to_response(response, self.private_key, version=self.state_cookie_version)
         return response
 
     def redirect_after_user_creation(self, auth_data: AuthenticationState, user_info: UserInfo) -> Response:
@@ -85,7 +122,7 @@ class Serializer:
                 'username': user_info.first_name
             }
         )
-        session_cookie.add_cookie_to_response(response, self.private_key)
+        session_cookie.add_cookie_to_response(response, self.private_key, version=self.state_cookie_version)
         refresh_cookie = RefreshTokenCookie(
             refresh_token=auth_data.refresh_token,
             path_id='refresh_token_grant'
@@ -94,7 +131,7 @@ class Serializer:
         return response
 
     def redirect_with_access_refresh_token(self, auth_data: AuthenticationState, user_info: UserInfo) -> Response:
-        response = JSONResponse(content=jsonable_encoder(AccessTokenDTO.get_dto(auth_data.access_token)))
+        response = self._get_access_token_response(auth_data.access_token)
         refresh_cookie = RefreshTokenCookie(refresh_token=auth_data.refresh_token, path_id='refresh_token_grant')
         refresh_cookie.delete_cookie_from_response(response, self.stage, self.authentication_route_prefix)
         refresh_cookie.add_cookie_to_response(response, self.stage, self.authentication_route_prefix)
@@ -104,37 +141,43 @@ class Serializer:
                 'username': user_info.first_name
             }
         )
-        session_cookie.add_cookie_to_response(response, self.private_key)
+        session_cookie.add_cookie_to_response(response, self.private_key, version=self.state_cookie_version)
         return response
 
     def get_unauthorized_response(self) -> Response:
+        return self._clone_response(self._unauthorized_response)
+
+    def _build_unauthorized_response(self) -> Response:
         response = RedirectResponse(self.backend_url, 302)
         session_cookie = StateCookie(
             error_code=401,
             error_desc='unauthorized'
         )
-        session_cookie.add_cookie_to_response(response, self.private_key)
+        session_cookie.add_cookie_to_response(response, self.private_key, version=self.state_cookie_version)
         return response
 
     def get_invalid_refresh_token_response(self) -> Response:
+        return self._clone_response(self._invalid_refresh_token_response)
+
+    def _build_invalid_refresh_token_response(self) -> Response:
         response = RedirectResponse(self.backend_url, 302)
         session_cookie = StateCookie(
             error_code=401,
             error_desc='refresh_token invalid or expired'
         )
-        session_cookie.add_cookie_to_response(response, self.private_key)
+        session_cookie.add_cookie_to_response(response, self.private_key, version=self.state_cookie_version)
         self.delete_refresh_cookies_from_response(response, path_id='refresh_token_grant')
         return response
 
     def get_refresh_token_response(self, auth_data: AuthenticationState, user_info: UserInfo) -> Response:
-        response = JSONResponse(content=jsonable_encoder(AccessTokenDTO.get_dto(auth_data.access_token)))
+        response = self._get_access_token_response(auth_data.access_token)
         session_cookie = StateCookie(
             refresh_token_is_set=True,
             user_info={
                 'username': user_info.first_name
             }
         )
-        session_cookie.add_cookie_to_response(response, self.private_key)
+        session_cookie.add_cookie_to_response(response, self.private_key, version=self.state_cookie_version)
         refresh_cookie = RefreshTokenCookie(
             refresh_token=auth_data.refresh_token,
             path_id='refresh_token_grant'
@@ -142,7 +185,10 @@ class Serializer:
         refresh_cookie.add_cookie_to_response(response, self.stage, self.authentication_route_prefix)
         return response
 
-    def get_logout_response(self):
+    def get_logout_response(self) -> Response:
+        return self._clone_response(self._logout_response)
+
+    def _build_logout_response(self) -> Response:
         response = RedirectResponse(self.backend_url, status_code=303)
         self.delete_refresh_cookies_from_response(response, path_id='refresh_token_grant')
         session_cookie = StateCookie()
@@ -159,7 +205,7 @@ class Serializer:
             error_code=500,
             error_desc=str(exception)
         )
-        session_cookie.add_cookie_to_response(response, self.private_key)
+        session_cookie.add_cookie_to_response(response, self.private_key, version=self.state_cookie_version)
         return response
 
     def redirect_after_popup_window_gets_code(self, code: str):
@@ -168,7 +214,7 @@ class Serializer:
             redirected_from_popup=True,
             code=code
         )
-        session_cookie.add_cookie_to_response(response, self.private_key)
+        session_cookie.add_cookie_to_response(response, self.private_key, version=self.state_cookie_version)
         return response
 
     def redirect_after_popup_window_gets_code_during_signup(self, code: str):
@@ -178,5 +224,5 @@ class Serializer:
             code=code,
             session_state='signup'
         )
-        session_cookie.add_cookie_to_response(response, self.private_key)
+        session_cookie.add_cookie_to_response(response, self.private_key, version=self.state_cookie_version)
         return response
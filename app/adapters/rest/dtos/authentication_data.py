@@ -9,7 +9,8 @@ class AuthenticationDataDTO(BaseModel):
     @validator('state', pre=True)
     def state_validations(cls, v):
         """
-        Ensures that state is a string containing a valid uuid
+        Ensures that state is a string starting with a valid uuid: either the uuid itself,
+        or a signed state ('<uuid>.<expires_at>.<signature>')
         :raises InvalidState
         """
         if not v:
@@ -19,7 +20,7 @@ class AuthenticationDataDTO(BaseModel):
             raise InvalidState
 
         try:
-            UUID(v)
+            UUID(v.partition('.')[0])
         except ValueError:
             raise InvalidState
 
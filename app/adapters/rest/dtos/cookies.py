@@ -1,14 +1,51 @@
+import base64
+import hashlib
+import hmac
 from dataclasses import dataclass, asdict
+from functools import lru_cache
 from typing import Optional, ClassVar
 import jwt
+import orjson
 from starlette.requests import Request
 from starlette.responses import Response
 
 
+def _base64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+@lru_cache(maxsize=8)
+def _get_hmac(private_key: str) -> hmac.HMAC:
+    """
+    The key schedule is computed once per key: signing copies this object instead of building a new one.
+    """
+    return hmac.new(private_key.encode(), digestmod=hashlib.sha256)
+
+
 @dataclass
 class StateCookie:
+    """
+    The cookie the frontend reads the outcome of a redirect from, as a JWT signed with HS256.
+    - version 1 (legacy): the payload holds every field under its full name.
+    - version 2 (compact): the payload holds {'v': 2} and only the fields not left to their default (None / False),
+      under the short keys of {compact_keys}.
+    Version 1 is sent unless STATE_COOKIE_VERSION is set to 2, once the frontend reads the compact one.
+    """
     cookie_name: ClassVar[str] = 'sd'
     algorithm: ClassVar[str] = 'HS256'
+    LEGACY_VERSION: ClassVar[int] = 1
+    COMPACT_VERSION: ClassVar[int] = 2
+    compact_keys: ClassVar[dict] = {
+        'session_identifier': 's',
+        'error_code': 'e',
+        'error_desc': 'd',
+        'refresh_token_is_set': 'r',
+        'user_info': 'u',
+        'redirected_from_popup': 'p',
+        'code': 'c',
+        'session_state': 'ss'
+    }
+    compact_header: ClassVar[bytes] = _base64url_encode(orjson.dumps({'alg': 'HS256', 'typ': 'JWT'}))
 
     session_identifier: Optional[str] = None
     error_code: Optional[int] = None
@@ -19,15 +56,32 @@ class StateCookie:
     code: Optional[str] = None
     session_state: Optional[str] = None
 
-    def as_jwt(self, private_key: str) -> str:
-        encoded = jwt.encode(asdict(self), private_key, algorithm=StateCookie.algorithm)
-        return encoded
-
-    def add_cookie_to_response(self, response: Response, private_key: str, path: str = "/"):
+    def as_jwt(self, private_key: str, version: int = LEGACY_VERSION) -> str:
+        if version == StateCookie.LEGACY_VERSION:
+            return jwt.encode(asdict(self), private_key, algorithm=StateCookie.algorithm)
+
+        payload = {'v': StateCookie.COMPACT_VERSION}
+        for name, key in StateCookie.compact_keys.items():
+            value = getattr(self, name)
+            if value is not None and value is not False:
+                payload[key] = value
+
+        signing_input = StateCookie.compact_header + b'.' + _base64url_encode(orjson.dumps(payload))
+        signature = _get_hmac(private_key).copy()
+        signature.update(signing_input)
+        return (signing_input + b'.' + _base64url_encode(signature.digest())).decode()
+
+    def add_cookie_to_response(
+            self,
+            response: Response,
+            private_key: str,
+            path: str = "/",
+            version: int = LEGACY_VERSION
+    ):
         response.set_cookie(
             key=StateCookie.cookie_name,
             path=path,
-            value=self.as_jwt(private_key),
+            value=self.as_jwt(private_key, version),
             secure=True,
             samesite='strict'
         )
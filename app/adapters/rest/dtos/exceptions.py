@@ -1,10 +1,10 @@
+from typing import Dict
 from pydantic import BaseModel, ValidationError
 from starlette import status
 from app.adapters.rest.dtos.authentication_data import AuthenticationDataDTO
 from app.business_logic.exceptions import BusinessLogicException, ServerException, UnauthorizedException, \
     InvalidState, InvalidIdToken, InvalidRefreshToken, ResourceNotFoundException, BackendRepositoryException, \
     ResourceAlreadyExists, TimeoutException, IdentityProviderGenericException
-import inspect
 
 Exception_Error_Code_Mapping = {
     # Uncategorized Exceptions
@@ -31,15 +31,25 @@ Exception_Error_Code_Mapping = {
 }
 
 
-def get_error_code_for_exception(exception: Exception) -> int:
-    if type(exception) == object:
-        return -1
+# exception class -> error code, filled in as classes get resolved
+_error_code_by_class: Dict[type, int] = {}
 
-    if type(exception) in Exception_Error_Code_Mapping:
-        return Exception_Error_Code_Mapping[type(exception)]
 
-    next_class_in_mro = inspect.getmro(type(exception))[1]
-    return get_error_code_for_exception(next_class_in_mro())
+def get_error_code_for_exception(exception: BaseException) -> int:
+    """
+    The error code of the closest class in the MRO of the exception that has one, or -1 if none has.
+    """
+    exception_class = type(exception)
+    error_code = _error_code_by_class.get(exception_class)
+    if error_code is None:
+        error_code = next(
+            (Exception_Error_Code_Mapping[cls] for cls in exception_class.__mro__
+             if cls in Exception_Error_Code_Mapping),
+            -1
+        )
+        _error_code_by_class[exception_class] = error_code
+
+    return error_code
 
 
 class ExceptionDTO(BaseModel):
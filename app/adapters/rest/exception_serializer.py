@@ -1,121 +1,119 @@
-from typing import Optional
+from typing import Callable, Dict, Optional, Tuple, Type
 from app.config.config import Container
 from fastapi import FastAPI, Request
+from fastapi.routing import APIRoute
 from pydantic import ValidationError
+from starlette.responses import Response
 from app.business_logic.exceptions import ResourceNotFoundException, BusinessLogicException, ServerException, \
     UnauthorizedException, InvalidRefreshToken, ResourceAlreadyExists, InvalidIdToken, InvalidState, \
     IdentityProviderGenericException, TimeoutException, BackendRepositoryException
 
 serializer = Container.serializer()
 
+ResponseFactory = Callable[[Exception], Response]
 
-def get_authentication_path_from_request(request: Request) -> Optional[str]:
-    path = str(request.url).replace(str(request.base_url), '')
-    path = path.split('?')[0].strip()   # remove any query parameters
-    return path.replace(Container.authentication_route_prefix, '') \
-        if Container.authentication_route_prefix in path \
-        else None
 
+def _server_exception_response(exc: Exception) -> Response:
+    return serializer.get_server_exception_response(exc)
 
-async def _invalid_input_exception_handler(request, exc):
-    return serializer.get_json_response_for_exception(exc, status_code=400)
 
+def _unauthorized_response(exc: Exception) -> Response:
+    return serializer.get_unauthorized_response()
 
-async def _business_logic_exception_handler(request, exc):
-    return serializer.get_json_response_for_exception(exc, status_code=409)
 
+def _invalid_refresh_token_response(exc: Exception) -> Response:
+    return serializer.get_invalid_refresh_token_response()
 
-async def _server_exception_handler(request: Request, exc):
-    path = get_authentication_path_from_request(request)
-    if path in ['/stateful', '/login_redirect', '/signup_redirect']:
-        return serializer.get_server_exception_response(exc)
-    if path == '/exchange_refresh_for_access':
-        response = serializer.get_server_exception_response(exc)
-        serializer.delete_refresh_cookies_from_response(response, path_id='exchange_refresh_for_access_token')
-        return response
-    if path in ['/refresh_token', '/logout']:
-        response = serializer.get_server_exception_response(exc)
-        serializer.delete_refresh_cookies_from_response(response, path_id='refresh_token_grant')
-        return response
-
-    return serializer.get_json_response_for_exception(exc, status_code=500)
-
-
-async def _request_validation_error_handler(request: Request, exc):
-    return serializer.get_json_response_for_exception(exc, status_code=400)
 
+def _user_already_exists_response(exc: Exception) -> Response:
+    return serializer.get_user_already_exists_response()
 
-async def _resource_not_found_exception_handler(request, exc):
-    path = get_authentication_path_from_request(request)
-    serializer.get_unauthorized_response()
-    if path in ['/exchange_refresh_for_access', '/refresh_token', '/logout', '/login_redirect']:
-        return serializer.get_unauthorized_response()
 
-    return serializer.get_json_response_for_exception(exc, status_code=404)
+def _invalid_id_token_response(exc: Exception) -> Response:
+    return serializer.get_invalid_id_token_response()
 
 
-async def _unauthorized_exception_handler(request, exc):
-    path = get_authentication_path_from_request(request)
-    if path in ['/login_redirect', '/signup_redirect']:
-        return serializer.get_unauthorized_response()
-    if path == '/exchange_refresh_for_access':
-        response = serializer.get_unauthorized_response()
-        serializer.delete_refresh_cookies_from_response(response, path_id='exchange_refresh_for_access_token')
+def _deleting_refresh_cookies(get_response: ResponseFactory, path_id: str) -> ResponseFactory:
+    def get_response_deleting_refresh_cookies(exc: Exception) -> Response:
+        response = get_response(exc)
+        serializer.delete_refresh_cookies_from_response(response, path_id=path_id)
         return response
 
-    return serializer.get_json_response_for_exception(exc, status_code=401)
-
-
-async def _invalid_refresh_token_handler(request, exc):
-    path = get_authentication_path_from_request(request)
-    if path in ['/refresh_token', '/logout']:
-        return serializer.get_invalid_refresh_token_response()
-
-    return serializer.get_json_response_for_exception(exc, status_code=401)
-
-
-async def _resource_exists_exception_handler(request, exc):
-    path = get_authentication_path_from_request(request)
-    if path == '/signup_redirect':
-        return serializer.get_user_already_exists_response()
-
-    return serializer.get_json_response_for_exception(exc, status_code=422)
-
-
-async def _invalid_id_token_handler(request, exc):
-    path = get_authentication_path_from_request(request)
-    if path == '/signup_redirect':
-        return serializer.get_invalid_id_token_response()
-    if path == '/exchange_refresh_for_access':
-        response = serializer.get_invalid_id_token_response()
-        serializer.delete_refresh_cookies_from_response(response, path_id='exchange_refresh_for_access_token')
-        return response
-    if path == '/refresh_token':
-        response = serializer.get_invalid_id_token_response()
-        serializer.delete_refresh_cookies_from_response(response, path_id='refresh_token_grant')
-        return response
-
-    return serializer.get_json_response_for_exception(exc, status_code=401)
-
-
-async def _template(request, exc):
-    path = get_authentication_path_from_request(request)
-    if path == '':
-        pass
-
-    return serializer.get_json_response_for_exception(exc, status_code=401)
+    return get_response_deleting_refresh_cookies
+
+
+_server_exception_responses = {
+    '/stateful': _server_exception_response,
+    '/login_redirect': _server_exception_response,
+    '/signup_redirect': _server_exception_response,
+    '/exchange_refresh_for_access': _deleting_refresh_cookies(
+        _server_exception_response, 'exchange_refresh_for_access_token'),
+    '/refresh_token': _deleting_refresh_cookies(_server_exception_response, 'refresh_token_grant'),
+    '/logout': _deleting_refresh_cookies(_server_exception_response, 'refresh_token_grant'),
+}
+_unauthorized_responses = {
+    '/login_redirect': _unauthorized_response,
+    '/signup_redirect': _unauthorized_response,
+    '/exchange_refresh_for_access': _deleting_refresh_cookies(
+        _unauthorized_response, 'exchange_refresh_for_access_token'),
+}
+
+# exception -> (status code of the JSON response, response per authentication route, instead of the JSON one)
+_exception_responses: Dict[Type[Exception], Tuple[int, Dict[str, ResponseFactory]]] = {
+    BusinessLogicException: (409, {}),
+    ServerException: (500, _server_exception_responses),
+    ValidationError: (400, {}),
+    ResourceNotFoundException: (404, {
+        '/exchange_refresh_for_access': _unauthorized_response,
+        '/refresh_token': _unauthorized_response,
+        '/logout': _unauthorized_response,
+        '/login_redirect': _unauthorized_response,
+    }),
+    UnauthorizedException: (401, _unauthorized_responses),
+    InvalidRefreshToken: (401, {
+        '/refresh_token': _invalid_refresh_token_response,
+        '/logout': _invalid_refresh_token_response,
+    }),
+    ResourceAlreadyExists: (422, {
+        '/signup_redirect': _user_already_exists_response,
+    }),
+    InvalidIdToken: (401, {
+        '/signup_redirect': _invalid_id_token_response,
+        '/exchange_refresh_for_access': _deleting_refresh_cookies(
+            _invalid_id_token_response, 'exchange_refresh_for_access_token'),
+        '/refresh_token': _deleting_refresh_cookies(_invalid_id_token_response, 'refresh_token_grant'),
+    }),
+    InvalidState: (401, _unauthorized_responses),
+    IdentityProviderGenericException: (500, _server_exception_responses),
+    TimeoutException: (500, _server_exception_responses),
+    BackendRepositoryException: (500, _server_exception_responses),
+}
+
+
+def _get_exception_handler(status_code: int, responses_by_endpoint: Dict[Callable, ResponseFactory]):
+    """
+    The router stores the endpoint it matched in the request scope: the response is looked up by it,
+    falling back to a JSON one (also when no route matched).
+    """
+    async def exception_handler(request: Request, exc: Exception) -> Response:
+        get_response: Optional[ResponseFactory] = responses_by_endpoint.get(request.scope.get('endpoint'))
+        if get_response is not None:
+            return get_response(exc)
+
+        return serializer.get_json_response_for_exception(exc, status_code=status_code)
+
+    return exception_handler
 
 
 def add_exception_handlers_to_app(app: FastAPI):
-    app.add_exception_handler(BusinessLogicException, _business_logic_exception_handler)
-    app.add_exception_handler(ServerException, _server_exception_handler)
-    app.add_exception_handler(ValidationError, _request_validation_error_handler)
-    app.add_exception_handler(ResourceNotFoundException, _resource_not_found_exception_handler)
-    app.add_exception_handler(UnauthorizedException, _unauthorized_exception_handler)
-    app.add_exception_handler(InvalidRefreshToken, _invalid_refresh_token_handler)
-    app.add_exception_handler(ResourceAlreadyExists, _resource_exists_exception_handler)
-    app.add_exception_handler(InvalidIdToken, _invalid_id_token_handler)
-    app.add_exception_handler(InvalidState, _unauthorized_exception_handler)
-    app.add_exception_handler(IdentityProviderGenericException, _server_exception_handler)
-    app.add_exception_handler(TimeoutException, _server_exception_handler)
-    app.add_exception_handler(BackendRepositoryException, _server_exception_handler)
+    """
+    Must be called once the routers are included: the authentication routes are resolved to their endpoints here.
+    """
+    endpoints_by_path = {route.path: route.endpoint for route in app.routes if isinstance(route, APIRoute)}
+    for exception_class, (status_code, responses_by_path) in _exception_responses.items():
+        responses_by_endpoint = {
+            endpoints_by_path[f'/{Container.authentication_route_prefix}{path}']: get_response
+            for path, get_response in responses_by_path.items()
+            if f'/{Container.authentication_route_prefix}{path}' in endpoints_by_path
+        }
+        app.add_exception_handler(exception_class, _get_exception_handler(status_code, responses_by_endpoint))
@@ -0,0 +1,66 @@
+import asyncio
+from logging import Logger
+from typing import Optional
+import httpx
+from app.business_logic.exceptions import TimeoutException
+
+
+class AsyncUpstreamHttpClient:
+    """
+    Event loop counterpart of UpstreamHttpClient: one httpx.AsyncClient keeping up to {pool_size}
+    connections alive, with every call bounded by {connect_timeout} and {read_timeout} seconds.
+    The httpx client is bound to the event loop it was created on, while this object outlives it: the app creates
+    it on startup and closes it on shutdown. A call made on another loop (or before startup) gets a new one.
+    """
+
+    def __init__(
+            self,
+            logger: Logger,
+            pool_size: int,
+            connect_timeout: float,
+            read_timeout: float,
+            verify: bool = True
+    ):
+        self.logger = logger
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.verify = verify
+        self.client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self):
+        self._get_client()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self.client is None or self._loop is not loop:
+            # a client left over from another loop cannot be closed from this one: its connections get dropped
+            self.client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                verify=self.verify
+            )
+            self._loop = loop
+        return self.client
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        :raises TimeoutException
+        :raises httpx.HTTPError
+        """
+        try:
+            return await self._get_client().request(method, url, **kwargs)
+        except httpx.TimeoutException as e:
+            raise TimeoutException(f'Timeout while calling {url}: {e}')
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, **kwargs)
+
+    async def close(self):
+        client, self.client, self._loop = self.client, None, None
+        if client is not None:
+            await client.aclose()
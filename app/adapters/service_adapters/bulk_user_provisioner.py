@@ -0,0 +1,183 @@
+import csv
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging import Logger
+from threading import BoundedSemaphore, Lock
+from typing import Callable, Iterable, Iterator, Tuple
+from pydantic import ValidationError
+from app.adapters.service_adapters.identity_provider_client import IdentityProviderClient
+from app.business_logic.exceptions import ResourceAlreadyExists, IdentityProviderUnavailable
+from app.business_logic.models.authentication import UserInfo
+from app.business_logic.models.provisioning import ProvisioningResult, ProvisioningReport
+
+
+def read_user_records(path: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Streams the records of a JSONL file, or of a CSV file with a header row, as (record number, fields) pairs.
+    The fields are the ones of UserInfo: email, first_name, external_identifier.
+    """
+    with open(path, newline='') as file:
+        if path.endswith('.csv'):
+            yield from enumerate(csv.DictReader(file), start=1)
+            return
+
+        for record_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield record_number, json.loads(line)
+            except ValueError as e:
+                yield record_number, {'error': f'invalid json: {e}'}
+
+
+class BulkUserProvisioner:
+    """
+    Signs up a stream of users with up to {max_workers} sign-ups in flight. Reading the records pauses while
+    {max_pending} of them are waiting or in flight, so that memory stays flat whatever the size of the stream.
+    A user that already exists counts as provisioned, so that a partially failed run can simply be run again.
+    While the identity provider circuit is open or its bulkhead is full, a sign-up is retried up to {max_attempts}
+    times, waiting {retry_backoff} seconds doubled on every attempt (with jitter, at most {max_retry_backoff}):
+    the worker holding it pauses, and so does the reading of the records once {max_pending} of them are pending.
+    """
+
+    def __init__(
+            self,
+            logger: Logger,
+            identity_provider_service: IdentityProviderClient,
+            max_workers: int,
+            max_pending: int,
+            progress_interval: float = 10,
+            max_attempts: int = 8,
+            retry_backoff: float = 0.5,
+            max_retry_backoff: float = 30
+    ):
+        self.logger = logger
+        self.identity_provider_service = identity_provider_service
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.progress_interval = progress_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+
+    def provision(
+            self,
+            records: Iterable[Tuple[int, dict]],
+            on_result: Callable[[ProvisioningResult], None] = lambda result: None
+    ) -> ProvisioningReport:
+        """
+        {on_result} gets called for every record, one call at a time, in completion order.
+        Progress gets logged every {progress_interval} seconds, including while the last sign-ups are drained.
+
+        :raises Exception: the first one raised by {on_result}, once the sign-ups in flight are done.
+            No record is read, and {on_result} is not called anymore, after it.
+        """
+        report = ProvisioningReport()
+        started = time.monotonic()
+        last_progress = started
+        lock = Lock()
+        pending = BoundedSemaphore(self.max_pending)
+        on_result_errors = []
+
+        def record_result(result: ProvisioningResult):
+            with lock:
+                if result.status == ProvisioningResult.CREATED:
+                    report.created += 1
+                elif result.status == ProvisioningResult.ALREADY_EXISTS:
+                    report.already_exists += 1
+                else:
+                    report.failed += 1
+                if on_result_errors:
+                    return
+                try:
+                    on_result(result)
+                except Exception as e:
+                    self.logger.exception(f'record {result.record_number}: could not report the result')
+                    on_result_errors.append(e)
+
+        def sign_up(record_number: int, user_info: UserInfo):
+            try:
+                record_result(self._sign_up(record_number, user_info))
+            finally:
+                pending.release()
+
+        def acquire_pending():
+            """
+            Waits for a pending slot, logging the progress every {progress_interval} seconds meanwhile.
+            """
+            nonlocal last_progress
+            while True:
+                now = time.monotonic()
+                if now - last_progress >= self.progress_interval:
+                    last_progress = now
+                    self._log_progress(report, lock, now - started)
+                if pending.acquire(timeout=last_progress + self.progress_interval - now):
+                    return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='provisioning') as executor:
+            for record_number, fields in records:
+                if on_result_errors:
+                    break
+                try:
+                    user_info = UserInfo(**fields)
+                except (ValidationError, TypeError) as e:
+                    record_result(ProvisioningResult(
+                        record_number=record_number,
+                        external_identifier=fields.get('external_identifier') if isinstance(fields, dict) else None,
+                        status=ProvisioningResult.FAILED,
+                        error=fields.get('error', str(e)) if isinstance(fields, dict) else str(e)
+                    ))
+                    continue
+
+                acquire_pending()
+                executor.submit(sign_up, record_number, user_info)
+
+            # every slot is free once the sign-ups in flight are done
+            for _ in range(self.max_pending):
+                acquire_pending()
+
+        self._log_progress(report, lock, time.monotonic() - started)
+        if on_result_errors:
+            raise on_result_errors[0]
+        return report
+
+    def _sign_up(self, record_number: int, user_info: UserInfo) -> ProvisioningResult:
+        attempt = 1
+        while True:
+            try:
+                self.identity_provider_service.sign_up_user(user_info)
+                status, error = ProvisioningResult.CREATED, None
+            except ResourceAlreadyExists:
+                status, error = ProvisioningResult.ALREADY_EXISTS, None
+            except IdentityProviderUnavailable as e:
+                if attempt < self.max_attempts:
+                    backoff = self._get_backoff(attempt)
+                    self.logger.debug(f'record {record_number}: {e}, retrying in {backoff:.2f}s')
+                    time.sleep(backoff)
+                    attempt += 1
+                    continue
+                status, error = ProvisioningResult.FAILED, f'{type(e).__name__}: {e}'
+            except Exception as e:
+                status, error = ProvisioningResult.FAILED, f'{type(e).__name__}: {e}'
+            break
+
+        return ProvisioningResult(
+            record_number=record_number,
+            external_identifier=user_info.external_identifier,
+            status=status,
+            error=error
+        )
+
+    def _get_backoff(self, attempt: int) -> float:
+        return min(self.retry_backoff * 2 ** (attempt - 1), self.max_retry_backoff) * random.uniform(0.5, 1)
+
+    def _log_progress(self, report: ProvisioningReport, lock: Lock, elapsed_seconds: float):
+        with lock:
+            report.elapsed_seconds = elapsed_seconds
+            self.logger.info(
+                f'provisioned {report.processed} users in {elapsed_seconds:.1f}s '
+                f'({report.records_per_second:.1f}/s): {report.created} created, '
+                f'{report.already_exists} already existing, {report.failed} failed'
+            )
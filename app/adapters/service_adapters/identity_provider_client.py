@@ -1,26 +1,115 @@
 import json
+import socket
+import time
+from functools import partial
 from logging import Logger
 from typing import Optional
 from identity_provider_rest_client import Configuration, ApiClient, ApiException
 from identity_provider_rest_client.Api import default_api
 from identity_provider_rest_client.model.user_out_dto import UserOutDTO
 from identity_provider_rest_client.model.user_in_dto import UserInDTO
+from starlette.concurrency import run_in_threadpool
+from urllib3.connection import HTTPConnection
 from urllib3.exceptions import MaxRetryError
+from app.adapters.cache.ttl_lru_cache import TTLLRUCache
+from app.adapters.concurrency.circuit_breaker import CircuitBreaker, CircuitOpenException
+from app.adapters.concurrency.single_flight import SingleFlight
 from app.business_logic.exceptions import TimeoutException, IdentityProviderGenericException, \
-    ResourceNotFoundException, ResourceAlreadyExists
+    ResourceNotFoundException, ResourceAlreadyExists, IdentityProviderUnavailable
 from app.business_logic.models.authentication import UserInfo
 
 
 class IdentityProviderClient:
-    def __init__(self, logger: Logger, identity_provider_url: str, identity_provider_timeout: int):
+    """
+    Accounts are practically never deleted, so the users that were found (or signed up) are remembered
+    for {user_cache_ttl} seconds, and a repeated existence check skips the identity provider.
+    Concurrent lookups or sign-ups of the same user (double clicks, several tabs) share a single request.
+    Every request goes through {circuit_breaker}, so that logins fail fast while the account service is degraded.
+    The urllib3 pool keeps up to {pool_maxsize} connections alive, so that concurrent threads neither queue for
+    a single connection nor reconnect on every request.
+    """
+
+    def __init__(
+            self,
+            logger: Logger,
+            identity_provider_url: str,
+            identity_provider_timeout: int,
+            user_cache_ttl: int,
+            user_cache_size: int,
+            circuit_breaker: CircuitBreaker,
+            pool_maxsize: int,
+            connect_timeout: float,
+            tcp_keepalive: bool
+    ):
         self.logger = logger
         configuration = Configuration(
             host=identity_provider_url,
         )
         configuration.retries = 1  # IMPORTANT: if we don't set this HERE, the urllib3 will retry upon a timeout
+        configuration.connection_pool_maxsize = pool_maxsize
+        if tcp_keepalive:
+            configuration.socket_options = self._get_keepalive_socket_options()
         client = ApiClient(configuration)
         self.identity_api = default_api.DefaultApi(client)
         self.timeout_in_seconds = identity_provider_timeout
+        self.request_timeout = (connect_timeout, identity_provider_timeout)
+        self.user_cache_ttl = user_cache_ttl
+        self.known_users = TTLLRUCache(user_cache_size)
+        self.single_flight = SingleFlight()
+        self.circuit_breaker = circuit_breaker
+
+    @staticmethod
+    def _get_keepalive_socket_options() -> list:
+        """
+        Probes idle pooled connections, so that the ones dropped by a NAT or a load balancer are noticed
+        instead of failing the next request. The TCP_KEEP* options are not available on every platform.
+        """
+        socket_options = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        for option, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 10), ('TCP_KEEPCNT', 3)):
+            if hasattr(socket, option):
+                socket_options.append((socket.IPPROTO_TCP, getattr(socket, option), value))
+        return socket_options
+
+    def get_pool_metrics(self) -> dict:
+        """
+        Per host: the pool size, the connections that are checked out right now, and the requests made so far.
+        A pool whose connections are all in use is saturated: pool_maxsize should follow the threadpool size.
+        """
+        pools = self.identity_api.api_client.rest_client.pool_manager.pools
+        metrics = {}
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            metrics[f'{pool.scheme}://{pool.host}:{pool.port}'] = {
+                'maxsize': pool.pool.maxsize,
+                'in_use': pool.pool.maxsize - pool.pool.qsize(),
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests,
+            }
+        return metrics
+
+    @staticmethod
+    def is_outage(e: BaseException) -> bool:
+        """
+        Whether {e} means that the account service is degraded, as opposed to e.g. a user that was not found.
+        """
+        return not isinstance(e, ApiException) or e.status is None or e.status >= 500
+
+    def _call_identity_provider(self, fn, *args):
+        """
+        :raises IdentityProviderUnavailable: when the circuit is open or the bulkhead is full, without calling {fn}
+        :raises TimeoutException
+        """
+        try:
+            return self.circuit_breaker.call(partial(fn, _request_timeout=self.request_timeout), *args)
+        except CircuitOpenException as e:
+            # the circuit metrics are logged on each state transition, by the circuit breaker itself
+            raise IdentityProviderUnavailable(f'Account service is unavailable: {e}')
+        except MaxRetryError:
+            # a saturated pool shows up as timeouts: the metrics tell it apart from a slow account service
+            self.logger.info(f'identity provider timeout, pool: {self.get_pool_metrics()}')
+            raise TimeoutException('Account service timeout')
 
     @staticmethod
     def _handle_identity_provider_error(e: ApiException):
@@ -52,20 +141,50 @@ class IdentityProviderClient:
 
         raise IdentityProviderGenericException(str(e))
 
+    def _remember_user(self, external_identifier: str, user: UserOutDTO):
+        self.known_users.set(external_identifier, user, time.time() + self.user_cache_ttl)
+
+    def invalidate_user(self, external_identifier: str):
+        """
+        To be called when the user gets deleted, or must be looked up again.
+        """
+        self.known_users.pop(external_identifier)
+
     def get_user(self, external_identifier: str) -> Optional[UserOutDTO]:
-        try:
-            user: UserOutDTO = self.identity_api.get_user_user_external_identifier_get(external_identifier)
+        """
+        :raises IdentityProviderUnavailable: when the circuit is open
+        :raises TimeoutException
+        """
+        user = self.known_users.get(external_identifier)
+        if user is not None:
             return user
+
+        return self.single_flight.do(('get_user', external_identifier), self._fetch_user, external_identifier)
+
+    def _fetch_user(self, external_identifier: str) -> Optional[UserOutDTO]:
+        try:
+            user: UserOutDTO = self._call_identity_provider(
+                self.identity_api.get_user_user_external_identifier_get, external_identifier)
         except ApiException as e:
             return None
 
+        if user:
+            self._remember_user(external_identifier, user)
+        self.logger.debug(f'known users cache: {self.known_users.get_stats()}')
+        return user
+
     def _create_tcp_user(self, external_identifier: str, user_dto: UserInDTO) -> UserOutDTO:
         """
         :raises ResourceAlreadyExists
         :raises IdentityProviderGenericException
         """
+        return self.single_flight.do(
+            ('create_user', external_identifier), self._post_user, external_identifier, user_dto)
+
+    def _post_user(self, external_identifier: str, user_dto: UserInDTO) -> UserOutDTO:
         try:
-            return self.identity_api.post_user_user_external_identifier_post(external_identifier, user_dto)
+            return self._call_identity_provider(
+                self.identity_api.post_user_user_external_identifier_post, external_identifier, user_dto)
         except ApiException as e:
             self._handle_exception(e)
 
@@ -78,4 +197,26 @@ class IdentityProviderClient:
             email_address=user_info.email,
             first_name=user_info.first_name
         )
-        self._create_tcp_user(user_info.external_identifier, user_dto)
+        user = self._create_tcp_user(user_info.external_identifier, user_dto)
+        if user:
+            self._remember_user(user_info.external_identifier, user)
+
+    async def get_user_async(self, external_identifier: str) -> Optional[UserOutDTO]:
+        """
+        The generated ApiClient is blocking, so the call runs on the threadpool,
+        once for all the coroutines looking up the same user.
+        """
+        user = self.known_users.get(external_identifier)
+        if user is not None:
+            return user
+
+        return await self.single_flight.do_async(
+            ('get_user', external_identifier), run_in_threadpool, self.get_user, external_identifier)
+
+    async def sign_up_user_async(self, user_info: UserInfo):
+        """
+        :raises ResourceAlreadyExists
+        :raises IdentityProviderGenericException
+        """
+        await self.single_flight.do_async(
+            ('sign_up_user', user_info.external_identifier), run_in_threadpool, self.sign_up_user, user_info)
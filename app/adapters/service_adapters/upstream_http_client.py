@@ -0,0 +1,41 @@
+from logging import Logger
+import requests
+from requests.adapters import HTTPAdapter
+from app.business_logic.exceptions import TimeoutException
+
+
+class UpstreamHttpClient:
+    """
+    Shared HTTP client for every call to the authorization server (discovery, jwks, token, revoke).
+    The underlying session keeps up to {pool_size} connections alive per host, so warm invocations reuse
+    the already established TCP+TLS connections instead of handshaking again.
+    Every call is bounded by {connect_timeout} and {read_timeout} seconds, unless a timeout is given explicitly.
+    """
+
+    def __init__(self, logger: Logger, pool_size: int, connect_timeout: float, read_timeout: float):
+        self.logger = logger
+        self.timeout = (connect_timeout, read_timeout)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        :raises TimeoutException
+        :raises requests.RequestException
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.Timeout as e:
+            raise TimeoutException(f'Timeout while calling {url}: {e}')
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        self.session.close()
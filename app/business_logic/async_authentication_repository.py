@@ -0,0 +1,44 @@
+from abc import ABC, abstractmethod
+from app.business_logic.models.authentication import AuthenticationState
+
+
+class AsyncAuthenticationRepository(ABC):
+    @abstractmethod
+    async def create_authentication_state(self, state: str) -> AuthenticationState:
+        """
+        :raises BackendRepositoryException
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_authentication_state(self, state: str) -> AuthenticationState:
+        """
+        :raises BackendRepositoryException
+        :raises InvalidState: when state is not found or has expired
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_authentication_state(self, auth_state: AuthenticationState):
+        """
+        :raises BackendRepositoryException
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def validate_and_update_authentication_state(self, auth_state: AuthenticationState):
+        """
+        Stores the tokens of {auth_state} only if its state exists, in a single operation.
+
+        :raises BackendRepositoryException
+        :raises InvalidState: when state is not found
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def pop_authentication_state(self, state: str, refresh_token: str) -> AuthenticationState:
+        """
+        :raises BackendRepositoryException
+        :raises UnauthorizedException: when no {state, refresh_token} pair is found
+        """
+        raise NotImplementedError
@@ -0,0 +1,103 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from app.business_logic.models.authentication import AuthenticationState, UserInfo
+
+
+class AsyncAuthenticationService(ABC):
+    """
+    Same operations as AuthenticationService, for callers running on the event loop.
+    """
+
+    @abstractmethod
+    async def create_state(self) -> str:
+        """
+        :raises BackendRepositoryException
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def validate_state(self, state: str):
+        """
+        :raises InvalidState
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def exchange_code_for_token(
+            self, state: str, code: str, endpoint_uri: str, validate_state: bool = True
+    ) -> AuthenticationState:
+        """
+        :raises InvalidState
+        :raises UnauthorizedException
+        :raises InvalidIdToken
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def temporarily_store_auth_state(self, auth_state: AuthenticationState):
+        """
+        :raises BackendRepositoryException
+        """
+        raise NotImplementedError
+
+    async def validate_state_and_store_auth_state(self, auth_state: AuthenticationState):
+        """
+        :raises InvalidState
+        :raises BackendRepositoryException
+        """
+        raise NotImplementedError
+
+    async def get_temporarily_stored_access_token(self, state: str, refresh_token: str) -> AuthenticationState:
+        """
+        :raises BackendRepositoryException
+        :raises UnauthorizedException: when no {state, refresh_token} pair is found
+        """
+        raise NotImplementedError
+
+    async def revoke_refresh_token(self, refresh_token: str):
+        """
+        :raises InvalidRefreshToken
+        """
+        raise NotImplementedError
+
+    async def create_user(self, id_token: str, user_info: Optional[UserInfo] = None) -> UserInfo:
+        """
+        Signs up the owner of {id_token}, whose claims are {user_info} when they were already verified.
+
+        :raises InvalidIdToken
+        :raises ResourceAlreadyExists
+        :raises IdentityProviderGenericException
+        """
+        raise NotImplementedError
+
+    async def get_user_info(self, id_token: str) -> UserInfo:
+        """
+        :raises InvalidIdToken
+        """
+        raise NotImplementedError
+
+    async def refresh_access_token(self, refresh_token: str) -> AuthenticationState:
+        """
+        :raises InvalidRefreshToken
+        """
+        raise NotImplementedError
+
+    async def ensure_user_exists(self, user_identifier: str):
+        """
+        :raises ResourceNotFoundException
+        :raises IdentityProviderGenericException
+        """
+        raise NotImplementedError
+
+    async def store_auth_state_for_existing_user(self, auth_state: AuthenticationState, user_identifier: str):
+        """
+        Runs ensure_user_exists and validate_state_and_store_auth_state concurrently, and raises as soon as one fails.
+        A call already handed to a thread cannot be cancelled: the tokens may still get stored for a user that turns
+        out not to exist. They are never handed out (no refresh token cookie gets set on failure), and expire with
+        the state.
+
+        :raises ResourceNotFoundException
+        :raises InvalidState
+        :raises BackendRepositoryException
+        """
+        raise NotImplementedError
@@ -14,7 +14,7 @@ class AuthenticationRepository(ABC):
     def get_authentication_state(self, state: str) -> AuthenticationState:
         """
         :raises BackendRepositoryException
-        :raises UnauthorizedException: when state is not found
+        :raises InvalidState: when state is not found or has expired
         """
         raise NotImplementedError
 
@@ -25,6 +25,16 @@ class AuthenticationRepository(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def validate_and_update_authentication_state(self, auth_state: AuthenticationState):
+        """
+        Stores the tokens of {auth_state} only if its state exists, in a single operation.
+
+        :raises BackendRepositoryException
+        :raises InvalidState: when state is not found
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def pop_authentication_state(self, state: str, refresh_token: str) -> AuthenticationState:
         """
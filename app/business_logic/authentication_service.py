@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 from app.business_logic.models.authentication import AuthenticationState, UserInfo
 
 
@@ -18,15 +19,22 @@ class AuthenticationService(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def exchange_code_for_token(self, state: str, code: str, endpoint_uri: str) -> AuthenticationState:
+    def exchange_code_for_token(
+            self, state: str, code: str, endpoint_uri: str, validate_state: bool = True,
+            token_endpoint: Optional[str] = None
+    ) -> AuthenticationState:
         """
         If the redirect URI was included in the initial authorization request,
         the service must require it in the token request as well.
         The redirect URI in the token request must be an exact match of the redirect URI that was used when generating
         the authorization code. The service must reject the request otherwise.
+        With {validate_state} False, the caller must have validated the state itself beforehand:
+        the code must never be sent to the token endpoint for a state that is not valid.
+        A {token_endpoint} already resolved by the caller is used as is, instead of being looked up again.
 
         :raises InvalidState
         :raises UnauthorizedException
+        :raises InvalidIdToken
         """
         raise NotImplementedError
 
@@ -37,6 +45,13 @@ class AuthenticationService(ABC):
         """
         raise NotImplementedError
 
+    def validate_state_and_store_auth_state(self, auth_state: AuthenticationState):
+        """
+        :raises InvalidState
+        :raises BackendRepositoryException
+        """
+        raise NotImplementedError
+
     def get_temporarily_stored_access_token(self, state: str, refresh_token: str) -> AuthenticationState:
         """
         :raises BackendRepositoryException
@@ -50,8 +65,10 @@ class AuthenticationService(ABC):
         """
         raise NotImplementedError
 
-    def create_user(self, id_token: str) -> UserInfo:
+    def create_user(self, id_token: str, user_info: Optional[UserInfo] = None) -> UserInfo:
         """
+        Signs up the owner of {id_token}, whose claims are {user_info} when they were already verified.
+
         :raises InvalidIdToken
         :raises ResourceAlreadyExists
         :raises IdentityProviderGenericException
@@ -73,5 +90,6 @@ class AuthenticationService(ABC):
     def ensure_user_exists(self, user_identifier: str):
         """
         :raises ResourceNotFoundException
+        :raises IdentityProviderGenericException
         """
         raise NotImplementedError
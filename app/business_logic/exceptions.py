@@ -22,6 +22,10 @@ class IdentityProviderGenericException(ServerException):
     pass
 
 
+class IdentityProviderUnavailable(IdentityProviderGenericException):
+    pass
+
+
 class InvalidState(UnauthorizedException):
     pass
 
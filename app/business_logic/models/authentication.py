@@ -1,15 +1,30 @@
+import time
 from typing import Optional
 from pydantic import BaseModel
 
 
+class UserInfo(BaseModel):
+    email: str
+    first_name: str
+    external_identifier: str
+    expires_at: Optional[int] = None
+
+    def has_expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at <= time.time()
+
+
 class AuthenticationState(BaseModel):
     state: Optional[str] = None
     refresh_token: Optional[str] = None
     access_token: Optional[str] = None
     id_token: Optional[str] = None
+    expires_at: Optional[int] = None
+    # the verified claims of {id_token}
+    user_info: Optional[UserInfo] = None
 
 
-class UserInfo(BaseModel):
-    email: str
-    first_name: str
-    external_identifier: str
+class OpenIdConfiguration(BaseModel):
+    token_endpoint: str
+    revocation_endpoint: Optional[str] = None
+    jwks_uri: Optional[str] = None
+    issuer: Optional[str] = None
@@ -0,0 +1,28 @@
+from typing import ClassVar, Optional
+from pydantic import BaseModel
+
+
+class ProvisioningResult(BaseModel):
+    CREATED: ClassVar[str] = 'created'
+    ALREADY_EXISTS: ClassVar[str] = 'already_exists'
+    FAILED: ClassVar[str] = 'failed'
+
+    record_number: int
+    external_identifier: Optional[str] = None
+    status: str
+    error: Optional[str] = None
+
+
+class ProvisioningReport(BaseModel):
+    created: int = 0
+    already_exists: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.created + self.already_exists + self.failed
+
+    @property
+    def records_per_second(self) -> float:
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds else 0.0
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from app.business_logic.models.authentication import UserInfo
+from app.business_logic.models.authentication import UserInfo, OpenIdConfiguration
 
 
 class TokenService(ABC):
@@ -7,8 +7,25 @@ class TokenService(ABC):
     def validate_id_token(self, _id_token: str, client_id: str) -> UserInfo:
         """
         :raises InvalidIdToken
+        :raises ServerException: when the keys to verify it with could not be fetched
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def parse_trusted_id_token(self, _id_token: str, client_id: str) -> UserInfo:
+        """
+        For an id_token received directly from the token endpoint over TLS, whose signature does not need to be
+        validated (OpenID Connect Core 3.1.3.7): only the audience, the issuer and the expiry get checked.
+
+        :raises InvalidIdToken
+        """
+        raise NotImplementedError
+
+    def get_openid_configuration(self) -> OpenIdConfiguration:
+        raise NotImplementedError
+
     def get_token_endpoint_from_well_known_url(self) -> str:
         raise NotImplementedError
+
+    def get_revocation_endpoint_from_well_known_url(self) -> str:
+        raise NotImplementedError
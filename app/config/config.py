@@ -1,28 +1,114 @@
 import logging
 from logging import Logger, getLogger
 import boto3
+import redis
+from botocore.config import Config
 from dependency_injector import containers, providers
+from app.adapters.service_adapters.async_upstream_http_client import AsyncUpstreamHttpClient
 from app.adapters.service_adapters.identity_provider_client import IdentityProviderClient
+from app.adapters.concurrency.circuit_breaker import CircuitBreaker
+from app.adapters.service_adapters.upstream_http_client import UpstreamHttpClient
+from app.adapters.oauth.async_google_authentication_service import AsyncGoogleAuthenticationService
+from app.adapters.oauth.cached_token_service import CachedTokenService
 from app.adapters.oauth.google_authentication_service import GoogleAuthenticationService
 from app.adapters.oauth.google_token_service import GoogleTokenService
 from app.adapters.oauth.local_authentication_service import LocalAuthenticationService
 from app.adapters.oauth.local_token_service import LocalTokenService
+from app.adapters.oauth.threaded_authentication_service import ThreadedAuthenticationService
 from app.adapters.repositories.DynamoDBAdapter import DynamoDBRepository
+from app.adapters.repositories.DynamoDBClientAdapter import DynamoDBClientRepository
+from app.adapters.repositories.InMemoryAdapter import InMemoryRepository
+from app.adapters.repositories.RedisAdapter import RedisRepository
+from app.adapters.repositories.SignedStateAdapter import SignedStateAuthenticationRepository
+from app.adapters.repositories.CachedAuthenticationAdapter import CachedAuthenticationRepository
+from app.adapters.repositories.ThreadedAuthenticationAdapter import ThreadedAuthenticationRepository
 from app.adapters.rest.auth_serializer import Serializer
+from app.adapters.rest.dtos.cookies import StateCookie
+from app.business_logic.async_authentication_repository import AsyncAuthenticationRepository
+from app.business_logic.async_authentication_service import AsyncAuthenticationService
 from app.business_logic.authentication_repository import AuthenticationRepository
 from app.business_logic.authentication_service import AuthenticationService
 from app.business_logic.token_service import TokenService
 
 
+def str_to_bool(value) -> bool:
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
 def get_logger(log_level: str) -> Logger:
     logger = getLogger()
     logger.setLevel(log_level)
     return logger
 
 
+def get_dynamodb_client_config(
+        max_pool_connections: int, connect_timeout: float, read_timeout: float, max_attempts: int
+) -> Config:
+    return Config(
+        max_pool_connections=max_pool_connections,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        retries={'mode': 'adaptive', 'max_attempts': max_attempts}
+    )
+
+
 def get_backend_repository(
-        logger: Logger, platform_name: str, auth_table_name: str, dynamodb_local_url: str
+        logger: Logger,
+        platform_name: str,
+        backend_repository_type: str,
+        auth_table_name: str,
+        dynamodb_local_url: str,
+        dynamodb_client_config: Config,
+        state_ttl: int,
+        auth_state_ttl: int,
+        in_memory_max_size: int,
+        in_memory_stripes: int,
+        redis_url: str,
+        redis_socket_timeout: float
 ) -> providers.Singleton[AuthenticationRepository]:
+    if backend_repository_type == 'redis':
+        def get_redis_client_callback():
+            return redis.Redis.from_url(
+                redis_url,
+                socket_timeout=redis_socket_timeout,
+                socket_connect_timeout=redis_socket_timeout,
+                socket_keepalive=True,
+                health_check_interval=30
+            )
+
+        return providers.Singleton(
+            RedisRepository,
+            logger,
+            get_redis_client_callback,
+            f'{auth_table_name}:',
+            state_ttl,
+            auth_state_ttl
+        )
+
+    if backend_repository_type == 'memory':
+        return providers.Singleton(
+            InMemoryRepository,
+            state_ttl,
+            auth_state_ttl,
+            in_memory_max_size,
+            in_memory_stripes
+        )
+
+    if backend_repository_type == 'dynamodb_client':
+        def get_client_callback():
+            if platform_name == 'local':
+                return boto3.client('dynamodb', endpoint_url=dynamodb_local_url, config=dynamodb_client_config)
+            return boto3.client('dynamodb', config=dynamodb_client_config)
+
+        return providers.Singleton(
+            DynamoDBClientRepository,
+            logger,
+            get_client_callback,
+            auth_table_name,
+            state_ttl,
+            auth_state_ttl
+        )
+
     def get_backend_repository_callback():
         if platform_name == 'local':
             dynamodb_client = boto3.resource('dynamodb',  endpoint_url=dynamodb_local_url)
@@ -35,33 +121,150 @@ def get_backend_repository(
     return providers.Singleton(
         DynamoDBRepository,
         logger,
-        get_backend_repository_callback
+        get_backend_repository_callback,
+        state_ttl,
+        auth_state_ttl
+    )
+
+
+def get_state_repository(
+        logger: Logger,
+        backend_repository,
+        signed_state: bool,
+        private_key: str,
+        state_ttl: int,
+        replay_filter_size: int,
+        state_cache_size: int
+) -> providers.Singleton[AuthenticationRepository]:
+    if not signed_state:
+        if state_cache_size == 0:
+            return backend_repository
+        return providers.Singleton(CachedAuthenticationRepository, logger, backend_repository, state_cache_size)
+
+    # signed states are validated without reaching the backend, so there is nothing to cache
+    return providers.Singleton(
+        SignedStateAuthenticationRepository,
+        backend_repository,
+        private_key,
+        state_ttl,
+        replay_filter_size
+    )
+
+
+def get_async_backend_repository(backend_repository) -> providers.Singleton[AsyncAuthenticationRepository]:
+    return providers.Singleton(ThreadedAuthenticationRepository, backend_repository)
+
+
+def get_identity_provider_circuit_breaker(
+        logger: Logger,
+        window_seconds: float,
+        minimum_calls: int,
+        failure_rate_threshold: float,
+        slow_call_duration: float,
+        slow_call_rate_threshold: float,
+        open_duration: float,
+        half_open_calls: int,
+        max_concurrent_calls: int
+) -> providers.Singleton[CircuitBreaker]:
+    return providers.Singleton(
+        CircuitBreaker,
+        logger,
+        'identity provider',
+        window_seconds,
+        10,
+        minimum_calls,
+        failure_rate_threshold,
+        slow_call_duration,
+        slow_call_rate_threshold,
+        open_duration,
+        half_open_calls,
+        max_concurrent_calls,
+        IdentityProviderClient.is_outage
     )
 
 
-def get_identity_provider_client(logger: Logger, identity_provider_url: str, identity_provider_timeout: int):
+def get_identity_provider_client(
+        logger: Logger,
+        identity_provider_url: str,
+        identity_provider_timeout: int,
+        user_cache_ttl: int,
+        user_cache_size: int,
+        circuit_breaker,
+        pool_maxsize: int,
+        connect_timeout: float,
+        tcp_keepalive: bool
+):
     return providers.Singleton(
         IdentityProviderClient,
         logger,
         identity_provider_url,
-        identity_provider_timeout
+        identity_provider_timeout,
+        user_cache_ttl,
+        user_cache_size,
+        circuit_breaker,
+        pool_maxsize,
+        connect_timeout,
+        tcp_keepalive
+    )
+
+
+def get_upstream_http_client(
+        logger: Logger, pool_size: int, connect_timeout: float, read_timeout: float
+) -> providers.Singleton[UpstreamHttpClient]:
+    return providers.Singleton(
+        UpstreamHttpClient,
+        logger,
+        pool_size,
+        connect_timeout,
+        read_timeout
     )
 
 
-def get_token_service(platform_name: str) -> providers.Singleton[TokenService]:
+def get_async_upstream_http_client(
+        logger: Logger, pool_size: int, connect_timeout: float, read_timeout: float
+) -> providers.Singleton[AsyncUpstreamHttpClient]:
+    return providers.Singleton(
+        AsyncUpstreamHttpClient,
+        logger,
+        pool_size,
+        connect_timeout,
+        read_timeout
+    )
+
+
+def get_token_service(
+        logger: Logger, http_client, platform_name: str, verified_token_cache_size: int
+) -> providers.Singleton[TokenService]:
     if platform_name == 'local':
-        return providers.Singleton(LocalTokenService)
+        token_service = providers.Singleton(LocalTokenService, logger, http_client)
+    else:
+        token_service = providers.Singleton(GoogleTokenService, logger, http_client)
 
-    return providers.Singleton(GoogleTokenService)
+    if not verified_token_cache_size:
+        return token_service
 
+    return providers.Singleton(
+        CachedTokenService,
+        logger,
+        token_service,
+        verified_token_cache_size
+    )
 
-def get_serializer_service(backend_url: str, private_key: str, stage: str, authentication_route_prefix: str):
+
+def get_serializer_service(
+        backend_url: str,
+        private_key: str,
+        stage: str,
+        authentication_route_prefix: str,
+        state_cookie_version: int
+):
     return providers.Singleton(
         Serializer,
         backend_url,
         private_key,
         stage,
-        authentication_route_prefix
+        authentication_route_prefix,
+        state_cookie_version
     )
 
 
@@ -77,6 +280,7 @@ def get_auth_service(
         backend_repository,
         identity_provider_service,
         token_service,
+        http_client,
         platform_name: str,
         client_id: str,
         client_secret: str,
@@ -93,6 +297,7 @@ def get_auth_service(
             backend_repository,
             identity_provider_service,
             token_service,
+            http_client,
             redirect_uri_prefix=get_redirect_uri_prefix(backend_url, authentication_route_prefix)
         )
 
@@ -105,10 +310,45 @@ def get_auth_service(
         backend_repository,
         identity_provider_service,
         token_service,
+        http_client,
         redirect_uri_prefix=get_redirect_uri_prefix(backend_url, authentication_route_prefix)
     )
 
 
+def get_async_auth_service(
+        logger,
+        auth_service,
+        async_backend_repository,
+        identity_provider_service,
+        token_service,
+        async_http_client,
+        platform_name: str,
+        native_async_auth_service: bool,
+        client_id: str,
+        client_secret: str,
+        backend_url: str,
+        authentication_route_prefix: str
+) -> providers.Provider[AsyncAuthenticationService]:
+    """
+    Unless the native implementation is enabled, the async routes run the sync {auth_service} on the threadpool.
+    """
+    if native_async_auth_service and platform_name != 'local':
+        return providers.Singleton(
+            AsyncGoogleAuthenticationService,
+            platform_name,
+            logger,
+            client_id,
+            client_secret,
+            async_backend_repository,
+            identity_provider_service,
+            token_service,
+            async_http_client,
+            redirect_uri_prefix=get_redirect_uri_prefix(backend_url, authentication_route_prefix)
+        )
+
+    return providers.Factory(ThreadedAuthenticationService, auth_service, token_service)
+
+
 class Container(containers.DeclarativeContainer):
     config = providers.Configuration()
     config.platform_name.from_env("PLATFORM", as_=str, required=True)
@@ -126,7 +366,48 @@ class Container(containers.DeclarativeContainer):
     config.rollbar_enabled.from_env("ROLLBAR_ENABLED", as_=bool, required=True)
     config.identity_provider_url.from_env("IDENTITY_PROVIDER_URL", as_=str, required=True)
     config.identity_provider_timeout.from_env("IDENTITY_PROVIDER_TIMEOUT", as_=int, required=True)
+    config.identity_provider_connect_timeout.from_env("IDENTITY_PROVIDER_CONNECT_TIMEOUT", as_=float, default=1)
+    # more connections than IDENTITY_PROVIDER_MAX_CONCURRENT_CALLS would never be used
+    config.identity_provider_pool_maxsize.from_env("IDENTITY_PROVIDER_POOL_MAXSIZE", as_=int, default=20)
+    config.identity_provider_tcp_keepalive.from_env("IDENTITY_PROVIDER_TCP_KEEPALIVE", as_=str_to_bool, default='true')
+    config.identity_provider_user_cache_ttl.from_env("IDENTITY_PROVIDER_USER_CACHE_TTL", as_=int, default=300)
+    config.identity_provider_user_cache_size.from_env("IDENTITY_PROVIDER_USER_CACHE_SIZE", as_=int, default=1024)
+    config.identity_provider_circuit_window.from_env("IDENTITY_PROVIDER_CIRCUIT_WINDOW", as_=float, default=30)
+    config.identity_provider_circuit_minimum_calls.from_env(
+        "IDENTITY_PROVIDER_CIRCUIT_MINIMUM_CALLS", as_=int, default=10)
+    config.identity_provider_circuit_failure_rate.from_env(
+        "IDENTITY_PROVIDER_CIRCUIT_FAILURE_RATE", as_=float, default=0.5)
+    config.identity_provider_circuit_slow_call_duration.from_env(
+        "IDENTITY_PROVIDER_CIRCUIT_SLOW_CALL_DURATION", as_=float, default=2)
+    config.identity_provider_circuit_slow_call_rate.from_env(
+        "IDENTITY_PROVIDER_CIRCUIT_SLOW_CALL_RATE", as_=float, default=0.8)
+    config.identity_provider_circuit_open_duration.from_env(
+        "IDENTITY_PROVIDER_CIRCUIT_OPEN_DURATION", as_=float, default=15)
+    config.identity_provider_circuit_half_open_calls.from_env(
+        "IDENTITY_PROVIDER_CIRCUIT_HALF_OPEN_CALLS", as_=int, default=2)
+    config.identity_provider_max_concurrent_calls.from_env(
+        "IDENTITY_PROVIDER_MAX_CONCURRENT_CALLS", as_=int, default=20)
     config.dynamodb_local_url.from_env("DYNAMODB_LOCAL_URL", as_=str, required=False, default=None)
+    config.backend_repository_type.from_env("BACKEND_REPOSITORY", as_=str, default='dynamodb')
+    config.dynamodb_max_pool_connections.from_env("DYNAMODB_MAX_POOL_CONNECTIONS", as_=int, default=10)
+    config.dynamodb_connect_timeout.from_env("DYNAMODB_CONNECT_TIMEOUT", as_=float, default=1)
+    config.dynamodb_read_timeout.from_env("DYNAMODB_READ_TIMEOUT", as_=float, default=2)
+    config.dynamodb_max_attempts.from_env("DYNAMODB_MAX_ATTEMPTS", as_=int, default=3)
+    config.in_memory_repository_max_size.from_env("IN_MEMORY_REPOSITORY_MAX_SIZE", as_=int, default=100000)
+    config.in_memory_repository_stripes.from_env("IN_MEMORY_REPOSITORY_STRIPES", as_=int, default=16)
+    config.redis_url.from_env("REDIS_URL", as_=str, default='redis://localhost:6379/0')
+    config.redis_socket_timeout.from_env("REDIS_SOCKET_TIMEOUT", as_=float, default=1)
+    config.signed_state.from_env("SIGNED_STATE", as_=str_to_bool, default='false')
+    config.state_replay_filter_size.from_env("STATE_REPLAY_FILTER_SIZE", as_=int, default=100000)
+    config.state_cache_size.from_env("STATE_CACHE_SIZE", as_=int, default=1024)
+    config.state_ttl.from_env("STATE_TTL", as_=int, default=900)
+    config.auth_state_ttl.from_env("AUTH_STATE_TTL", as_=int, default=120)
+    config.upstream_http_pool_size.from_env("UPSTREAM_HTTP_POOL_SIZE", as_=int, default=10)
+    config.upstream_http_connect_timeout.from_env("UPSTREAM_HTTP_CONNECT_TIMEOUT", as_=float, default=3.05)
+    config.upstream_http_read_timeout.from_env("UPSTREAM_HTTP_READ_TIMEOUT", as_=float, default=10)
+    config.verified_token_cache_size.from_env("VERIFIED_TOKEN_CACHE_SIZE", as_=int, default=1024)
+    config.native_async_auth_service.from_env("NATIVE_ASYNC_AUTH_SERVICE", as_=str_to_bool, default='false')
+    config.state_cookie_version.from_env("STATE_COOKIE_VERSION", as_=int, default=StateCookie.LEGACY_VERSION)
 
     platform_name = config.platform_name()
     stage = config.stage()
@@ -143,19 +424,134 @@ class Container(containers.DeclarativeContainer):
     rollbar_enabled = config.rollbar_enabled()
     identity_provider_url = config.identity_provider_url()
     identity_provider_timeout = config.identity_provider_timeout()
+    identity_provider_connect_timeout = config.identity_provider_connect_timeout()
+    identity_provider_pool_maxsize = config.identity_provider_pool_maxsize()
+    identity_provider_tcp_keepalive = config.identity_provider_tcp_keepalive()
+    identity_provider_user_cache_ttl = config.identity_provider_user_cache_ttl()
+    identity_provider_user_cache_size = config.identity_provider_user_cache_size()
+    identity_provider_circuit_window = config.identity_provider_circuit_window()
+    identity_provider_circuit_minimum_calls = config.identity_provider_circuit_minimum_calls()
+    identity_provider_circuit_failure_rate = config.identity_provider_circuit_failure_rate()
+    identity_provider_circuit_slow_call_duration = config.identity_provider_circuit_slow_call_duration()
+    identity_provider_circuit_slow_call_rate = config.identity_provider_circuit_slow_call_rate()
+    identity_provider_circuit_open_duration = config.identity_provider_circuit_open_duration()
+    identity_provider_circuit_half_open_calls = config.identity_provider_circuit_half_open_calls()
+    identity_provider_max_concurrent_calls = config.identity_provider_max_concurrent_calls()
     dynamodb_local_url = config.dynamodb_local_url()
+    backend_repository_type = config.backend_repository_type()
+    dynamodb_max_pool_connections = config.dynamodb_max_pool_connections()
+    dynamodb_connect_timeout = config.dynamodb_connect_timeout()
+    dynamodb_read_timeout = config.dynamodb_read_timeout()
+    dynamodb_max_attempts = config.dynamodb_max_attempts()
+    in_memory_repository_max_size = config.in_memory_repository_max_size()
+    in_memory_repository_stripes = config.in_memory_repository_stripes()
+    redis_url = config.redis_url()
+    redis_socket_timeout = config.redis_socket_timeout()
+    signed_state = config.signed_state()
+    state_replay_filter_size = config.state_replay_filter_size()
+    state_cache_size = config.state_cache_size()
+    state_ttl = config.state_ttl()
+    auth_state_ttl = config.auth_state_ttl()
+    upstream_http_pool_size = config.upstream_http_pool_size()
+    upstream_http_connect_timeout = config.upstream_http_connect_timeout()
+    upstream_http_read_timeout = config.upstream_http_read_timeout()
+    verified_token_cache_size = config.verified_token_cache_size()
+    native_async_auth_service = config.native_async_auth_service()
+    state_cookie_version = config.state_cookie_version()
 
     logger = get_logger(log_level)
-    backend_repository = get_backend_repository(logger, platform_name, auth_table, dynamodb_local_url)
-    identity_provider_service = get_identity_provider_client(logger, identity_provider_url, identity_provider_timeout)
-    token_service = get_token_service(platform_name)
-    serializer = get_serializer_service(backend_url, private_key, stage, authentication_route_prefix)
+    backend_repository = get_backend_repository(
+        logger,
+        platform_name,
+        backend_repository_type,
+        auth_table,
+        dynamodb_local_url,
+        get_dynamodb_client_config(
+            dynamodb_max_pool_connections,
+            dynamodb_connect_timeout,
+            dynamodb_read_timeout,
+            dynamodb_max_attempts
+        ),
+        state_ttl,
+        auth_state_ttl,
+        in_memory_repository_max_size,
+        in_memory_repository_stripes,
+        redis_url,
+        redis_socket_timeout
+    )
+    backend_repository = get_state_repository(
+        logger,
+        backend_repository,
+        signed_state,
+        private_key,
+        state_ttl,
+        state_replay_filter_size,
+        state_cache_size
+    )
+    async_backend_repository = get_async_backend_repository(backend_repository)
+    identity_provider_circuit_breaker = get_identity_provider_circuit_breaker(
+        logger,
+        identity_provider_circuit_window,
+        identity_provider_circuit_minimum_calls,
+        identity_provider_circuit_failure_rate,
+        identity_provider_circuit_slow_call_duration,
+        identity_provider_circuit_slow_call_rate,
+        identity_provider_circuit_open_duration,
+        identity_provider_circuit_half_open_calls,
+        identity_provider_max_concurrent_calls
+    )
+    identity_provider_service = get_identity_provider_client(
+        logger,
+        identity_provider_url,
+        identity_provider_timeout,
+        identity_provider_user_cache_ttl,
+        identity_provider_user_cache_size,
+        identity_provider_circuit_breaker,
+        identity_provider_pool_maxsize,
+        identity_provider_connect_timeout,
+        identity_provider_tcp_keepalive
+    )
+    upstream_http_client = get_upstream_http_client(
+        logger,
+        upstream_http_pool_size,
+        upstream_http_connect_timeout,
+        upstream_http_read_timeout
+    )
+    async_upstream_http_client = get_async_upstream_http_client(
+        logger,
+        upstream_http_pool_size,
+        upstream_http_connect_timeout,
+        upstream_http_read_timeout
+    )
+    token_service = get_token_service(logger, upstream_http_client, platform_name, verified_token_cache_size)
+    serializer = get_serializer_service(
+        backend_url,
+        private_key,
+        stage,
+        authentication_route_prefix,
+        state_cookie_version
+    )
     auth_service = get_auth_service(
         logger,
         backend_repository,
         identity_provider_service,
         token_service,
+        upstream_http_client,
+        platform_name,
+        client_id,
+        client_secret,
+        backend_url,
+        authentication_route_prefix
+    )
+    async_auth_service = get_async_auth_service(
+        logger,
+        auth_service,
+        async_backend_repository,
+        identity_provider_service,
+        token_service,
+        async_upstream_http_client,
         platform_name,
+        native_async_auth_service,
         client_id,
         client_secret,
         backend_url,
@@ -11,6 +11,14 @@ from fastapi import APIRouter
 # test_router = APIRouter()
 
 
+async def start_async_http_client():
+    await Container.async_upstream_http_client().start()
+
+
+async def close_async_http_client():
+    await Container.async_upstream_http_client().close()
+
+
 def init() -> FastAPI:
     rollbar.init(
         access_token=Container.rollbar_token,
@@ -44,4 +52,7 @@ def init() -> FastAPI:
     #     name="static"
     # )
     add_exception_handlers_to_app(app)
+    # the httpx client of the native async auth service belongs to the event loop serving the app
+    app.add_event_handler('startup', start_async_http_client)
+    app.add_event_handler('shutdown', close_async_http_client)
     return app
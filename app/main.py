@@ -4,4 +4,6 @@ from app.config.config import Container
 
 Container()
 app = on_startup.init()
-handler = Mangum(app)
+# Mangum 0.13 runs the startup and shutdown events before handling each event: the async http client is left
+# to bind itself to the loop of the invocation instead, and kept alive across invocations
+handler = Mangum(app, lifespan="off")
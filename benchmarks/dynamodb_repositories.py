@@ -0,0 +1,101 @@
+"""
+Compares the Table-resource repository (DynamoDBRepository) with the low-level client one
+(DynamoDBClientRepository) over a full login round trip: create state, validate + store tokens, pop.
+
+Runs against DynamoDB Local (or any endpoint) given by DYNAMODB_LOCAL_URL; the table is created if missing.
+The client repository uses the botocore config the backend ships with (DYNAMODB_* variables included):
+
+    DYNAMODB_LOCAL_URL=http://localhost:8088 AUTH_TABLE=Auth-bench python benchmarks/dynamodb_repositories.py
+"""
+import logging
+import os
+import time
+import uuid
+import boto3
+from app.adapters.repositories.DynamoDBAdapter import DynamoDBRepository
+from app.adapters.repositories.DynamoDBClientAdapter import DynamoDBClientRepository
+from app.business_logic.models.authentication import AuthenticationState
+
+ENDPOINT_URL = os.environ.get('DYNAMODB_LOCAL_URL', 'http://localhost:8088')
+TABLE_NAME = os.environ.get('AUTH_TABLE', 'Auth-bench')
+ITERATIONS = int(os.environ.get('ITERATIONS', 200))
+# the Container reads its whole configuration from the environment once imported: these are not used here
+CONTAINER_PLACEHOLDERS = {
+    'PLATFORM': 'benchmark',
+    'STAGE': 'benchmark',
+    'BACKEND_URL': 'http://localhost',
+    'PRIVATE_KEY': 'benchmark',
+    'AUTHENTICATION_ROUTE_PREFIX': 'auth',
+    'AUTHORIZATION_ROUTE_PREFIX': 'oauth',
+    'CLIENT_ID': 'benchmark',
+    'CLIENT_SECRET': 'benchmark',
+    'ROLLBAR_TOKEN': 'benchmark',
+    'ROLLBAR_ENVIRONMENT': 'benchmark',
+    'ROLLBAR_ENABLED': '',
+    'IDENTITY_PROVIDER_URL': 'http://localhost',
+    'IDENTITY_PROVIDER_TIMEOUT': '1',
+}
+
+
+def ensure_table():
+    client = boto3.client('dynamodb', endpoint_url=ENDPOINT_URL)
+    if TABLE_NAME in client.list_tables()['TableNames']:
+        return
+    client.create_table(
+        TableName=TABLE_NAME,
+        AttributeDefinitions=[{'AttributeName': 'State', 'AttributeType': 'S'}],
+        KeySchema=[{'AttributeName': 'State', 'KeyType': 'HASH'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    client.get_waiter('table_exists').wait(TableName=TABLE_NAME)
+
+
+def round_trip(repository):
+    state = str(uuid.uuid4())
+    repository.create_authentication_state(state)
+    auth_state = AuthenticationState(
+        state=state, access_token='access-token', refresh_token=str(uuid.uuid4()), id_token='id-token'
+    )
+    repository.validate_and_update_authentication_state(auth_state)
+    repository.pop_authentication_state(state, auth_state.refresh_token)
+
+
+def run(name, repository):
+    round_trip(repository)  # warm up the connection pool
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        round_trip(repository)
+    elapsed = time.perf_counter() - started
+    print(f'{name:<28}{ITERATIONS / elapsed:>10.1f} logins/s{elapsed / ITERATIONS * 1000:>10.2f} ms/login')
+
+
+def get_shipped_client_config():
+    for name, value in {**CONTAINER_PLACEHOLDERS, 'AUTH_TABLE': TABLE_NAME}.items():
+        os.environ.setdefault(name, value)
+    from app.config.config import Container, get_dynamodb_client_config
+
+    return get_dynamodb_client_config(
+        Container.dynamodb_max_pool_connections,
+        Container.dynamodb_connect_timeout,
+        Container.dynamodb_read_timeout,
+        Container.dynamodb_max_attempts
+    )
+
+
+def main():
+    logger = logging.getLogger('benchmark')
+    ensure_table()
+    client_config = get_shipped_client_config()
+
+    def get_table():
+        return boto3.resource('dynamodb', endpoint_url=ENDPOINT_URL).Table(TABLE_NAME)
+
+    def get_client():
+        return boto3.client('dynamodb', endpoint_url=ENDPOINT_URL, config=client_config)
+
+    run('DynamoDBRepository', DynamoDBRepository(logger, get_table, 900, 120))
+    run('DynamoDBClientRepository', DynamoDBClientRepository(logger, get_client, TABLE_NAME, 900, 120))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Error path throughput: resolving the error code of an exception, and building the JSON error response with it.
+The previous resolution (one throwaway instance per level of the MRO) is kept here for comparison:
+
+    python benchmarks/error_responses.py
+"""
+import inspect
+import os
+import timeit
+from pydantic import BaseModel, ValidationError
+from app.adapters.rest.auth_serializer import Serializer
+from app.adapters.rest.dtos.exceptions import Exception_Error_Code_Mapping, get_error_code_for_exception
+from app.business_logic.exceptions import InvalidRefreshToken, ResourceAlreadyExists, TimeoutException
+
+ITERATIONS = int(os.environ.get('ITERATIONS', 50000))
+
+
+class UnmappedException(TimeoutException):
+    pass
+
+
+class RequiredArgumentException(ResourceAlreadyExists):
+    def __init__(self, resource: str):
+        super().__init__(f'{resource} already exists')
+
+
+class UserAlreadyExists(RequiredArgumentException):
+    def __init__(self):
+        super().__init__('user')
+
+
+class _Model(BaseModel):
+    value: int
+
+
+def get_error_code_for_exception_instantiating(exception: Exception) -> int:
+    if type(exception) == object:
+        return -1
+
+    if type(exception) in Exception_Error_Code_Mapping:
+        return Exception_Error_Code_Mapping[type(exception)]
+
+    next_class_in_mro = inspect.getmro(type(exception))[1]
+    return get_error_code_for_exception_instantiating(next_class_in_mro())
+
+
+def get_validation_error() -> ValidationError:
+    try:
+        _Model(value='x')
+    except ValidationError as e:
+        return e
+
+
+EXCEPTIONS = {
+    'mapped class': InvalidRefreshToken('refresh_token invalid or expired'),
+    'subclass, 2 levels': UnmappedException('upstream timed out'),
+    'parent requires argument': UserAlreadyExists(),
+    'pydantic ValidationError': get_validation_error(),
+}
+
+
+def per_second(fn) -> float:
+    return ITERATIONS / timeit.timeit(fn, number=ITERATIONS)
+
+
+def main():
+    print(f'{"exception":<28}{"instantiating (/s)":>20}{"memoized (/s)":>16}{"json response (/s)":>20}')
+    for name, exception in EXCEPTIONS.items():
+        try:
+            instantiating = f'{per_second(lambda: get_error_code_for_exception_instantiating(exception)):,.0f}'
+        except TypeError:
+            instantiating = 'crashes'
+        memoized = per_second(lambda: get_error_code_for_exception(exception))
+        json_response = per_second(lambda: Serializer.get_json_response_for_exception(exception, 400))
+        print(f'{name:<28}{instantiating:>20}{memoized:>16,.0f}{json_response:>20,.0f}')
+
+
+if __name__ == '__main__':
+    main()
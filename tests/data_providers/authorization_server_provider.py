@@ -194,6 +194,44 @@ def get_exchange_refresh_for_access_request_data():
     }
 
 
+def get_exchange_with_stored_user_info_request_data():
+    yield {
+        'session_id': session_id,
+        'access_token': access_token,
+        'refresh_token': refresh_token,
+        'id_token': id_token,
+        'user_info': user_info,
+        # plain name/value pairs: the client sends them whatever its domain and the path of the route
+        'cookies_in_frontend': {
+            f'{RefreshTokenCookie.cookie_name}&path.{TestUtils.STAGE}'
+            f'.{TestUtils.AUTHENTICATION_ROUTE_PREFIX}.exchange_refresh_for_access': refresh_token
+        },
+        # in the order they are set: the refresh cookies first
+        'expected_cookies': [
+            {
+                'name': f'{RefreshTokenCookie.cookie_name}&path.{TestUtils.STAGE}'
+                        f'.{TestUtils.AUTHENTICATION_ROUTE_PREFIX}.refresh_token',
+                'path': f'/{TestUtils.STAGE}/{TestUtils.AUTHENTICATION_ROUTE_PREFIX}/refresh_token',
+                'value': refresh_token
+            },
+            {
+                'name': f'{RefreshTokenCookie.cookie_name}&path.{TestUtils.STAGE}'
+                        f'.{TestUtils.AUTHENTICATION_ROUTE_PREFIX}.logout',
+                'path': f'/{TestUtils.STAGE}/{TestUtils.AUTHENTICATION_ROUTE_PREFIX}/logout',
+                'value': refresh_token
+            },
+            {
+                'name': StateCookie.cookie_name,
+                'path': '/',
+                'value': StateCookie(
+                    refresh_token_is_set=True,
+                    user_info={'username': user_info.first_name}
+                ).as_jwt(TestUtils.PRIVATE_KEY)
+            },
+        ]
+    }
+
+
 def get_refresh_token_request_data():
     yield {
         'session_id': session_id,
@@ -17,27 +17,29 @@ def test_get_home(data: dict, backend_repository, client):
 
 
 @mark.parametrize("data", authorization_server_provider.get_authorization_server_redirect_data())
-@patch('requests.post')
+@patch('app.adapters.service_adapters.upstream_http_client.UpstreamHttpClient.post')
 def test_login_redirect(
         post_mock: Mock,
         data: dict,
         backend_repository,
+        token_service,
         client
 ):
     backend_repository.create_authentication_state.return_value = AuthenticationState(state=data['session_id'])
+    token_service.parse_trusted_id_token.return_value = data['user_info']
     post_mock.return_value = data['exchange_code_for_token_mocked_response']
     expected_cookies = data['expected_cookies']
 
     response = client.get(f'/auth/login_redirect', params={'state': data['session_id'], 'code': data['code']},
                           allow_redirects=False)
 
-    backend_repository.get_authentication_state.assert_called_with(data['session_id'])
-    backend_repository.update_authentication_state.assert_called_with(
+    backend_repository.validate_and_update_authentication_state.assert_called_with(
         AuthenticationState(
             state=data['session_id'],
             access_token=data['access_token'],
             refresh_token=data['refresh_token'],
-            id_token=data['id_token']
+            id_token=data['id_token'],
+            user_info=data['user_info']
         )
     )
     assert response.status_code == 302
@@ -45,7 +47,7 @@ def test_login_redirect(
 
 
 @mark.parametrize("data", authorization_server_provider.get_authorization_server_redirect_data())
-@patch('requests.post')
+@patch('app.adapters.service_adapters.upstream_http_client.UpstreamHttpClient.post')
 def test_code_redirect_for_signup(
         post_mock: Mock,
         data: dict,
@@ -55,7 +57,7 @@ def test_code_redirect_for_signup(
         client
 ):
     backend_repository.create_authentication_state.return_value = AuthenticationState(state=data['session_id'])
-    token_service.validate_id_token.return_value = data['user_info']
+    token_service.parse_trusted_id_token.return_value = data['user_info']
     post_mock.return_value = data['exchange_code_for_token_mocked_response']
     expected_cookies = data['expected_cookies']
 
@@ -68,7 +70,8 @@ def test_code_redirect_for_signup(
             state=data['session_id'],
             access_token=data['access_token'],
             refresh_token=data['refresh_token'],
-            id_token=data['id_token']
+            id_token=data['id_token'],
+            user_info=data['user_info']
         )
     )
     assert response.status_code == 302
@@ -105,8 +108,39 @@ def test_exchange_refresh_for_access(
     _validate_response_cookies(response, expected_cookies)
 
 
+@mark.parametrize("data", authorization_server_provider.get_exchange_with_stored_user_info_request_data())
+def test_exchange_refresh_for_access_with_stored_user_info(
+        data: dict,
+        backend_repository,
+        token_service,
+        client
+):
+    cookies = data['cookies_in_frontend']
+    backend_repository.pop_authentication_state.return_value = AuthenticationState(
+        state=data['session_id'],
+        refresh_token=data['refresh_token'],
+        access_token=data['access_token'],
+        id_token=data['id_token'],
+        user_info=data['user_info']
+    )
+    token_service.validate_id_token.reset_mock()
+    expected_cookies = data['expected_cookies']
+
+    response = client.put(
+        f'/auth/exchange_refresh_for_access',
+        json={'state': data['session_id']},
+        cookies=cookies,
+        allow_redirects=False,
+    )
+    assert response.status_code == 200
+    backend_repository.pop_authentication_state.assert_called_with(data['session_id'], data['refresh_token'])
+    token_service.validate_id_token.assert_not_called()
+    assert response.json() == {'access_token': data['access_token']}
+    _validate_response_cookies(response, expected_cookies)
+
+
 @mark.parametrize("data", authorization_server_provider.get_refresh_token_request_data())
-@patch('requests.post')
+@patch('app.adapters.service_adapters.upstream_http_client.UpstreamHttpClient.post')
 def test_refresh_token(
         post_mock: Mock,
         data: dict,
@@ -130,14 +164,16 @@ def test_refresh_token(
 
 
 @mark.parametrize("data", authorization_server_provider.get_logout_request_data())
-@patch('requests.post')
+@patch('app.adapters.service_adapters.upstream_http_client.UpstreamHttpClient.post')
 def test_logout(
         post_mock: Mock,
         data: dict,
+        token_service,
         client
 ):
     cookies = data['cookies_in_frontend']
     post_mock.return_value = data['refresh_token_mocked_response']
+    token_service.get_revocation_endpoint_from_well_known_url.return_value = 'https://oauth2.googleapis.com/revoke'
 
     response = client.put(
         f'/auth/logout',
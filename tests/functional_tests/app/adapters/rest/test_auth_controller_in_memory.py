@@ -0,0 +1,110 @@
+import jwt
+from uuid import uuid4
+from pytest import fixture, mark
+from unittest.mock import patch, Mock
+from app.adapters.repositories.InMemoryAdapter import InMemoryRepository
+from app.adapters.rest.dtos.cookies import StateCookie
+from tests.data_providers import authorization_server_provider
+from tests.test_utils import TestUtils
+
+
+@fixture
+def in_memory_repository(container, client) -> InMemoryRepository:
+    """
+    A real backend instead of the mocked one: the services get rebuilt on top of it, and again after the test.
+    """
+    repository = InMemoryRepository(state_ttl=900, auth_state_ttl=120, max_size=1000, stripes=4)
+    container.backend_repository.override(repository)
+    container.auth_service.reset()
+    container.async_backend_repository.reset()
+    yield repository
+    container.auth_service.reset()
+    container.async_backend_repository.reset()
+
+
+@mark.parametrize("data", authorization_server_provider.get_exchange_with_stored_user_info_request_data())
+@patch('app.adapters.service_adapters.upstream_http_client.UpstreamHttpClient.post')
+def test_login_then_exchange_refresh_for_access(
+        post_mock: Mock,
+        data: dict,
+        token_service,
+        in_memory_repository,
+        client
+):
+    post_mock.return_value = authorization_server_provider._get_exchange_code_for_token_mocked_response()
+    token_service.parse_trusted_id_token.return_value = data['user_info']
+    token_service.validate_id_token.reset_mock()
+
+    response = client.get('/auth/stateful', allow_redirects=False)
+    state = jwt.decode(
+        response.cookies[StateCookie.cookie_name], TestUtils.PRIVATE_KEY, algorithms=['HS256']
+    )['session_identifier']
+    assert in_memory_repository.get_authentication_state(state).state == state
+
+    response = client.get(
+        '/auth/login_redirect',
+        params={'state': state, 'code': 'code', 'redirected_from_popup': False},
+        allow_redirects=False
+    )
+    assert response.status_code == 302
+
+    response = client.put(
+        '/auth/exchange_refresh_for_access',
+        json={'state': state},
+        cookies=data['cookies_in_frontend'],
+        allow_redirects=False
+    )
+    assert response.status_code == 200
+    assert response.json() == {'access_token': data['access_token']}
+    # the user info stored at login is used: the id_token does not get validated again
+    token_service.validate_id_token.assert_not_called()
+
+    # the tokens are handed out once
+    response = client.put(
+        '/auth/exchange_refresh_for_access',
+        json={'state': state},
+        cookies=data['cookies_in_frontend'],
+        allow_redirects=False
+    )
+    assert response.status_code == 302
+
+
+@mark.parametrize("data", authorization_server_provider.get_exchange_with_stored_user_info_request_data())
+@patch('app.adapters.service_adapters.upstream_http_client.UpstreamHttpClient.post')
+def test_login_with_invalid_state_does_not_exchange_the_code(
+        post_mock: Mock,
+        data: dict,
+        token_service,
+        in_memory_repository,
+        client
+):
+    post_mock.return_value = authorization_server_provider._get_exchange_code_for_token_mocked_response()
+    token_service.parse_trusted_id_token.return_value = data['user_info']
+    state = in_memory_repository.create_authentication_state(str(uuid4())).state
+    client.get(
+        '/auth/login_redirect',
+        params={'state': state, 'code': 'code', 'redirected_from_popup': False},
+        allow_redirects=False
+    )
+    response = client.put(
+        '/auth/exchange_refresh_for_access',
+        json={'state': state},
+        cookies=data['cookies_in_frontend'],
+        allow_redirects=False
+    )
+    assert response.status_code == 200
+    post_mock.reset_mock()
+
+    for forged_or_used_state in (str(uuid4()), state):
+        response = client.get(
+            '/auth/login_redirect',
+            params={'state': forged_or_used_state, 'code': 'code', 'redirected_from_popup': False},
+            allow_redirects=False
+        )
+
+        assert response.status_code == 302
+        assert jwt.decode(
+            response.cookies[StateCookie.cookie_name], TestUtils.PRIVATE_KEY, algorithms=['HS256']
+        )['error_code'] == 401
+        # the code is not sent to the token endpoint
+        post_mock.assert_not_called()
@@ -24,7 +24,8 @@ def test_login_redirect_exceptions(data: dict, authentication_service, container
         authentication_service.exchange_code_for_token.side_effect = data['exchange_code_for_token_exception']
     if 'temporarily_store_auth_state_exception' in data:
         authentication_service.exchange_code_for_token.side_effect = None
-        authentication_service.temporarily_store_auth_state.side_effect = data['temporarily_store_auth_state_exception']
+        authentication_service.validate_state_and_store_auth_state.side_effect = \
+            data['temporarily_store_auth_state_exception']
 
     response = client.get(
         f'/auth/login_redirect', params={'state': data['session_id'], 'code': data['code']}, allow_redirects=False)
@@ -0,0 +1,40 @@
+import json
+from unittest.mock import Mock, patch
+from app.adapters.service_adapters.bulk_user_provisioner import BulkUserProvisioner
+from app.adapters.service_adapters.identity_provider_client import IdentityProviderClient
+from app.business_logic.exceptions import ResourceAlreadyExists
+
+
+def test_results_are_written_per_record(tmp_path):
+    # the container reads the environment set by the session fixture, once imported
+    from app.adapters.cli.provision_users import main
+    from app.config.config import Container
+
+    records = tmp_path / 'users.jsonl'
+    records.write_text(
+        '{"email": "new@example.com", "first_name": "New", "external_identifier": "new"}\n'
+        '\n'
+        '{"email": "old@example.com", "first_name": "Old", "external_identifier": "old"}\n'
+        'not json\n'
+    )
+    results = tmp_path / 'results.jsonl'
+    identity_provider_service = Mock(spec_set=IdentityProviderClient)
+    identity_provider_service.sign_up_user.side_effect = [None, ResourceAlreadyExists()]
+
+    with Container.identity_provider_service.override(identity_provider_service), \
+            patch('app.adapters.cli.provision_users.BulkUserProvisioner', wraps=BulkUserProvisioner) as provisioner:
+        exit_code = main([str(records), '--results', str(results), '--workers', '1000'])
+
+    assert exit_code == 1
+    assert provisioner.call_args.args[2] == Container.identity_provider_max_concurrent_calls
+    written = [json.loads(line) for line in results.read_text().splitlines()]
+    assert sorted(written, key=lambda result: result['record_number']) == [
+        {'record_number': 1, 'external_identifier': 'new', 'status': 'created', 'error': None},
+        {'record_number': 3, 'external_identifier': 'old', 'status': 'already_exists', 'error': None},
+        {
+            'record_number': 4,
+            'external_identifier': None,
+            'status': 'failed',
+            'error': 'invalid json: Expecting value: line 1 column 1 (char 0)'
+        },
+    ]
@@ -0,0 +1,193 @@
+from unittest.mock import Mock, patch
+from pytest import fixture, raises
+from app.adapters.concurrency.circuit_breaker import CircuitBreaker, CircuitOpenException
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@fixture
+def clock():
+    clock = Clock()
+    with patch('app.adapters.concurrency.circuit_breaker.time.monotonic', clock):
+        yield clock
+
+
+def get_circuit_breaker(is_failure=lambda e: True) -> CircuitBreaker:
+    return CircuitBreaker(
+        Mock(),
+        'test',
+        window_seconds=10,
+        buckets=10,
+        minimum_calls=4,
+        failure_rate_threshold=0.5,
+        slow_call_duration=1,
+        slow_call_rate_threshold=1,
+        open_duration=5,
+        half_open_calls=2,
+        max_concurrent_calls=2,
+        is_failure=is_failure
+    )
+
+
+def succeed():
+    return 'ok'
+
+
+def fail():
+    raise ValueError('failed')
+
+
+def call(circuit_breaker: CircuitBreaker, fn):
+    try:
+        return circuit_breaker.call(fn)
+    except ValueError:
+        pass
+
+
+def open_circuit(circuit_breaker: CircuitBreaker):
+    for _ in range(circuit_breaker.minimum_calls):
+        call(circuit_breaker, fail)
+    assert circuit_breaker.state == CircuitBreaker.OPEN
+
+
+def test_circuit_opens_on_failure_rate(clock):
+    circuit_breaker = get_circuit_breaker()
+    for fn in (succeed, fail, succeed):
+        call(circuit_breaker, fn)
+    assert circuit_breaker.state == CircuitBreaker.CLOSED
+
+    call(circuit_breaker, fail)
+
+    assert circuit_breaker.state == CircuitBreaker.OPEN
+    fn = Mock()
+    with raises(CircuitOpenException, match='test circuit is open'):
+        circuit_breaker.call(fn)
+    fn.assert_not_called()
+    assert circuit_breaker.get_metrics()['rejected_while_open'] == 1
+
+
+def test_circuit_stays_closed_below_minimum_calls(clock):
+    circuit_breaker = get_circuit_breaker()
+    for _ in range(circuit_breaker.minimum_calls - 1):
+        call(circuit_breaker, fail)
+
+    assert circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failures_leave_the_rolling_window(clock):
+    circuit_breaker = get_circuit_breaker()
+    for _ in range(3):
+        call(circuit_breaker, fail)
+    clock.now += 10
+
+    call(circuit_breaker, fail)
+
+    assert circuit_breaker.state == CircuitBreaker.CLOSED
+    assert circuit_breaker.get_metrics()['calls'] == 1
+
+
+def test_errors_not_counted_as_failures(clock):
+    circuit_breaker = get_circuit_breaker(is_failure=lambda e: not isinstance(e, ValueError))
+    for _ in range(8):
+        call(circuit_breaker, fail)
+
+    assert circuit_breaker.state == CircuitBreaker.CLOSED
+    assert circuit_breaker.get_metrics()['failure_rate'] == 0
+
+
+def test_circuit_opens_on_slow_call_rate(clock):
+    circuit_breaker = get_circuit_breaker()
+
+    def slow():
+        clock.now += 1
+
+    for _ in range(circuit_breaker.minimum_calls):
+        circuit_breaker.call(slow)
+
+    assert circuit_breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_circuit_closes_once_probes_succeed(clock):
+    circuit_breaker = get_circuit_breaker()
+    open_circuit(circuit_breaker)
+    clock.now += 5
+
+    assert circuit_breaker.call(succeed) == 'ok'
+    assert circuit_breaker.state == CircuitBreaker.HALF_OPEN
+    assert circuit_breaker.call(succeed) == 'ok'
+
+    assert circuit_breaker.state == CircuitBreaker.CLOSED
+    assert circuit_breaker.get_metrics()['calls'] == 0
+
+
+def test_half_open_circuit_reopens_when_a_probe_fails(clock):
+    circuit_breaker = get_circuit_breaker()
+    open_circuit(circuit_breaker)
+    clock.now += 5
+
+    call(circuit_breaker, succeed)
+    call(circuit_breaker, fail)
+
+    assert circuit_breaker.state == CircuitBreaker.OPEN
+    assert circuit_breaker.opened_at == clock.now
+    with raises(CircuitOpenException):
+        circuit_breaker.call(succeed)
+
+
+def test_half_open_circuit_lets_through_a_limited_number_of_probes(clock):
+    circuit_breaker = get_circuit_breaker()
+    open_circuit(circuit_breaker)
+    clock.now += 5
+    rejected = []
+
+    def probe():
+        try:
+            circuit_breaker.call(succeed)
+        except CircuitOpenException as e:
+            rejected.append(str(e))
+
+    # the second probe is in flight while a third call comes in
+    circuit_breaker.call(lambda: circuit_breaker.call(probe))
+
+    assert rejected == ['test circuit is half_open']
+    assert circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_calls_above_the_bulkhead_are_rejected(clock):
+    circuit_breaker = get_circuit_breaker()
+    fn = Mock()
+
+    with raises(CircuitOpenException, match='test has 2 calls in flight'):
+        circuit_breaker.call(lambda: circuit_breaker.call(lambda: circuit_breaker.call(fn)))
+
+    fn.assert_not_called()
+    metrics = circuit_breaker.get_metrics()
+    assert (metrics['rejected_by_bulkhead'], metrics['in_flight'], metrics['state']) == (1, 0, CircuitBreaker.CLOSED)
+    assert circuit_breaker.call(succeed) == 'ok'
+
+
+def test_transitions_are_logged_with_the_metrics(clock):
+    circuit_breaker = get_circuit_breaker()
+    open_circuit(circuit_breaker)
+
+    circuit_breaker.logger.warning.assert_called_once_with(
+        "test circuit: closed -> open, {'state': 'closed', 'calls': 4, 'failure_rate': 1.0, 'slow_call_rate': 0.0, "
+        "'in_flight': 0, 'max_concurrent_calls': 2, 'rejected_while_open': 0, 'rejected_by_bulkhead': 0}"
+    )
+
+    clock.now += 5
+    call(circuit_breaker, succeed)
+    call(circuit_breaker, succeed)
+
+    assert circuit_breaker.state == CircuitBreaker.CLOSED
+    logged = [c.args[0] for c in circuit_breaker.logger.info.call_args_list]
+    assert [message.split(',')[0] for message in logged] == [
+        'test circuit: open -> half_open', 'test circuit: half_open -> closed'
+    ]
+    assert "'calls': 6" in logged[1]
@@ -0,0 +1,77 @@
+import asyncio
+from pytest import raises
+from app.adapters.concurrency.fan_out import gather_or_cancel
+
+
+class FirstError(Exception):
+    pass
+
+
+class SecondError(Exception):
+    pass
+
+
+async def value_after(value, delay: float):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def fail_after(exception: Exception, delay: float):
+    await asyncio.sleep(delay)
+    raise exception
+
+
+def test_results_keep_the_given_order():
+    results = asyncio.run(gather_or_cancel(value_after('slow', 0.05), value_after('fast', 0)))
+
+    assert results == ['slow', 'fast']
+
+
+def test_siblings_are_cancelled_when_one_fails():
+    cancelled = []
+
+    async def sibling():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def run():
+        with raises(FirstError):
+            await asyncio.wait_for(gather_or_cancel(sibling(), fail_after(FirstError(), 0)), timeout=1)
+
+    asyncio.run(run())
+
+    assert cancelled == [True]
+
+
+def test_the_first_exception_is_raised():
+    async def run():
+        return await gather_or_cancel(fail_after(SecondError(), 0.05), fail_after(FirstError(), 0))
+
+    with raises(FirstError):
+        asyncio.run(run())
+
+
+def test_awaitables_are_cancelled_with_the_caller():
+    cancelled = []
+
+    async def child():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def run():
+        task = asyncio.ensure_future(gather_or_cancel(child(), child()))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+    assert cancelled == [True, True]
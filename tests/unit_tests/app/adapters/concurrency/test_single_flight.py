@@ -0,0 +1,147 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from unittest.mock import Mock
+from pytest import raises
+from app.adapters.concurrency.single_flight import SingleFlight
+
+CALLERS = 8
+
+
+def call_from_threads(single_flight: SingleFlight, fn) -> list:
+    """
+    {fn} is held until every caller had time to join the call in flight.
+    """
+    release = Event()
+
+    def held_fn():
+        release.wait()
+        return fn()
+
+    def caller():
+        try:
+            return single_flight.do('key', held_fn)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+        futures = [executor.submit(caller) for _ in range(CALLERS)]
+        time.sleep(0.2)
+        release.set()
+        return [future.result() for future in futures]
+
+
+def test_threads_share_the_result():
+    single_flight = SingleFlight()
+    fn = Mock(return_value=object())
+
+    results = call_from_threads(single_flight, fn)
+
+    fn.assert_called_once()
+    assert all(result is fn.return_value for result in results)
+
+
+def test_threads_share_the_exception():
+    single_flight = SingleFlight()
+    fn = Mock(side_effect=ValueError('failed'))
+
+    results = call_from_threads(single_flight, fn)
+
+    fn.assert_called_once()
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len({id(result) for result in results}) == 1
+
+
+def test_key_is_released_once_the_call_finishes():
+    single_flight = SingleFlight()
+    fn = Mock(side_effect=[ValueError('failed'), 'ok'])
+
+    with raises(ValueError):
+        single_flight.do('key', fn)
+
+    assert single_flight.do('key', fn) == 'ok'
+    assert fn.call_count == 2
+
+
+def test_different_keys_are_not_shared():
+    single_flight = SingleFlight()
+
+    assert single_flight.do('first', lambda: 1) == 1
+    assert single_flight.do('second', lambda: 2) == 2
+
+
+def call_from_coroutines(single_flight: SingleFlight, fn) -> list:
+    async def coroutine_function():
+        await asyncio.sleep(0)
+        return fn()
+
+    async def call():
+        return await asyncio.gather(
+            *(single_flight.do_async('key', coroutine_function) for _ in range(CALLERS)), return_exceptions=True)
+
+    return asyncio.run(call())
+
+
+def test_coroutines_share_the_result():
+    single_flight = SingleFlight()
+    fn = Mock(return_value=object())
+
+    results = call_from_coroutines(single_flight, fn)
+
+    fn.assert_called_once()
+    assert all(result is fn.return_value for result in results)
+    assert not any(single_flight._tasks.values())
+
+
+def test_coroutines_share_the_exception():
+    single_flight = SingleFlight()
+    fn = Mock(side_effect=ValueError('failed'))
+
+    results = call_from_coroutines(single_flight, fn)
+
+    fn.assert_called_once()
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len({id(result) for result in results}) == 1
+    assert not any(single_flight._tasks.values())
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    single_flight = SingleFlight()
+
+    async def call():
+        release = asyncio.Event()
+
+        async def coroutine_function():
+            await release.wait()
+            return 'ok'
+
+        cancelled = asyncio.ensure_future(single_flight.do_async('key', coroutine_function))
+        waiting = asyncio.ensure_future(single_flight.do_async('key', coroutine_function))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        release.set()
+        return await asyncio.gather(cancelled, waiting, return_exceptions=True)
+
+    cancelled, result = asyncio.run(call())
+
+    assert isinstance(cancelled, asyncio.CancelledError)
+    assert result == 'ok'
+
+
+def test_calls_are_not_shared_across_event_loops():
+    single_flight = SingleFlight()
+    fn = Mock(return_value='ok')
+
+    async def coroutine_function():
+        await asyncio.sleep(0.1)
+        return fn()
+
+    def call_on_own_loop():
+        return asyncio.run(single_flight.do_async('key', coroutine_function))
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(lambda _: call_on_own_loop(), range(2)))
+
+    assert results == ['ok', 'ok']
+    assert fn.call_count == 2
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import httpx
+from pytest import raises
+from unittest.mock import AsyncMock, Mock
+from app.adapters.oauth.async_google_authentication_service import AsyncGoogleAuthenticationService
+from app.adapters.service_adapters.async_upstream_http_client import AsyncUpstreamHttpClient
+from app.business_logic.async_authentication_repository import AsyncAuthenticationRepository
+from app.business_logic.exceptions import InvalidState, UnauthorizedException, InvalidRefreshToken
+from app.business_logic.models.authentication import AuthenticationState, UserInfo
+from app.business_logic.token_service import TokenService
+
+TOKEN_ENDPOINT = 'https://auth.local/token'
+USER_INFO = UserInfo(email='user@example.com', first_name='User', external_identifier='sub')
+TOKENS = {'access_token': 'access', 'refresh_token': 'refresh', 'id_token': 'id'}
+
+
+def get_service(token_response: httpx.Response) -> AsyncGoogleAuthenticationService:
+    backend_repository = Mock(spec_set=AsyncAuthenticationRepository)
+    backend_repository.get_authentication_state = AsyncMock(return_value=AuthenticationState(state='state'))
+    token_service = Mock(spec_set=TokenService)
+    token_service.get_token_endpoint_from_well_known_url.return_value = TOKEN_ENDPOINT
+    token_service.parse_trusted_id_token.return_value = USER_INFO
+    http_client = Mock(spec_set=AsyncUpstreamHttpClient)
+    http_client.post = AsyncMock(return_value=token_response)
+
+    return AsyncGoogleAuthenticationService(
+        'test',
+        logging.getLogger(),
+        'client_id',
+        'client_secret',
+        backend_repository,
+        Mock(),
+        token_service,
+        http_client,
+        'https://backend.local/auth'
+    )
+
+
+def test_exchange_code_for_token():
+    service = get_service(httpx.Response(200, json=TOKENS))
+
+    auth_state = asyncio.run(service.exchange_code_for_token('state', 'code', '/login_redirect'))
+
+    assert auth_state == AuthenticationState(state='state', user_info=USER_INFO, **TOKENS)
+    service.backend_repository.get_authentication_state.assert_awaited_once_with('state')
+    service.token_service.parse_trusted_id_token.assert_called_once_with('id', 'client_id')
+    assert service.http_client.post.call_args.args == (TOKEN_ENDPOINT,)
+    assert service.http_client.post.call_args.kwargs['data'] == {
+        'code': 'code',
+        'client_id': 'client_id',
+        'client_secret': 'client_secret',
+        'redirect_uri': 'https://backend.local/auth/login_redirect',
+        'grant_type': 'authorization_code'
+    }
+
+
+def test_exchange_code_for_token_rejected_by_the_token_endpoint():
+    service = get_service(httpx.Response(400, json={'error': 'invalid_grant'}))
+
+    with raises(UnauthorizedException, match='Bad Request'):
+        asyncio.run(service.exchange_code_for_token('state', 'code', '/login_redirect'))
+
+
+def test_exchange_code_for_token_with_invalid_state():
+    service = get_service(httpx.Response(200, json=TOKENS))
+    service.backend_repository.get_authentication_state.side_effect = InvalidState('invalid state')
+
+    with raises(InvalidState):
+        asyncio.run(service.exchange_code_for_token('state', 'code', '/login_redirect'))
+
+    service.http_client.post.assert_not_called()
+
+
+def test_refresh_access_token():
+    service = get_service(httpx.Response(200, json=TOKENS))
+
+    auth_state = asyncio.run(service.refresh_access_token('refresh'))
+
+    assert auth_state == AuthenticationState(**TOKENS)
+    assert service.http_client.post.call_args.kwargs['data'] == {
+        'refresh_token': 'refresh',
+        'client_id': 'client_id',
+        'client_secret': 'client_secret',
+        'grant_type': 'refresh_token'
+    }
+
+
+def test_refresh_access_token_rejected_by_the_token_endpoint():
+    service = get_service(httpx.Response(400, json={'error': 'invalid_grant'}))
+
+    with raises(InvalidRefreshToken):
+        asyncio.run(service.refresh_access_token('refresh'))
@@ -0,0 +1,98 @@
+from unittest.mock import Mock, patch
+from pytest import fixture, raises
+from app.adapters.oauth.cached_token_service import CachedTokenService
+from app.business_logic.exceptions import InvalidIdToken
+from app.business_logic.models.authentication import UserInfo
+from app.business_logic.token_service import TokenService
+
+NOW = 1_000_000
+
+
+@fixture
+def now():
+    now = Mock(return_value=NOW)
+    with patch('app.adapters.cache.ttl_lru_cache.time.time', now):
+        yield now
+
+
+def get_user_info(external_identifier: str = 'sub', expires_at=NOW + 60) -> UserInfo:
+    return UserInfo(
+        email='user@example.com', first_name='User', external_identifier=external_identifier, expires_at=expires_at
+    )
+
+
+def get_service(max_size: int = 8) -> CachedTokenService:
+    token_service = Mock(spec_set=TokenService)
+    token_service.validate_id_token.side_effect = lambda id_token, client_id: get_user_info(id_token)
+    return CachedTokenService(Mock(), token_service, max_size)
+
+
+def test_verified_token_is_served_from_the_cache(now):
+    service = get_service()
+
+    first = service.validate_id_token('token', 'client_id')
+    second = service.validate_id_token('token', 'client_id')
+
+    assert first == second == get_user_info('token')
+    service.token_service.validate_id_token.assert_called_once_with('token', 'client_id')
+    assert service.verified_tokens.get_stats()['hits'] == 1
+
+
+def test_cache_key_includes_the_client_id(now):
+    service = get_service()
+
+    service.validate_id_token('token', 'client_id')
+    service.validate_id_token('token', 'other_client_id')
+
+    assert service.token_service.validate_id_token.call_count == 2
+
+
+def test_token_is_verified_again_once_it_expires(now):
+    service = get_service()
+    service.validate_id_token('token', 'client_id')
+
+    now.return_value = NOW + 59
+    service.validate_id_token('token', 'client_id')
+    assert service.token_service.validate_id_token.call_count == 1
+
+    now.return_value = NOW + 60
+    service.validate_id_token('token', 'client_id')
+    assert service.token_service.validate_id_token.call_count == 2
+
+
+def test_least_recently_used_token_is_evicted(now):
+    service = get_service(max_size=2)
+    service.validate_id_token('first', 'client_id')
+    service.validate_id_token('second', 'client_id')
+    service.validate_id_token('first', 'client_id')
+
+    service.validate_id_token('third', 'client_id')
+
+    assert service.verified_tokens.get_stats()['size'] == 2
+    service.token_service.validate_id_token.reset_mock()
+    service.validate_id_token('first', 'client_id')
+    service.validate_id_token('second', 'client_id')
+    assert [c.args[0] for c in service.token_service.validate_id_token.call_args_list] == ['second']
+
+
+def test_token_failing_verification_is_not_cached(now):
+    service = get_service()
+    service.token_service.validate_id_token.side_effect = InvalidIdToken('invalid signature')
+
+    for _ in range(2):
+        with raises(InvalidIdToken):
+            service.validate_id_token('token', 'client_id')
+
+    assert service.token_service.validate_id_token.call_count == 2
+    assert service.verified_tokens.get_stats()['size'] == 0
+
+
+def test_token_without_expiry_is_not_cached(now):
+    service = get_service()
+    service.token_service.validate_id_token.side_effect = None
+    service.token_service.validate_id_token.return_value = get_user_info(expires_at=None)
+
+    service.validate_id_token('token', 'client_id')
+    service.validate_id_token('token', 'client_id')
+
+    assert service.token_service.validate_id_token.call_count == 2
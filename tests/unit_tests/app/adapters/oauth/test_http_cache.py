@@ -0,0 +1,32 @@
+from pytest import mark
+from unittest.mock import patch
+from app.adapters.oauth.http_cache import get_freshness_lifetime
+
+DATE = 'Sun, 18 Oct 2026 12:00:00 GMT'
+
+
+@mark.parametrize('headers, lifetime', [
+    ({'Cache-Control': 'public, max-age=3600'}, 3600),
+    ({'Cache-Control': 'public, max-age="3600"'}, 3600),
+    ({'Cache-Control': 'Max-Age=3600'}, 3600),
+    ({'Cache-Control': 'max-age=3600', 'Age': '600'}, 3000),
+    ({'Cache-Control': 'max-age=3600', 'Age': '7200'}, 0),
+    ({'Cache-Control': 'max-age=3600', 'Age': 'x'}, 3600),
+    ({'Cache-Control': 'max-age=0'}, 0),
+    ({'Cache-Control': 'max-age=x'}, 0),
+    ({'Cache-Control': 'no-cache, max-age=3600'}, 0),
+    ({'Cache-Control': 'no-store'}, 0),
+    # max-age takes precedence over Expires
+    ({'Cache-Control': 'max-age=60', 'Expires': 'Sun, 18 Oct 2026 13:00:00 GMT', 'Date': DATE}, 60),
+    ({'Expires': 'Sun, 18 Oct 2026 13:00:00 GMT', 'Date': DATE}, 3600),
+    ({'Expires': 'Sun, 18 Oct 2026 11:00:00 GMT', 'Date': DATE}, 0),
+    ({'Expires': '0', 'Date': DATE}, 0),
+    ({}, 0),
+])
+def test_freshness_lifetime(headers: dict, lifetime: int):
+    assert get_freshness_lifetime(headers) == lifetime
+
+
+def test_expires_without_date_is_relative_to_now():
+    with patch('app.adapters.oauth.http_cache.time.time', return_value=1792324800.0):  # 2026-10-18 12:00:00 GMT
+        assert get_freshness_lifetime({'Expires': 'Sun, 18 Oct 2026 12:10:00 GMT'}) == 600
@@ -0,0 +1,148 @@
+import json
+import logging
+import time
+import jwt
+import requests
+from pytest import raises, fixture, mark
+from unittest.mock import Mock, patch
+from cryptography.hazmat.primitives.asymmetric import rsa
+from app.adapters.oauth.jwks_cache import JwksCache
+from app.business_logic.exceptions import InvalidIdToken, ServerException, TimeoutException
+
+
+@fixture(scope='module')
+def jwk() -> dict:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return {**json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key())), 'kid': 'known'}
+
+
+@fixture
+def clock():
+    clock = Mock(return_value=1000.0)
+    with patch('app.adapters.oauth.jwks_cache.time.monotonic', clock):
+        yield clock
+
+
+def get_jwks_response(*jwks: dict) -> Mock:
+    response = Mock(headers={'Cache-Control': 'max-age=3600'})
+    response.json.return_value = {'keys': list(jwks)}
+    return response
+
+
+def get_public_numbers(jwk: dict):
+    return jwt.PyJWK(jwk).key.public_numbers()
+
+
+def get_jwks_cache(http_client: Mock) -> JwksCache:
+    return JwksCache(logging.getLogger(), http_client, lambda: 'https://auth.local/certs', min_refetch_interval=0.1)
+
+
+def test_get_signing_key(jwk):
+    http_client = Mock()
+    http_client.get.return_value = get_jwks_response(jwk)
+    jwks_cache = get_jwks_cache(http_client)
+
+    assert jwks_cache.get_signing_key('known').public_numbers() == get_public_numbers(jwk)
+    assert jwks_cache.get_signing_key('known').public_numbers() == get_public_numbers(jwk)
+    http_client.get.assert_called_once_with('https://auth.local/certs', verify=True)
+
+
+def test_unknown_kid_in_fetched_key_set(jwk):
+    http_client = Mock()
+    http_client.get.return_value = get_jwks_response(jwk)
+    jwks_cache = get_jwks_cache(http_client)
+
+    with raises(InvalidIdToken):
+        jwks_cache.get_signing_key('unknown')
+
+
+def test_key_set_could_not_be_fetched(jwk):
+    http_client = Mock()
+    http_client.get.side_effect = requests.ConnectionError('connection refused')
+    jwks_cache = get_jwks_cache(http_client)
+
+    with raises(ServerException):
+        jwks_cache.get_signing_key('known')
+    # no refetch yet: still a server error, not an invalid id_token
+    with raises(ServerException) as e:
+        jwks_cache.get_signing_key('known')
+    assert not isinstance(e.value, InvalidIdToken)
+
+    http_client.get.side_effect = None
+    http_client.get.return_value = get_jwks_response(jwk)
+    time.sleep(0.15)
+    assert jwks_cache.get_signing_key('known') is not None
+
+
+def test_key_set_could_not_be_fetched_in_time():
+    http_client = Mock()
+    http_client.get.side_effect = TimeoutException('read timed out')
+    jwks_cache = get_jwks_cache(http_client)
+
+    with raises(TimeoutException):
+        jwks_cache.get_signing_key('known')
+
+
+def test_stale_keys_are_served_while_the_refetch_fails(jwk):
+    http_client = Mock()
+    http_client.get.return_value = get_jwks_response(jwk)
+    jwks_cache = get_jwks_cache(http_client)
+    jwks_cache.get_signing_key('known')
+
+    http_client.get.side_effect = requests.ConnectionError('connection refused')
+    time.sleep(0.15)
+
+    assert jwks_cache.get_signing_key('known') is not None
+    with raises(ServerException):
+        jwks_cache.get_signing_key('rotated')
+
+
+def test_unknown_kid_refetches_at_most_once_per_interval(jwk, clock):
+    rotated_jwk = {**jwk, 'kid': 'rotated'}
+    http_client = Mock()
+    http_client.get.return_value = get_jwks_response(jwk)
+    jwks_cache = JwksCache(logging.getLogger(), http_client, lambda: 'https://auth.local/certs')
+    jwks_cache.get_signing_key('known')
+
+    # the key set was fetched less than 30s ago: an unknown kid does not refetch it
+    clock.return_value += 29
+    with raises(InvalidIdToken):
+        jwks_cache.get_signing_key('rotated')
+    assert http_client.get.call_count == 1
+
+    http_client.get.return_value = get_jwks_response(jwk, rotated_jwk)
+    clock.return_value += 1
+    assert jwks_cache.get_signing_key('rotated').public_numbers() == get_public_numbers(rotated_jwk)
+    assert http_client.get.call_count == 2
+
+    for _ in range(3):
+        with raises(InvalidIdToken):
+            jwks_cache.get_signing_key('forged')
+    assert http_client.get.call_count == 2
+
+    clock.return_value += 30
+    with raises(InvalidIdToken):
+        jwks_cache.get_signing_key('forged')
+    assert http_client.get.call_count == 3
+
+
+@mark.parametrize('fail', [
+    lambda response: setattr(response.raise_for_status, 'side_effect', requests.HTTPError('503 Service Unavailable')),
+    lambda response: setattr(response.json, 'side_effect', ValueError('Expecting value')),
+])
+def test_failed_fetch_is_a_server_error(jwk, clock, fail):
+    response = get_jwks_response(jwk)
+    fail(response)
+    http_client = Mock()
+    http_client.get.return_value = response
+    jwks_cache = JwksCache(logging.getLogger(), http_client, lambda: 'https://auth.local/certs')
+
+    with raises(ServerException, match='Could not fetch the signing keys'):
+        jwks_cache.get_signing_key('known')
+
+    # retried once the refetch interval is over, after which the error is cleared
+    http_client.get.return_value = get_jwks_response(jwk)
+    clock.return_value += 30
+    assert jwks_cache.get_signing_key('known').public_numbers() == get_public_numbers(jwk)
+    with raises(InvalidIdToken):
+        jwks_cache.get_signing_key('unknown')
@@ -0,0 +1,104 @@
+import logging
+from threading import Event
+import requests
+from pytest import mark
+from unittest.mock import Mock, patch
+from app.adapters.oauth.openid_configuration_cache import OpenIdConfigurationCache
+from app.business_logic.exceptions import TimeoutException
+from app.business_logic.models.authentication import OpenIdConfiguration
+
+FALLBACK = OpenIdConfiguration(token_endpoint='https://auth.local/fallback/token')
+
+
+def get_response(document, max_age: int = 3600) -> Mock:
+    response = Mock(headers={'Cache-Control': f'max-age={max_age}'})
+    response.json.return_value = document
+    return response
+
+
+def get_cache(http_client: Mock) -> OpenIdConfigurationCache:
+    return OpenIdConfigurationCache(logging.getLogger(), http_client, 'https://auth.local/.well-known', FALLBACK)
+
+
+def wait_for_refresh(cache: OpenIdConfigurationCache):
+    if cache._background_refresh is not None:
+        cache._background_refresh.join()
+
+
+def test_document_is_cached_while_fresh():
+    http_client = Mock()
+    http_client.get.return_value = get_response({'token_endpoint': 'https://auth.local/token'})
+    cache = get_cache(http_client)
+
+    assert cache.get().token_endpoint == 'https://auth.local/token'
+    assert cache.get().token_endpoint == 'https://auth.local/token'
+    http_client.get.assert_called_once()
+
+
+def test_stale_document_is_served_while_revalidated():
+    fetching = Event()
+    release = Event()
+    http_client = Mock()
+
+    def get(url, verify):
+        if http_client.get.call_count > 1:
+            fetching.set()
+            release.wait()
+            return get_response({'token_endpoint': 'https://auth.local/new/token'})
+        return get_response({'token_endpoint': 'https://auth.local/token'}, max_age=0)
+
+    http_client.get.side_effect = get
+    cache = get_cache(http_client)
+    cache.get()
+
+    # the revalidation is in flight: the stale document is served meanwhile, and no second fetch starts
+    assert cache.get().token_endpoint == 'https://auth.local/token'
+    assert fetching.wait(1)
+    assert cache.get().token_endpoint == 'https://auth.local/token'
+    assert http_client.get.call_count == 2
+
+    release.set()
+    wait_for_refresh(cache)
+    assert cache.get().token_endpoint == 'https://auth.local/new/token'
+
+
+@mark.parametrize('error', [
+    requests.ConnectionError('connection refused'),
+    TimeoutException('timeout'),
+])
+def test_stale_document_is_served_when_the_refresh_fails(error: Exception):
+    http_client = Mock()
+    http_client.get.return_value = get_response({'token_endpoint': 'https://auth.local/token'}, max_age=0)
+    cache = get_cache(http_client)
+    cache.get()
+    http_client.get.side_effect = error
+
+    with patch('app.adapters.oauth.openid_configuration_cache.time.monotonic', return_value=1e9):
+        assert cache.get().token_endpoint == 'https://auth.local/token'
+        wait_for_refresh(cache)
+        assert cache.get().token_endpoint == 'https://auth.local/token'
+        # the failed refresh is retried later, not on every call
+        assert cache._expires_at == 1e9 + cache.retry_after_failure
+
+
+@mark.parametrize('document', [
+    [],
+    None,
+    'document',
+    {'issuer': 'https://auth.local'},
+])
+def test_fallback_is_served_when_the_document_is_unusable(document):
+    http_client = Mock()
+    http_client.get.return_value = get_response(document)
+
+    assert get_cache(http_client).get() == FALLBACK
+
+
+def test_fallback_is_served_when_the_first_fetch_fails():
+    http_client = Mock()
+    http_client.get.side_effect = requests.HTTPError('503')
+    cache = get_cache(http_client)
+
+    assert cache.get() == FALLBACK
+    assert cache.get() == FALLBACK
+    http_client.get.assert_called_once()
@@ -0,0 +1,41 @@
+import asyncio
+from pytest import raises
+from unittest.mock import Mock
+from app.adapters.oauth.threaded_authentication_service import ThreadedAuthenticationService
+from app.business_logic.authentication_service import AuthenticationService
+from app.business_logic.exceptions import InvalidState
+from app.business_logic.models.authentication import AuthenticationState
+from app.business_logic.token_service import TokenService
+
+TOKEN_ENDPOINT = 'https://auth.local/token'
+
+
+def get_service() -> ThreadedAuthenticationService:
+    auth_service = Mock(spec_set=AuthenticationService)
+    auth_service.exchange_code_for_token.return_value = AuthenticationState(state='state')
+    token_service = Mock(spec_set=TokenService)
+    token_service.get_token_endpoint_from_well_known_url.return_value = TOKEN_ENDPOINT
+
+    return ThreadedAuthenticationService(auth_service, token_service)
+
+
+def test_exchange_code_for_token_resolves_the_token_endpoint_once():
+    service = get_service()
+
+    asyncio.run(service.exchange_code_for_token('state', 'code', '/login_redirect'))
+
+    service.auth_service.validate_state.assert_called_once_with('state')
+    service.token_service.get_token_endpoint_from_well_known_url.assert_called_once_with()
+    service.auth_service.exchange_code_for_token.assert_called_once_with(
+        'state', 'code', '/login_redirect', False, TOKEN_ENDPOINT
+    )
+
+
+def test_exchange_code_for_token_with_invalid_state():
+    service = get_service()
+    service.auth_service.validate_state.side_effect = InvalidState('invalid state')
+
+    with raises(InvalidState):
+        asyncio.run(service.exchange_code_for_token('state', 'code', '/login_redirect'))
+
+    service.auth_service.exchange_code_for_token.assert_not_called()
@@ -0,0 +1,96 @@
+from unittest.mock import Mock, patch
+from pytest import fixture, mark, raises
+from app.adapters.repositories.CachedAuthenticationAdapter import CachedAuthenticationRepository
+from app.business_logic.authentication_repository import AuthenticationRepository
+from app.business_logic.exceptions import BackendRepositoryException
+from app.business_logic.models.authentication import AuthenticationState
+
+NOW = 1_000_000
+EXPIRES_AT = NOW + 900
+
+
+@fixture
+def now():
+    now = Mock(return_value=NOW)
+    with patch('app.adapters.cache.ttl_lru_cache.time.time', now):
+        yield now
+
+
+def get_repository() -> CachedAuthenticationRepository:
+    backend_repository = Mock(spec_set=AuthenticationRepository)
+    backend_repository.create_authentication_state.side_effect = \
+        lambda state: AuthenticationState(state=state, expires_at=EXPIRES_AT)
+    backend_repository.get_authentication_state.side_effect = \
+        lambda state: AuthenticationState(state=state, expires_at=EXPIRES_AT)
+    return CachedAuthenticationRepository(Mock(), backend_repository, 8)
+
+
+def test_created_state_is_validated_without_the_backend(now):
+    repository = get_repository()
+    repository.create_authentication_state('state')
+
+    auth_state = repository.get_authentication_state('state')
+
+    assert auth_state == AuthenticationState(state='state', expires_at=EXPIRES_AT)
+    repository.backend_repository.get_authentication_state.assert_not_called()
+
+
+def test_state_is_read_through_once(now):
+    repository = get_repository()
+
+    first = repository.get_authentication_state('state')
+    second = repository.get_authentication_state('state')
+
+    assert first == second
+    repository.backend_repository.get_authentication_state.assert_called_once_with('state')
+
+
+def test_unknown_state_is_not_cached(now):
+    repository = get_repository()
+    repository.backend_repository.get_authentication_state.side_effect = BackendRepositoryException('not found')
+
+    for _ in range(2):
+        with raises(BackendRepositoryException):
+            repository.get_authentication_state('state')
+
+    assert repository.backend_repository.get_authentication_state.call_count == 2
+
+
+@mark.parametrize('invalidate', [
+    lambda repository: repository.update_authentication_state(AuthenticationState(state='state')),
+    lambda repository: repository.validate_and_update_authentication_state(AuthenticationState(state='state')),
+    lambda repository: repository.pop_authentication_state('state', 'refresh_token'),
+])
+def test_state_is_invalidated_once_used(now, invalidate):
+    repository = get_repository()
+    repository.create_authentication_state('state')
+
+    invalidate(repository)
+    repository.get_authentication_state('state')
+
+    repository.backend_repository.get_authentication_state.assert_called_once_with('state')
+
+
+def test_state_leaves_the_cache_when_it_expires(now):
+    repository = get_repository()
+    repository.create_authentication_state('state')
+
+    now.return_value = EXPIRES_AT - 1
+    repository.get_authentication_state('state')
+    repository.backend_repository.get_authentication_state.assert_not_called()
+
+    now.return_value = EXPIRES_AT
+    repository.backend_repository.get_authentication_state.side_effect = BackendRepositoryException('expired')
+    with raises(BackendRepositoryException):
+        repository.get_authentication_state('state')
+
+
+def test_state_without_expiry_is_not_cached(now):
+    repository = get_repository()
+    repository.backend_repository.create_authentication_state.side_effect = None
+    repository.backend_repository.create_authentication_state.return_value = AuthenticationState(state='state')
+
+    repository.create_authentication_state('state')
+    repository.get_authentication_state('state')
+
+    repository.backend_repository.get_authentication_state.assert_called_once_with('state')
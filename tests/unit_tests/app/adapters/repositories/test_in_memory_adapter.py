@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from pytest import raises
+from unittest.mock import patch
+from app.adapters.repositories.InMemoryAdapter import InMemoryRepository
+from app.business_logic.exceptions import InvalidState, UnauthorizedException
+from app.business_logic.models.authentication import AuthenticationState, UserInfo
+
+
+def get_repository(max_size: int = 1000, stripes: int = 4) -> InMemoryRepository:
+    return InMemoryRepository(state_ttl=900, auth_state_ttl=120, max_size=max_size, stripes=stripes)
+
+
+def get_auth_state(state: str = 'state') -> AuthenticationState:
+    return AuthenticationState(
+        state=state,
+        access_token='access',
+        refresh_token='refresh',
+        id_token='id',
+        user_info=UserInfo(email='user@example.com', first_name='User', external_identifier='sub')
+    )
+
+
+def test_state_expires():
+    repository = get_repository()
+    with patch('app.adapters.repositories.InMemoryAdapter.time.time', return_value=1000):
+        repository.create_authentication_state('state')
+    with patch('app.adapters.repositories.InMemoryAdapter.time.time', return_value=1899):
+        assert repository.get_authentication_state('state').expires_at == 1900
+    with patch('app.adapters.repositories.InMemoryAdapter.time.time', return_value=1900):
+        with raises(InvalidState):
+            repository.get_authentication_state('state')
+
+
+def test_stored_tokens_expire():
+    repository = get_repository()
+    with patch('app.adapters.repositories.InMemoryAdapter.time.time', return_value=1000):
+        repository.create_authentication_state('state')
+        repository.validate_and_update_authentication_state(get_auth_state())
+    with patch('app.adapters.repositories.InMemoryAdapter.time.time', return_value=1120):
+        with raises(UnauthorizedException):
+            repository.pop_authentication_state('state', 'refresh')
+
+
+def test_validate_and_update_missing_state():
+    repository = get_repository()
+
+    with raises(InvalidState):
+        repository.validate_and_update_authentication_state(get_auth_state())
+    with raises(InvalidState):
+        repository.get_authentication_state('state')
+
+
+def test_stripe_evicts_least_recently_written():
+    repository = get_repository(max_size=2, stripes=1)
+    for state in ['first', 'second', 'third']:
+        repository.create_authentication_state(state)
+
+    with raises(InvalidState):
+        repository.get_authentication_state('first')
+    assert repository.get_authentication_state('second').state == 'second'
+    assert repository.get_authentication_state('third').state == 'third'
+
+
+def test_stripe_eviction_sweeps_expired_items():
+    repository = get_repository(max_size=3, stripes=1)
+    with patch('app.adapters.repositories.InMemoryAdapter.time.time', return_value=1000):
+        repository.create_authentication_state('first')
+        repository.create_authentication_state('second')
+    with patch('app.adapters.repositories.InMemoryAdapter.time.time', return_value=2000):
+        repository.create_authentication_state('third')
+        repository.create_authentication_state('fourth')
+        repository.create_authentication_state('fifth')
+
+        assert [state for state in repository._stripes[0].items] == ['third', 'fourth', 'fifth']
+
+
+def test_pop_with_wrong_refresh_token():
+    repository = get_repository()
+    repository.update_authentication_state(get_auth_state())
+
+    with raises(UnauthorizedException):
+        repository.pop_authentication_state('state', 'other refresh')
+    assert repository.pop_authentication_state('state', 'refresh') == get_auth_state()
+
+
+def test_double_pop():
+    repository = get_repository()
+    repository.update_authentication_state(get_auth_state())
+    repository.pop_authentication_state('state', 'refresh')
+
+    with raises(UnauthorizedException):
+        repository.pop_authentication_state('state', 'refresh')
+
+
+def test_concurrent_pop():
+    repository = get_repository()
+    repository.update_authentication_state(get_auth_state())
+    workers = 16
+    barrier = Barrier(workers)
+
+    def pop():
+        barrier.wait()
+        try:
+            return repository.pop_authentication_state('state', 'refresh')
+        except UnauthorizedException:
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda _: pop(), range(workers)))
+
+    assert [result for result in results if result is not None] == [get_auth_state()]
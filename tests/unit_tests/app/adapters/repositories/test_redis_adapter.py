@@ -0,0 +1,102 @@
+import json
+import logging
+import fakeredis
+from pytest import fixture, raises
+from unittest.mock import patch
+from app.adapters.repositories.RedisAdapter import RedisRepository
+from app.business_logic.exceptions import BackendRepositoryException, InvalidState, UnauthorizedException
+from app.business_logic.models.authentication import AuthenticationState, UserInfo
+from tests.test_utils import TestUtils
+
+KEY_PREFIX = f'{TestUtils.AUTH_TABLE}:'
+
+
+@fixture
+def server() -> fakeredis.FakeServer:
+    return fakeredis.FakeServer()
+
+
+@fixture
+def repository(server) -> RedisRepository:
+    return RedisRepository(logging.getLogger(), lambda: fakeredis.FakeRedis(server=server), KEY_PREFIX, 900, 120)
+
+
+def get_auth_state(state: str = 'state') -> AuthenticationState:
+    return AuthenticationState(
+        state=state,
+        access_token='access',
+        refresh_token='refresh',
+        id_token='id',
+        user_info=UserInfo(email='user@example.com', first_name='User', external_identifier='sub')
+    )
+
+
+def test_create_and_get_authentication_state(repository):
+    created = repository.create_authentication_state('state')
+    fetched = repository.get_authentication_state('state')
+
+    assert fetched.state == 'state'
+    assert abs(fetched.expires_at - created.expires_at) <= 1
+    assert 0 < repository.client.ttl(f'{KEY_PREFIX}state') <= 900
+
+
+def test_create_authentication_state_collision(repository):
+    repository.create_authentication_state('state')
+
+    with raises(BackendRepositoryException):
+        repository.create_authentication_state('state')
+
+
+def test_get_missing_authentication_state(repository):
+    with raises(InvalidState):
+        repository.get_authentication_state('state')
+
+
+def test_validate_and_update_missing_authentication_state(repository):
+    with raises(InvalidState):
+        repository.validate_and_update_authentication_state(get_auth_state())
+
+    assert not repository.client.exists(f'{KEY_PREFIX}state')
+
+
+def test_validate_and_update_then_pop(repository):
+    repository.create_authentication_state('state')
+    repository.validate_and_update_authentication_state(get_auth_state())
+
+    assert 0 < repository.client.ttl(f'{KEY_PREFIX}state') <= 120
+    assert repository.pop_authentication_state('state', 'refresh') == get_auth_state()
+    assert not repository.client.exists(f'{KEY_PREFIX}state')
+
+
+def test_pop_with_wrong_refresh_token(repository):
+    repository.create_authentication_state('state')
+    repository.validate_and_update_authentication_state(get_auth_state())
+
+    with raises(UnauthorizedException):
+        repository.pop_authentication_state('state', 'other refresh')
+    assert repository.client.exists(f'{KEY_PREFIX}state')
+
+
+def test_double_pop(repository):
+    repository.update_authentication_state(get_auth_state())
+    repository.pop_authentication_state('state', 'refresh')
+
+    with raises(UnauthorizedException):
+        repository.pop_authentication_state('state', 'refresh')
+
+
+def test_pop_conflicting_with_a_concurrent_write(repository, server):
+    repository.update_authentication_state(get_auth_state())
+    other_client = fakeredis.FakeRedis(server=server)
+    loads = json.loads
+
+    def write_between_read_and_delete(value):
+        other_client.set(f'{KEY_PREFIX}state', value)
+        return loads(value)
+
+    with patch('app.adapters.repositories.RedisAdapter.json.loads', side_effect=write_between_read_and_delete):
+        with raises(UnauthorizedException):
+            repository.pop_authentication_state('state', 'refresh')
+
+    # the watched key was not deleted, and can still be popped once
+    assert repository.pop_authentication_state('state', 'refresh') == get_auth_state()
@@ -0,0 +1,87 @@
+import uuid
+from pytest import mark, raises
+from unittest.mock import Mock
+from app.adapters.repositories.SignedStateAdapter import SignedStateAuthenticationRepository
+from app.business_logic.exceptions import InvalidState, BackendRepositoryException
+from app.business_logic.models.authentication import AuthenticationState
+from tests.test_utils import TestUtils
+
+
+def get_repository(state_ttl: int = 900) -> SignedStateAuthenticationRepository:
+    return SignedStateAuthenticationRepository(Mock(), TestUtils.PRIVATE_KEY, state_ttl, 100)
+
+
+def test_created_state_is_valid():
+    repository = get_repository()
+    auth_state = repository.create_authentication_state(str(uuid.uuid4()))
+
+    assert repository.get_authentication_state(auth_state.state).expires_at == auth_state.expires_at
+
+
+@mark.parametrize('state', [
+    'x.1.é',
+    'x.1.\udcff',
+    'x.\udcff.sig',
+    'x.²³.sig',
+    'x.1',
+    '',
+    '...',
+])
+def test_malformed_state(state: str):
+    with raises(InvalidState):
+        get_repository().get_authentication_state(state)
+
+
+def test_tampered_state():
+    repository = get_repository()
+    state = repository.create_authentication_state(str(uuid.uuid4())).state
+    state_id, expires_at, signature = state.split('.')
+
+    with raises(InvalidState):
+        repository.get_authentication_state(f'{state_id}.{int(expires_at) + 3600}.{signature}')
+
+
+def test_expired_state():
+    repository = get_repository(state_ttl=-1)
+    state = repository.create_authentication_state(str(uuid.uuid4())).state
+
+    with raises(InvalidState):
+        repository.get_authentication_state(state)
+
+
+def get_auth_state(repository: SignedStateAuthenticationRepository) -> AuthenticationState:
+    state = repository.create_authentication_state(str(uuid.uuid4())).state
+    return AuthenticationState(state=state, access_token='access', refresh_token='refresh', id_token='id')
+
+
+@mark.parametrize('first_update, second_update', [
+    ('validate_and_update_authentication_state', 'validate_and_update_authentication_state'),
+    ('update_authentication_state', 'update_authentication_state'),
+    ('update_authentication_state', 'validate_and_update_authentication_state'),
+    ('validate_and_update_authentication_state', 'update_authentication_state'),
+])
+def test_state_cannot_store_tokens_twice(first_update: str, second_update: str):
+    repository = get_repository()
+    auth_state = get_auth_state(repository)
+    state = auth_state.state
+
+    getattr(repository, first_update)(auth_state)
+    with raises(InvalidState):
+        getattr(repository, second_update)(auth_state)
+    with raises(InvalidState):
+        repository.get_authentication_state(state)
+    repository.backend_repository.update_authentication_state.assert_called_once_with(auth_state)
+
+
+@mark.parametrize('update', ['update_authentication_state', 'validate_and_update_authentication_state'])
+def test_state_is_not_used_up_when_the_write_fails(update: str):
+    repository = get_repository()
+    auth_state = get_auth_state(repository)
+    repository.backend_repository.update_authentication_state.side_effect = [BackendRepositoryException('down'), None]
+
+    with raises(BackendRepositoryException):
+        getattr(repository, update)(auth_state)
+    assert repository.get_authentication_state(auth_state.state).state == auth_state.state
+
+    getattr(repository, update)(auth_state)
+    assert repository.backend_repository.update_authentication_state.call_count == 2
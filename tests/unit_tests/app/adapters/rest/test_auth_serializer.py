@@ -0,0 +1,107 @@
+import asyncio
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from unittest.mock import patch
+from fastapi.encoders import jsonable_encoder
+from pytest import fixture, mark
+from starlette.responses import JSONResponse, Response
+from app.adapters.rest.dtos.access_token import AccessTokenDTO
+from app.business_logic.exceptions import ServerException
+from app.business_logic.models.authentication import AuthenticationState, UserInfo
+
+EXPIRES = re.compile(rb'expires=([^;]+)')
+
+
+def render(response: Response) -> tuple:
+    """
+    :return: the status, the raw headers and the body that {response} sends.
+        A deleted cookie expires at the time it got deleted, so its date is left out.
+    """
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(response({'type': 'http'}, None, send))
+    start, body_messages = messages[0], messages[1:]
+    headers = [(name, EXPIRES.sub(b'expires=<date>', value)) for name, value in start['headers']]
+    return start['status'], headers, b''.join(message.get('body', b'') for message in body_messages)
+
+
+def get_cookie_expiry_dates(response: Response) -> list:
+    return [
+        parsedate_to_datetime(expires.decode())
+        for name, value in response.raw_headers if name == b'set-cookie'
+        for expires in EXPIRES.findall(value)
+    ]
+
+
+@fixture
+def serializer():
+    from app.config.config import Container
+    return Container.serializer()
+
+
+@mark.parametrize('name', [
+    'user_already_exists_response', 'invalid_id_token_response', 'unauthorized_response',
+    'invalid_refresh_token_response', 'logout_response',
+])
+def test_prebuilt_response_is_identical_to_a_freshly_built_one(serializer, name):
+    prebuilt = getattr(serializer, f'get_{name}')()
+    freshly_built = getattr(serializer, f'_build_{name}')()
+
+    assert render(prebuilt) == render(freshly_built)
+    # prebuilt deleted cookies expire when the serializer was built: in the past, like the freshly deleted ones
+    assert all(expires <= datetime.now(timezone.utc) for expires in get_cookie_expiry_dates(prebuilt))
+
+
+def test_cookies_added_to_a_prebuilt_response_do_not_leak_into_the_next_one(serializer):
+    first = serializer.get_unauthorized_response()
+    serializer.delete_refresh_cookies_from_response(first, path_id='exchange_refresh_for_access_token')
+
+    second = serializer.get_unauthorized_response()
+
+    assert len(first.raw_headers) > len(second.raw_headers)
+    assert render(second) == render(serializer._build_unauthorized_response())
+
+
+def test_server_exception_response_is_built_per_exception(serializer):
+    first = render(serializer.get_server_exception_response(ServerException('first')))
+    second = render(serializer.get_server_exception_response(ServerException('second')))
+
+    assert first != second
+
+
+def get_baseline_access_token_response(access_token: str) -> Response:
+    return JSONResponse(content=jsonable_encoder(AccessTokenDTO.get_dto(access_token)))
+
+
+ACCESS_TOKENS = [
+    'ya29.a0AfH6SMB-token_value',
+    'Zoë Ünïcödé 漢字 😀',
+    'quote " backslash \\ slash / tab \t newline \n control \x01 \x7f',
+    'line separator \u2028 paragraph separator \u2029',
+    '',
+]
+
+
+@mark.parametrize('access_token', ACCESS_TOKENS)
+def test_access_token_response_is_identical_to_the_json_response(access_token):
+    from app.adapters.rest.auth_serializer import Serializer
+
+    assert render(Serializer._get_access_token_response(access_token)) == \
+        render(get_baseline_access_token_response(access_token))
+
+
+@mark.parametrize('method', ['redirect_with_access_refresh_token', 'get_refresh_token_response'])
+@mark.parametrize('access_token', ACCESS_TOKENS[:2])
+def test_token_endpoint_response_is_identical_to_the_json_response(serializer, method, access_token):
+    auth_state = AuthenticationState(access_token=access_token, refresh_token='refresh')
+    user_info = UserInfo(email='zoe@example.com', first_name='Zoë', external_identifier='sub')
+    response = getattr(serializer, method)(auth_state, user_info)
+
+    with patch.object(serializer, '_get_access_token_response', get_baseline_access_token_response):
+        baseline_response = getattr(serializer, method)(auth_state, user_info)
+
+    assert render(response) == render(baseline_response)
@@ -0,0 +1,31 @@
+import jwt
+from pytest import mark
+from app.adapters.rest.dtos.cookies import StateCookie
+from tests.test_utils import TestUtils
+
+
+def decode(value: str) -> dict:
+    return jwt.decode(value, TestUtils.PRIVATE_KEY, algorithms=[StateCookie.algorithm])
+
+
+@mark.parametrize('cookie', [
+    StateCookie(session_identifier='state'),
+    StateCookie(refresh_token_is_set=True, user_info={'username': 'user@example.com'}),
+    StateCookie(error_code=401, error_desc='unauthorized', redirected_from_popup=True),
+])
+def test_both_versions_decode_to_the_same_cookie(cookie: StateCookie):
+    legacy = decode(cookie.as_jwt(TestUtils.PRIVATE_KEY, StateCookie.LEGACY_VERSION))
+    compact = decode(cookie.as_jwt(TestUtils.PRIVATE_KEY, StateCookie.COMPACT_VERSION))
+
+    assert StateCookie(**legacy) == cookie
+    assert compact.pop('v') == StateCookie.COMPACT_VERSION
+    assert StateCookie(**{
+        name: compact[key] for name, key in StateCookie.compact_keys.items() if key in compact
+    }) == cookie
+
+
+def test_legacy_version_is_the_default():
+    cookie = StateCookie(session_identifier='state')
+
+    assert cookie.as_jwt(TestUtils.PRIVATE_KEY) == cookie.as_jwt(TestUtils.PRIVATE_KEY, StateCookie.LEGACY_VERSION)
+    assert 'v' not in decode(cookie.as_jwt(TestUtils.PRIVATE_KEY))
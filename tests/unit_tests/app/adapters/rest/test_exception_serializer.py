@@ -0,0 +1,142 @@
+import re
+from typing import Callable, Dict, Optional, Tuple
+from fastapi import APIRouter, FastAPI
+from pydantic import ValidationError
+from pytest import fixture, mark
+from starlette.testclient import TestClient
+from app.business_logic.exceptions import ResourceNotFoundException, BusinessLogicException, ServerException, \
+    UnauthorizedException, InvalidRefreshToken, ResourceAlreadyExists, InvalidIdToken, InvalidState, \
+    IdentityProviderGenericException, IdentityProviderUnavailable, TimeoutException, BackendRepositoryException
+from app.business_logic.models.authentication import UserInfo
+
+EXPIRES = re.compile(r'expires=[^;]+')
+ROUTES = ['/stateful', '/login_redirect', '/signup_redirect', '/exchange_refresh_for_access', '/refresh_token',
+          '/logout']
+
+
+def _get_validation_error() -> ValidationError:
+    try:
+        UserInfo()
+    except ValidationError as e:
+        return e
+
+
+EXCEPTIONS = [
+    BusinessLogicException('business logic'),
+    ServerException('server'),
+    _get_validation_error(),
+    ResourceNotFoundException('not found'),
+    UnauthorizedException('unauthorized'),
+    InvalidRefreshToken('invalid refresh token'),
+    ResourceAlreadyExists('already exists'),
+    InvalidIdToken('invalid id token'),
+    InvalidState('invalid state'),
+    IdentityProviderGenericException('identity provider'),
+    IdentityProviderUnavailable('circuit is open'),
+    TimeoutException('timeout'),
+    BackendRepositoryException('backend'),
+]
+
+_SERVER_EXCEPTION = {
+    '/stateful': ('get_server_exception_response', None),
+    '/login_redirect': ('get_server_exception_response', None),
+    '/signup_redirect': ('get_server_exception_response', None),
+    '/exchange_refresh_for_access': ('get_server_exception_response', 'exchange_refresh_for_access_token'),
+    '/refresh_token': ('get_server_exception_response', 'refresh_token_grant'),
+    '/logout': ('get_server_exception_response', 'refresh_token_grant'),
+}
+_UNAUTHORIZED = {
+    '/login_redirect': ('get_unauthorized_response', None),
+    '/signup_redirect': ('get_unauthorized_response', None),
+    '/exchange_refresh_for_access': ('get_unauthorized_response', 'exchange_refresh_for_access_token'),
+}
+
+# the responses of the path based handlers that were there before the routes got resolved to their endpoints:
+# exception -> (status code of the JSON response, (serializer method, path_id of the deleted cookies) per route)
+BASELINE: Dict[type, Tuple[int, Dict[str, Tuple[str, Optional[str]]]]] = {
+    BusinessLogicException: (409, {}),
+    ServerException: (500, _SERVER_EXCEPTION),
+    ValidationError: (400, {}),
+    ResourceNotFoundException: (404, {
+        '/exchange_refresh_for_access': ('get_unauthorized_response', None),
+        '/refresh_token': ('get_unauthorized_response', None),
+        '/logout': ('get_unauthorized_response', None),
+        '/login_redirect': ('get_unauthorized_response', None),
+    }),
+    UnauthorizedException: (401, _UNAUTHORIZED),
+    InvalidRefreshToken: (401, {
+        '/refresh_token': ('get_invalid_refresh_token_response', None),
+        '/logout': ('get_invalid_refresh_token_response', None),
+    }),
+    ResourceAlreadyExists: (422, {'/signup_redirect': ('get_user_already_exists_response', None)}),
+    InvalidIdToken: (401, {
+        '/signup_redirect': ('get_invalid_id_token_response', None),
+        '/exchange_refresh_for_access': ('get_invalid_id_token_response', 'exchange_refresh_for_access_token'),
+        '/refresh_token': ('get_invalid_id_token_response', 'refresh_token_grant'),
+    }),
+    InvalidState: (401, _UNAUTHORIZED),
+    IdentityProviderGenericException: (500, _SERVER_EXCEPTION),
+    IdentityProviderUnavailable: (500, _SERVER_EXCEPTION),
+    TimeoutException: (500, _SERVER_EXCEPTION),
+    BackendRepositoryException: (500, _SERVER_EXCEPTION),
+}
+
+
+def _get_endpoint(app: FastAPI) -> Callable:
+    async def endpoint():
+        raise app.state.exception
+
+    return endpoint
+
+
+@fixture(scope='module')
+def app_and_client():
+    from app.adapters.rest.exception_serializer import add_exception_handlers_to_app, serializer
+    from app.config.config import Container
+
+    app = FastAPI()
+    router = APIRouter()
+    for path in ROUTES:
+        router.add_api_route(path, _get_endpoint(app))
+    app.include_router(router, prefix=f'/{Container.authentication_route_prefix}')
+    app.add_api_route('/other', _get_endpoint(app))
+
+    @app.get('/expected')
+    async def expected():
+        return app.state.expected_response
+
+    add_exception_handlers_to_app(app)
+    app.state.serializer = serializer
+    yield app, TestClient(app), Container.authentication_route_prefix
+
+
+def _get_expected_response(serializer, exc: Exception, path: str):
+    status_code, responses = BASELINE[type(exc)]
+    if path not in responses:
+        return serializer.get_json_response_for_exception(exc, status_code=status_code)
+
+    method, path_id = responses[path]
+    response = getattr(serializer, method)(exc) if method == 'get_server_exception_response' \
+        else getattr(serializer, method)()
+    if path_id is not None:
+        serializer.delete_refresh_cookies_from_response(response, path_id=path_id)
+    return response
+
+
+@mark.parametrize('path', ROUTES + ['/other'])
+@mark.parametrize('exc', EXCEPTIONS, ids=lambda exc: type(exc).__name__)
+def test_response_matches_the_baseline(app_and_client, path, exc):
+    app, client, prefix = app_and_client
+    app.state.exception = exc
+    app.state.expected_response = _get_expected_response(app.state.serializer, exc, path)
+
+    url = path if path == '/other' else f'/{prefix}{path}'
+    response = client.get(url, allow_redirects=False)
+    expected = client.get('/expected', allow_redirects=False)
+
+    assert response.status_code == expected.status_code
+    assert response.content == expected.content
+    # a deleted cookie expires at the time it got deleted
+    assert [EXPIRES.sub('expires=<date>', value) for value in response.headers.values()] == \
+        [EXPIRES.sub('expires=<date>', value) for value in expected.headers.values()]
+    assert response.headers.keys() == expected.headers.keys()
@@ -0,0 +1,61 @@
+import json
+from pydantic import ValidationError
+from pytest import mark
+from app.adapters.rest.dtos.exceptions import get_error_code_for_exception
+from app.business_logic.exceptions import BusinessLogicException, ServerException, UnauthorizedException, \
+    InvalidState, InvalidIdToken, InvalidRefreshToken, ResourceNotFoundException, BackendRepositoryException, \
+    ResourceAlreadyExists, TimeoutException, IdentityProviderGenericException, IdentityProviderUnavailable
+from app.business_logic.models.authentication import UserInfo
+
+
+class NotFoundSubclass(ResourceNotFoundException):
+    pass
+
+
+class ValueErrorSubclass(ValueError):
+    pass
+
+
+def _get_validation_error() -> ValidationError:
+    try:
+        UserInfo()
+    except ValidationError as e:
+        return e
+
+
+@mark.parametrize('exception, error_code', [
+    (Exception('message'), 3000),
+    (ValueError('message'), 3001),
+    (_get_validation_error(), 3002),
+    (UnauthorizedException('message'), 4001),
+    (InvalidState('message'), 4002),
+    (InvalidIdToken('message'), 4003),
+    (InvalidRefreshToken('message'), 4004),
+    (BusinessLogicException('message'), 4100),
+    (ResourceNotFoundException('message'), 4101),
+    (ResourceAlreadyExists('message'), 4102),
+    (ServerException('message'), 5000),
+    (TimeoutException('message'), 5001),
+    (BackendRepositoryException('message'), 5003),
+    (IdentityProviderGenericException('message'), 5004),
+    # classes without an error code of their own resolve to the closest parent that has one
+    (IdentityProviderUnavailable('message'), 5004),
+    (NotFoundSubclass('message'), 4101),
+    (ValueErrorSubclass('message'), 3001),
+    (KeyError('message'), 3000),
+    (KeyboardInterrupt(), -1),
+])
+def test_error_code_is_the_one_of_the_closest_class(exception, error_code):
+    assert get_error_code_for_exception(exception) == error_code
+    # the second lookup is served from the resolved classes
+    assert get_error_code_for_exception(exception) == error_code
+
+
+def test_json_response_for_exception():
+    from app.adapters.rest.auth_serializer import Serializer
+
+    response = Serializer.get_json_response_for_exception(ResourceNotFoundException('Zoë not found'), 404)
+
+    assert response.status_code == 404
+    assert response.body == '{"message":"Zoë not found","error_code":4101}'.encode()
+    assert json.loads(response.body) == {'message': 'Zoë not found', 'error_code': 4101}
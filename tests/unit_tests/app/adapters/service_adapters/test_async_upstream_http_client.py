@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from functools import partial
+import httpx
+from pytest import raises
+from unittest.mock import patch
+from app.adapters.service_adapters.async_upstream_http_client import AsyncUpstreamHttpClient
+from app.business_logic.exceptions import TimeoutException
+
+
+def get_http_client() -> AsyncUpstreamHttpClient:
+    return AsyncUpstreamHttpClient(logging.getLogger(), pool_size=4, connect_timeout=1, read_timeout=2)
+
+
+def patch_transport(handler):
+    return patch(
+        'app.adapters.service_adapters.async_upstream_http_client.httpx.AsyncClient',
+        partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+    )
+
+
+def test_client_is_created_on_start_and_closed_on_close():
+    http_client = get_http_client()
+
+    async def run():
+        await http_client.start()
+        client = http_client.client
+        response = await http_client.get('https://auth.local/')
+        assert http_client.client is client
+        await http_client.close()
+        return client, response
+
+    with patch_transport(lambda request: httpx.Response(200, json={})):
+        client, response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert client.is_closed
+    assert http_client.client is None
+
+
+def test_a_new_client_is_created_on_another_loop():
+    http_client = get_http_client()
+
+    async def get_client() -> httpx.AsyncClient:
+        await http_client.start()
+        return http_client.client
+
+    first, second = asyncio.run(get_client()), asyncio.run(get_client())
+
+    assert first is not second
+
+
+def test_timeout_is_mapped():
+    def handler(request):
+        raise httpx.ReadTimeout('timed out', request=request)
+
+    with patch_transport(handler), raises(TimeoutException):
+        asyncio.run(get_http_client().post('https://auth.local/token'))
@@ -0,0 +1,110 @@
+from threading import Event
+from unittest.mock import Mock, patch
+from pytest import raises
+from app.adapters.service_adapters.bulk_user_provisioner import BulkUserProvisioner
+from app.adapters.service_adapters.identity_provider_client import IdentityProviderClient
+from app.business_logic.exceptions import ResourceAlreadyExists, IdentityProviderUnavailable, \
+    IdentityProviderGenericException
+from app.business_logic.models.provisioning import ProvisioningResult
+
+
+def get_record(record_number: int) -> dict:
+    return {
+        'email': f'user{record_number}@example.com',
+        'first_name': 'User',
+        'external_identifier': f'sub{record_number}'
+    }
+
+
+def provision(identity_provider_service: Mock, records: list, max_attempts: int = 3):
+    results = []
+    provisioner = BulkUserProvisioner(Mock(), identity_provider_service, 4, 8, max_attempts=max_attempts)
+    with patch('app.adapters.service_adapters.bulk_user_provisioner.time.sleep') as sleep:
+        report = provisioner.provision(records, results.append)
+
+    return report, sorted(results, key=lambda result: result.record_number), sleep
+
+
+def test_existing_user_counts_as_provisioned():
+    identity_provider_service = Mock(spec_set=IdentityProviderClient)
+
+    def sign_up_user(user_info):
+        if user_info.external_identifier == 'sub2':
+            raise ResourceAlreadyExists()
+
+    identity_provider_service.sign_up_user.side_effect = sign_up_user
+    report, results, _ = provision(identity_provider_service, [(n, get_record(n)) for n in (1, 2, 3)])
+
+    assert (report.created, report.already_exists, report.failed) == (2, 1, 0)
+    assert [result.status for result in results] == [
+        ProvisioningResult.CREATED, ProvisioningResult.ALREADY_EXISTS, ProvisioningResult.CREATED
+    ]
+
+
+def test_sign_up_is_retried_while_the_identity_provider_is_unavailable():
+    identity_provider_service = Mock(spec_set=IdentityProviderClient)
+    identity_provider_service.sign_up_user.side_effect = [
+        IdentityProviderUnavailable('circuit is open'), IdentityProviderUnavailable('circuit is half_open'), None
+    ]
+    report, results, sleep = provision(identity_provider_service, [(1, get_record(1))])
+
+    assert (report.created, report.failed) == (1, 0)
+    assert identity_provider_service.sign_up_user.call_count == 3
+    first_backoff, second_backoff = (call.args[0] for call in sleep.call_args_list)
+    assert 0.25 <= first_backoff <= 0.5 and 0.5 <= second_backoff <= 1
+
+
+def test_sign_up_fails_once_the_attempts_are_exhausted():
+    identity_provider_service = Mock(spec_set=IdentityProviderClient)
+    identity_provider_service.sign_up_user.side_effect = IdentityProviderUnavailable('circuit is open')
+    report, results, sleep = provision(identity_provider_service, [(1, get_record(1))], max_attempts=3)
+
+    assert report.failed == 1
+    assert identity_provider_service.sign_up_user.call_count == 3
+    assert sleep.call_count == 2
+    assert results[0].error == 'IdentityProviderUnavailable: circuit is open'
+
+
+def test_other_errors_are_not_retried():
+    identity_provider_service = Mock(spec_set=IdentityProviderClient)
+    identity_provider_service.sign_up_user.side_effect = IdentityProviderGenericException('500: error')
+    report, results, sleep = provision(identity_provider_service, [(1, get_record(1)), (2, {'email': 'x'})])
+
+    assert report.failed == 2
+    assert identity_provider_service.sign_up_user.call_count == 1
+    sleep.assert_not_called()
+    assert results[0].error == 'IdentityProviderGenericException: 500: error'
+    assert results[1].status == ProvisioningResult.FAILED
+
+
+def test_on_result_failure_is_raised_and_stops_the_reading():
+    identity_provider_service = Mock(spec_set=IdentityProviderClient)
+    read = []
+
+    def records():
+        for n in range(1, 100):
+            read.append(n)
+            yield n, get_record(n)
+
+    provisioner = BulkUserProvisioner(Mock(), identity_provider_service, 1, 1)
+    on_result = Mock(side_effect=OSError('disk full'))
+    with raises(OSError, match='disk full'):
+        provisioner.provision(records(), on_result)
+
+    on_result.assert_called_once()
+    provisioner.logger.exception.assert_called_once()
+    assert len(read) < 99
+
+
+def test_progress_is_logged_while_draining():
+    identity_provider_service = Mock(spec_set=IdentityProviderClient)
+    released = Event()
+    identity_provider_service.sign_up_user.side_effect = lambda user_info: released.wait()
+    provisioner = BulkUserProvisioner(Mock(), identity_provider_service, 2, 2, progress_interval=0.05)
+    provisioner.logger.info.side_effect = lambda message: released.set()
+
+    report = provisioner.provision([(1, get_record(1))])
+
+    assert report.created == 1 and report.records_per_second > 0
+    first_progress, final_progress = (call.args[0] for call in provisioner.logger.info.call_args_list[:2])
+    assert first_progress.startswith('provisioned 0 users') and final_progress.startswith('provisioned 1 users')
@@ -0,0 +1,85 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from unittest.mock import Mock
+from app.adapters.concurrency.circuit_breaker import CircuitBreaker
+from app.adapters.service_adapters.identity_provider_client import IdentityProviderClient
+
+
+def get_client() -> IdentityProviderClient:
+    circuit_breaker = CircuitBreaker(Mock(), 'test', 10, 10, 4, 0.5, 5, 1, 5, 2, 8)
+    client = IdentityProviderClient(Mock(), 'https://accounts.local', 2, 60, 8, circuit_breaker, 4, 1, False)
+    client.identity_api = Mock()
+    client.identity_api.get_user_user_external_identifier_get.side_effect = \
+        lambda external_identifier, _request_timeout: {'external_identifier': external_identifier}
+    return client
+
+
+def test_repeated_lookup_calls_the_identity_provider_once():
+    client = get_client()
+
+    users = [client.get_user('sub') for _ in range(3)]
+
+    assert users == [{'external_identifier': 'sub'}] * 3
+    client.identity_api.get_user_user_external_identifier_get.assert_called_once_with('sub', _request_timeout=(1, 2))
+
+
+def test_repeated_async_lookup_calls_the_identity_provider_once():
+    client = get_client()
+
+    async def run():
+        return [await client.get_user_async('sub') for _ in range(3)]
+
+    assert asyncio.run(run()) == [{'external_identifier': 'sub'}] * 3
+    client.identity_api.get_user_user_external_identifier_get.assert_called_once()
+
+
+def test_concurrent_lookups_share_a_single_call():
+    client = get_client()
+    release = Event()
+
+    def get_user(external_identifier, _request_timeout):
+        release.wait()
+        return {'external_identifier': external_identifier}
+
+    client.identity_api.get_user_user_external_identifier_get.side_effect = get_user
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(client.get_user, 'sub') for _ in range(4)]
+        time.sleep(0.1)
+        release.set()
+        users = [future.result() for future in futures]
+
+    assert users == [{'external_identifier': 'sub'}] * 4
+    client.identity_api.get_user_user_external_identifier_get.assert_called_once()
+
+
+def test_invalidated_user_is_looked_up_again():
+    client = get_client()
+    client.get_user('sub')
+
+    client.invalidate_user('sub')
+    client.get_user('sub')
+
+    assert client.identity_api.get_user_user_external_identifier_get.call_count == 2
+
+
+def test_user_is_looked_up_again_once_the_ttl_is_over(monkeypatch):
+    client = get_client()
+    client.get_user('sub')
+
+    now = time.time() + 60
+    monkeypatch.setattr('app.adapters.cache.ttl_lru_cache.time.time', lambda: now)
+    client.get_user('sub')
+
+    assert client.identity_api.get_user_user_external_identifier_get.call_count == 2
+
+
+def test_missing_user_is_not_remembered():
+    client = get_client()
+    client.identity_api.get_user_user_external_identifier_get.side_effect = None
+    client.identity_api.get_user_user_external_identifier_get.return_value = None
+
+    assert client.get_user('sub') is None
+    assert client.get_user('sub') is None
+    assert client.identity_api.get_user_user_external_identifier_get.call_count == 2
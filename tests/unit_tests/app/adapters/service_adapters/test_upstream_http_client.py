@@ -0,0 +1,55 @@
+import logging
+import requests
+from pytest import mark, raises
+from unittest.mock import patch
+from app.adapters.service_adapters.upstream_http_client import UpstreamHttpClient
+from app.business_logic.exceptions import TimeoutException
+
+
+def get_http_client() -> UpstreamHttpClient:
+    return UpstreamHttpClient(logging.getLogger(), pool_size=4, connect_timeout=1, read_timeout=2)
+
+
+@mark.parametrize('prefix', ['https://', 'http://'])
+def test_pooled_adapter_is_mounted(prefix):
+    http_client = get_http_client()
+
+    adapter = http_client.session.get_adapter(f'{prefix}auth.local/')
+
+    assert (adapter._pool_connections, adapter._pool_maxsize, adapter.max_retries.total) == (4, 4, 0)
+    assert adapter.poolmanager.connection_pool_kw['maxsize'] == 4
+
+
+def test_both_schemes_share_the_adapter():
+    http_client = get_http_client()
+
+    assert http_client.session.get_adapter('https://auth.local/') is http_client.session.get_adapter('http://a/')
+
+
+def test_default_timeout_is_applied():
+    http_client = get_http_client()
+
+    with patch.object(http_client.session, 'request') as request:
+        http_client.get('https://auth.local/', headers={'Accept': 'application/json'})
+        http_client.post('https://auth.local/token', timeout=5)
+
+    assert request.call_args_list[0].kwargs == {'headers': {'Accept': 'application/json'}, 'timeout': (1, 2)}
+    assert request.call_args_list[1].args == ('POST', 'https://auth.local/token')
+    assert request.call_args_list[1].kwargs == {'timeout': 5}
+
+
+@mark.parametrize('exception', [requests.ConnectTimeout('connect'), requests.ReadTimeout('read')])
+def test_timeout_is_mapped_to_timeout_exception(exception):
+    http_client = get_http_client()
+
+    with patch.object(http_client.session, 'request', side_effect=exception):
+        with raises(TimeoutException, match='Timeout while calling https://auth.local/'):
+            http_client.get('https://auth.local/')
+
+
+def test_other_errors_are_not_mapped():
+    http_client = get_http_client()
+
+    with patch.object(http_client.session, 'request', side_effect=requests.ConnectionError('refused')):
+        with raises(requests.ConnectionError):
+            http_client.get('https://auth.local/')